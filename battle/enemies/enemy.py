@@ -2,7 +2,8 @@ import pygame
 from pygame.locals import *
 
 from battle.engine import BattleObject
-from graphics.animation import Animation, AnimationFrame
+from graphics.animation import Animation, AnimationFrame, copyAnimations
+from graphics.assets import AssetCache
 #from graphics import BattleGraphicObject, Animation, AnimationFrame
 from graphics.battle import BattleGraphicObject
 from ai import FeebleAI
@@ -10,6 +11,8 @@ import config
 
 ## The enemy base class.
 class Enemy(BattleObject):
+	## Animations generated so far, keyed by (enemy class, color).
+	templates = {}
 
 	## Constructor
 	#  @param level This actor's level.
@@ -23,8 +26,20 @@ class Enemy(BattleObject):
 		self.drops = drops
 		self.baseExp = baseExp
 		self.baseGold = baseGold
+		self.color = None
 		self.statOffsets = {"HpM":0,"MpM":0,"Atk":0,"Def":0,"Spd":0,"Vit":0,"Mag":0,"Res":0,"Con":0,"Mnd":0}
 
+	## Returns a set of animations for this enemy.
+	#
+	#  genAnim() is only called for the first enemy of each class and color, the animations it
+	#  generates are kept as a template. Every enemy gets its own copy of the template, which shares
+	#  the template's frames but is played separately.
+	def getAnimations(self):
+		key = (self.__class__,None if self.color == None else tuple(self.color))
+		if key not in Enemy.templates:
+			Enemy.templates[key] = self.genAnim()
+		return copyAnimations(Enemy.templates[key])
+
 	## Calculates how much experience the player should get from defeating this enemy.
 	#
 	#  exp = level*baseExp
@@ -61,7 +76,7 @@ class Slime(Enemy):
 		self.name = "Slime"
 		self.ai = FeebleAI(55,150)
 
-		animations = self.genAnim()
+		animations = self.getAnimations()
 		self.graphicObject = BattleGraphicObject(animations,[pos,150],2*level,weapon=None,state="Idle")
 
 		self.genStats()
@@ -113,30 +128,30 @@ class Slime(Enemy):
 		animations = {"Idle":[Animation(None,None,"IdleW"),Animation(None,None,"IdleE")],"Run":[Animation(None,None,"RunW"),Animation(None,None,"RunE")],"Attack":[Animation(None,None,"AttackW"),Animation(None,None,"AttackE")],"Death":[Animation(None,None,"DeathW"),Animation(None,None,"DeathE")],"Dead":[Animation(None,None,"DeadW"),Animation(None,None,"DeadE")]}
 
 		#Idle:
-		temp = pygame.image.load(config.AssetPath+"Battle/Enemies/Gelatinous/Slime/Idle1.png").convert_alpha()
+		temp = AssetCache.load(config.AssetPath+"Battle/Enemies/Gelatinous/Slime/Idle1.png").copy()
 		temp.fill(self.color,special_flags=BLEND_MULT)
-		animations["Idle"][1].addFrame(AnimationFrame(temp,.5,None,0))
+		animations["Idle"][1].addFrame(AnimationFrame(temp,.5,0))
 
 		#Run:
 		for i in range(1,7):
-			temp = pygame.image.load(config.AssetPath+"Battle/Enemies/Gelatinous/Slime/Walk"+str(i)+".png").convert_alpha()
+			temp = AssetCache.load(config.AssetPath+"Battle/Enemies/Gelatinous/Slime/Walk"+str(i)+".png").copy()
 			temp.fill(self.color,special_flags=BLEND_MULT)
-			animations["Run"][1].addFrame(AnimationFrame(temp,.17,None,i-1))
+			animations["Run"][1].addFrame(AnimationFrame(temp,.17,i-1))
 
 		#Attack:
 		for i in range(1,3):
-			temp = pygame.image.load(config.AssetPath+"Battle/Enemies/Gelatinous/Slime/Attack"+str(i)+".png").convert_alpha()
+			temp = AssetCache.load(config.AssetPath+"Battle/Enemies/Gelatinous/Slime/Attack"+str(i)+".png").copy()
 			temp.fill(self.color,special_flags=BLEND_MULT)
-			animations["Attack"][1].addFrame(AnimationFrame(temp,.17,None,i-1))
+			animations["Attack"][1].addFrame(AnimationFrame(temp,.17,i-1))
 
 		#Death:
 		for i in range(1,7):
-			temp = pygame.image.load(config.AssetPath+"Battle/Enemies/Gelatinous/Slime/Death"+str(i)+".png").convert_alpha()
+			temp = AssetCache.load(config.AssetPath+"Battle/Enemies/Gelatinous/Slime/Death"+str(i)+".png").copy()
 			temp.fill(self.color,special_flags=BLEND_MULT)
-			animations["Death"][1].addFrame(AnimationFrame(temp,.1,None,i-1))
-		temp = pygame.image.load(config.AssetPath+"Battle/Enemies/Gelatinous/Slime/Dead.png").convert_alpha()
+			animations["Death"][1].addFrame(AnimationFrame(temp,.1,i-1))
+		temp = AssetCache.load(config.AssetPath+"Battle/Enemies/Gelatinous/Slime/Dead.png").copy()
 		temp.fill(self.color,special_flags=BLEND_MULT)
-		animations["Dead"][1].addFrame(AnimationFrame(temp,.17,None,i-1))
+		animations["Dead"][1].addFrame(AnimationFrame(temp,.17,i-1))
 
 
 		##Create Mirroring
@@ -144,19 +159,19 @@ class Slime(Enemy):
 		temp = animations["Idle"][1].getFrames()
 		i=0
 		for frame in temp:
-			animations["Idle"][0].addFrame(AnimationFrame(pygame.transform.flip(frame.getImage(),True,False),frame.getDelay(),None,i))
+			animations["Idle"][0].addFrame(AnimationFrame(pygame.transform.flip(frame.getImage(),True,False),frame.getDelay(),i))
 			i+=1
 		#Run
 		temp = animations["Run"][1].getFrames()
 		i=0
 		for frame in temp:
-			animations["Run"][0].addFrame(AnimationFrame(pygame.transform.flip(frame.getImage(),True,False),frame.getDelay(),None,i))
+			animations["Run"][0].addFrame(AnimationFrame(pygame.transform.flip(frame.getImage(),True,False),frame.getDelay(),i))
 			i+=1
 		#Attack
 		temp = animations["Attack"][1].getFrames()
 		j = 0
 		for frame in temp:
-			animations["Attack"][0].addFrame(AnimationFrame(pygame.transform.flip(frame.getImage(),True,False),frame.getDelay(),None,j))
+			animations["Attack"][0].addFrame(AnimationFrame(pygame.transform.flip(frame.getImage(),True,False),frame.getDelay(),j))
 			j+=1
 
 		#Death
@@ -169,7 +184,7 @@ class Slime(Enemy):
 		animations["Death"][0].setNextAnimation(animations["Dead"][0])
 		animations["Death"][1].setNextAnimation(animations["Dead"][1])
 		temp = Animation(None,None,"Remove")
-		temp.addFrame(AnimationFrame(pygame.surface.Surface((1,1)),.5,None,1))
+		temp.addFrame(AnimationFrame(pygame.surface.Surface((1,1)),.5,1))
 		animations["Death"][0].setNextAnimation(temp)
 		animations["Death"][1].setNextAnimation(temp)
 
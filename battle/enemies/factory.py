@@ -21,3 +21,10 @@ class EnemyFactory(object):
 				errors.getLogger().error("Undefined item: "+enemy)
 				return None
 		return EnemyFactory.enemies[enemy](*args,**kwargs)
+
+	## Generates the animations of an enemy ahead of time, so battles against it do not have to load anything.
+	#
+	#  @param enemy The name of the enemy, as passed to createEnemy().
+	@staticmethod
+	def preload(enemy):
+		EnemyFactory.createEnemy(enemy,1,0)
@@ -4,6 +4,7 @@ import pygame
 
 import config
 from graphics.animation import Animation, AnimationFrame
+from graphics.assets import AssetCache
 ## The Battle Engine
 #
 #  A new battle engine is created for each battle.
@@ -512,8 +513,8 @@ class BattleObject(object):
 				proj["damage"] = int(self.getAtk()*scale)		# Should this be trucated? Are decimal damages bad?
 				proj["speed"] *= scale
 				proj["dist"] *= scale
-				img = pygame.image.load(config.AssetPath+proj["graphicObject"]).convert_alpha()
-				animR = Animation(AnimationFrame(img,.5,None,"Idle"),None,"Idle")
+				img = AssetCache.load(config.AssetPath+proj["graphicObject"])
+				animR = Animation(AnimationFrame(img,.5,"Idle"),None,"Idle")
 				proj["graphicObject"] = graphicObject({"Idle":[None,animR]},proj["pos"],proj["speed"])
 				self.projectile = Projectile(**proj)
 
@@ -549,6 +550,7 @@ class BattleObject(object):
 				self.weaponRecovery = weapon.getRecoveryTime()
 				self.weaponPreStages = weapon.getStyle().getPreStages()
 				self.weaponStages = weapon.getStyle().getStages()
+			self.weaponProj = weapon.getProjectile()
 		else:
 			delay = [[.15,.25],[.15,.15,.25],[.15,.25]]
 			self.weaponReaction = .20
@@ -556,13 +558,12 @@ class BattleObject(object):
 			self.weaponRecovery = .25
 			self.weaponType = "Combo"
 			self.atkBox = [pygame.rect.Rect([4,7,25,61]),pygame.rect.Rect([23,7,25,60])]
+			self.weaponProj = None
 		if self.weaponType == "Combo":
 			self.weaponDelay = []
 			for item in delay:
 				self.weaponDelay.append(sum(item))
 
-		self.weaponProj = weapon.getProjectile()
-
 		self.graphicObject.setWeapon(weapon)
 		self.graphicObject.updateAnimations(animations)
 
@@ -5,6 +5,7 @@ import pygame
 import config
 from battle.engine import Projectile
 from graphics.animation import Animation, AnimationFrame
+from graphics.assets import AssetCache
 from graphics.battle import BattleGraphicObject
 
 ## Base class for all skills.
@@ -128,9 +129,9 @@ class WaveSlash(ProjectileSkill):
 	## Constructor:
 	def __init__(self):
 		self.dmg = 4
-		img = pygame.image.load(config.AssetPath+"Battle/Abilities/Warrior/WaveSlash.png").convert_alpha()
-		animr = Animation(AnimationFrame(img,.5,None,"Idle"),None,"Idle")
-		animl = Animation(AnimationFrame(pygame.transform.flip(img,True,False),.5,None,"Idle"),None,"Idle")
+		img = AssetCache.load(config.AssetPath+"Battle/Abilities/Warrior/WaveSlash.png")
+		animr = Animation(AnimationFrame(img,.5,"Idle"),None,"Idle")
+		animl = Animation(AnimationFrame(pygame.transform.flip(img,True,False),.5,"Idle"),None,"Idle")
 		projectileGO = BattleGraphicObject({"Idle":[animl,animr]},(0,0),50)
 		proj = Projectile(projectileGO,[pygame.rect.Rect([2,0,30,70]),pygame.rect.Rect([20,0,30,70])],self.dmg,(0,0),125,150,None,piercing=True)
 		ProjectileSkill.__init__(self,"Wave Slash","Attack1",1,.75,proj)
@@ -52,3 +52,54 @@ ScreenSize = [640,480]
 #
 #  See ScaledScreen for more information.
 Smoothing = 0
+
+## Whether or not the overworld only redraws the parts of the screen that changed.
+#
+#  The whole screen is still redrawn whenever the camera moves or a screen effect is active.
+#  Only used with a ScaledScreen, turn this off if parts of the screen are left stale.
+DirtyRects = True
+
+## The directory that compiled data such as parsed levels is cached in.
+CachePath = "cache/"
+
+## Whether or not compiled data should be cached on disk.
+#
+#  Entries are rebuilt automatically when the files they were built from change,
+#  this only needs to be turned off when debugging the loaders themselves.
+UseCache = True
+
+## How many bytes of decoded images the AssetCache may hold.
+#
+#  Least recently used images are dropped once this is exceeded, images still in use
+#  are not freed until whatever is using them lets go of them.
+AssetCacheSize = 32*1024*1024
+
+## How many bytes of composited character frames the CompositeCache may hold.
+#
+#  Characters dressed the same share their frames, so a village full of NPCs only
+#  has to tint and stack each frame once.
+CompositeCacheSize = 8*1024*1024
+
+## How many bytes of collision masks loadMask() may keep in memory.
+#
+#  Least recently used masks are dropped once this is exceeded, they are rebuilt from
+#  the copy cached on disk if they are needed again.
+MaskCacheSize = 2*1024*1024
+
+## How many neighbouring areas may be loaded in the background at once.
+#
+#  After an area is loaded, the areas its Area Change triggers lead to are loaded on a
+#  worker thread so that moving to them does not stall the game. Set to 0 to disable.
+PrefetchAreas = 3
+
+## How many recently visited areas are kept in memory after the player leaves them.
+#
+#  Returning to one of these areas reuses its objects rather than loading it again, so
+#  NPCs and pushable objects are where they were left. Set to 0 to disable.
+RetainedAreas = 4
+
+## How many chunks around the player's are kept loaded in chunked levels.
+#
+#  Chunks are loaded on a worker thread as the player gets within this many chunks of
+#  them. Larger values use more memory but give chunks longer to load.
+ChunkRadius = 1
@@ -1 +1 @@
-__all__ = ["battle","engine","mask"]
+__all__ = ["areas","battle","cache","chunks","engine","mask","prefetch","spatial","timers","worker"]
@@ -0,0 +1,58 @@
+## @package areas
+#  Documentation for the Areas Module.
+#
+#  This module contains the AreaCache, which keeps the objects of recently visited areas so that
+#  returning to one of them only has to attach the level again.
+
+from collections import OrderedDict
+
+import errors
+import config
+
+## Keeps the PreparedLevels of the areas the player has most recently left.
+#
+#  A retained PreparedLevel holds the same actors, NPCs, triggers and graphic objects that were
+#  in the engines, so everything is where it was left when it is attached again.
+class AreaCache(object):
+
+	## Constructor.
+	#
+	#  @param limit The most areas that are kept at once, the least recently left ones are dropped first.
+	#  Defaults to config.RetainedAreas, no areas are kept if this is 0.
+	def __init__(self,limit=None):
+		if limit == None:
+			limit = config.RetainedAreas
+		self.limit = limit
+		self.areas = OrderedDict()
+
+	## Keeps a level which is being left.
+	#
+	#  @param prepared The PreparedLevel which was attached to the engines, see game.level.load().
+	def retain(self,prepared):
+		if self.limit <= 0:
+			return
+		area = (prepared.xmlPath,prepared.level)
+		self.areas.pop(area,None)
+		self.areas[area] = prepared
+		while len(self.areas) > self.limit:
+			errors.debug("Dropping retained level: "+self.areas.popitem(False)[0][1])
+
+	## Returns whether or not a level is retained.
+	#
+	#  @param xmlPath Path to the level XML.
+	#  @param level Name of the level inside the XML.
+	def has(self,xmlPath,level):
+		return (xmlPath,level) in self.areas
+
+	## Removes a level from the cache and returns it.
+	#
+	#  @param xmlPath Path to the level XML.
+	#  @param level Name of the level inside the XML.
+	#
+	#  @return Returns the PreparedLevel, or @c None if the level is not retained.
+	def take(self,xmlPath,level):
+		return self.areas.pop((xmlPath,level),None)
+
+	## Drops every retained level.
+	def clear(self):
+		self.areas.clear()
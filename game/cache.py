@@ -0,0 +1,81 @@
+## @package cache
+#  Documentation for the %Cache Module.
+#
+#  This module contains the code for storing compiled game data on disk.
+#
+#  Each entry remembers the files it was built from along with their modification
+#  times, an entry is only returned if none of those files have changed since it
+#  was saved.
+
+import os
+import thread
+import cPickle as pickle
+
+import config
+import errors
+
+## Returns the modification time of @c path, or @c None if it does not exist.
+def getMTime(path):
+	try:
+		return os.path.getmtime(path)
+	except OSError:
+		return None
+
+## Returns the path of the file used to store the entry @c name.
+def getPath(name):
+	return config.CachePath+name.replace("/","_").replace("\\","_").replace(" ","_")
+
+## Loads a cache entry.
+#
+#  @param name The name of the entry.
+#  @param version The version of the data format, entries saved with a different version are ignored.
+#
+#  @return Returns the cached data or @c None if there is no valid entry.
+def load(name,version=0):
+	if not config.UseCache:
+		return None
+	try:
+		filer = open(getPath(name),"rb")
+	except IOError:
+		return None
+	try:
+		try:
+			entry = pickle.load(filer)
+		except Exception:
+			errors.warning("Unable to read cache entry: "+name)
+			return None
+	finally:
+		filer.close()
+	if entry.get("version") != version:
+		return None
+	for path,mtime in entry["deps"]:
+		if getMTime(path) != mtime:
+			errors.debug("Cache entry out of date: "+name)
+			return None
+	return entry["data"]
+
+## Saves a cache entry.
+#
+#  @param name The name of the entry.
+#  @param deps A list of paths to the files the data was built from.
+#  @param data The data to be saved, must be picklable.
+#  @param version The version of the data format.
+def save(name,deps,data,version=0):
+	if not config.UseCache:
+		return
+	entry = {"version":version,"deps":[(path,getMTime(path)) for path in deps],"data":data}
+	path = getPath(name)
+	temp = path+"."+str(thread.get_ident())+".tmp"	#Entries may be saved from more than one thread, see game.prefetch.
+	try:
+		if not os.path.isdir(config.CachePath):
+			os.makedirs(config.CachePath)
+		filer = open(temp,"wb")
+		try:
+			pickle.dump(entry,filer,pickle.HIGHEST_PROTOCOL)
+		finally:
+			filer.close()
+		if os.path.exists(path):	#os.rename() will not replace files on Windows.
+			os.remove(path)
+		os.rename(temp,path)
+	except (IOError,OSError):
+		errors.warning("Unable to write cache entry: "+name)
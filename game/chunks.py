@@ -0,0 +1,170 @@
+## @package chunks
+#  Documentation for the Chunks Module.
+#
+#  This module contains the ChunkLoader, which streams the chunks of a chunked level in and out of
+#  the engines as the player moves around.
+#
+#  A chunked level is split into a grid of equally sized chunks, each with its own background, mask
+#  and objects. Only the chunks around the player are kept loaded, so however large the level is the
+#  memory it uses stays about the same. Chunks are built on a worker thread by a ChunkStreamer before
+#  the player reaches them.
+#
+#  A level is chunked by giving it a Chunks record instead of a Background and a Mask:
+#  @code
+#  <Chunks>{"XML":"Levels/World/Chunks.xml","Size":[320,240],"Count":[16,16]}</Chunks>
+#  @endcode
+#  where @c XML is the chunk XML relative to config.AssetPath (see game.level.buildChunk()), @c Size
+#  is the width and height of a chunk in pixels and @c Count the number of columns and rows.
+
+from mask import ChunkedMask
+from worker import Worker
+from graphics.tiles import ChunkedBackground
+import errors
+import config
+
+## One chunk of a chunked level.
+class Chunk(object):
+
+	## Constructor.
+	#
+	#  @param pos The chunk's (column, row).
+	def __init__(self,pos):
+		self.pos = tuple(pos)
+		self.background = None
+		self.mask = None
+		self.actors = []
+		self.objects = []
+
+## Builds chunks in the background.
+#
+#  Works like the game.prefetch.Prefetcher, except that request() replaces the queue so chunks the
+#  player has moved away from before they were built are skipped.
+class ChunkStreamer(Worker):
+
+	## Constructor.
+	#
+	#  @param build The function which builds a chunk, it is passed the chunk's (column, row) and
+	#  returns a Chunk. It is called on the worker thread.
+	def __init__(self,build):
+		Worker.__init__(self,build,"ChunkStreamer")
+
+	## Sets which chunks should be built, closest first.
+	#
+	#  Chunks which are already being built or built are skipped.
+	#
+	#  @param positions A list of (column, row) tuples.
+	def request(self,positions):
+		with self.condition:
+			self.queue = [pos for pos in positions if pos not in self.ready and pos != self.current]
+			self.wake()
+
+	## Returns a list of the chunks built since the last call.
+	def poll(self):
+		with self.condition:
+			ready = self.ready.values()
+			self.ready = {}
+			return ready
+
+	## Returns a chunk, building it now if it has not been built yet.
+	#
+	#  If the chunk is currently being built this waits for it to finish.
+	#
+	#  @param pos The chunk's (column, row).
+	def take(self,pos):
+		chunk = Worker.take(self,pos)
+		if chunk == None:
+			chunk = self.build(pos)
+		return chunk
+
+## Keeps the chunks around the player of a chunked level loaded into the engines.
+#
+#  Chunks within config.ChunkRadius chunks of the one the player is in are loaded, and unloaded again
+#  once the player is more than one chunk further away, so walking back and forth over the edge of a
+#  chunk does not load and unload the same chunks over and over. At most (2*ChunkRadius+3)**2 chunks
+#  are loaded at once.
+class ChunkLoader(object):
+
+	## Constructor.
+	#
+	#  @param build The function which builds a chunk, see ChunkStreamer.
+	#  @param chunkSize The width and height of a chunk, in pixels.
+	#  @param count The number of columns and rows of chunks.
+	#  @param actors A dictionary mapping each chunk's (column, row) to a list of (ID, state) pairs for
+	#  the actors in it which SBSC triggers depend on, see game.engine.GameEngine.setChunkActors().
+	#  @param radius How many chunks around the player's are loaded. Defaults to config.ChunkRadius.
+	def __init__(self,build,chunkSize,count,actors,radius=None):
+		if radius == None:
+			radius = config.ChunkRadius
+		self.chunkSize = tuple(chunkSize)
+		self.count = tuple(count)
+		self.radius = radius
+		self.actors = actors
+		self.background = ChunkedBackground(chunkSize,count)
+		self.mask = ChunkedMask(chunkSize,count)
+		self.loaded = {}
+		self.center = None
+		self.streamer = ChunkStreamer(build)
+
+	## Returns the (column, row) of the chunk a point is in.
+	def getChunkPos(self,point):
+		return (int(point[0])//self.chunkSize[0],int(point[1])//self.chunkSize[1])
+
+	## Returns whether or not a (column, row) is inside of the grid.
+	def inGrid(self,pos):
+		return 0 <= pos[0] < self.count[0] and 0 <= pos[1] < self.count[1]
+
+	## Returns the distance between two chunks, counting diagonal steps as one.
+	@staticmethod
+	def getDistance(a,b):
+		return max(abs(a[0]-b[0]),abs(a[1]-b[1]))
+
+	## Loads and unloads chunks around the player, called every frame while the level is attached.
+	#
+	#  The chunk the player is in is built straight away if the ChunkStreamer has not got to it yet, the
+	#  ones around it are only loaded once they have been built.
+	def update(self,GameEngine,GraphicEngine):
+		center = self.getChunkPos(GameEngine.player.getCenter())
+		if self.inGrid(center) and center not in self.loaded:
+			self.attach(self.streamer.take(center),GameEngine,GraphicEngine)
+		for chunk in self.streamer.poll():
+			if chunk.pos not in self.loaded and self.getDistance(chunk.pos,center) <= self.radius+1:
+				self.attach(chunk,GameEngine,GraphicEngine)
+		if center == self.center:
+			return
+		self.center = center
+		for pos in self.loaded.keys():
+			if self.getDistance(pos,center) > self.radius+1:
+				self.detach(pos,GameEngine,GraphicEngine)
+		wanted = []
+		for cy in xrange(center[1]-self.radius,center[1]+self.radius+1):
+			for cx in xrange(center[0]-self.radius,center[0]+self.radius+1):
+				if self.inGrid((cx,cy)) and (cx,cy) not in self.loaded:
+					wanted.append((cx,cy))
+		wanted.sort(key=lambda pos: abs(pos[0]-center[0])+abs(pos[1]-center[1]))
+		self.streamer.request(wanted)
+
+	## Adds a chunk to the engines.
+	def attach(self,chunk,GameEngine,GraphicEngine):
+		errors.debug("Loading chunk: "+str(chunk.pos))
+		self.loaded[chunk.pos] = chunk
+		GameEngine.addChunk(chunk)
+		GraphicEngine.addChunk(chunk)
+
+	## Removes a chunk from the engines.
+	def detach(self,pos,GameEngine,GraphicEngine):
+		errors.debug("Unloading chunk: "+str(pos))
+		chunk = self.loaded.pop(pos)
+		GameEngine.removeChunk(chunk)
+		GraphicEngine.removeChunk(chunk)
+
+	## Forgets every chunk and stops the ChunkStreamer, called once the level has been cleared from the engines.
+	#
+	#  The chunks are built again, and the ChunkStreamer started again, if the level is attached again.
+	def release(self):
+		self.streamer.cancel()
+		self.streamer.stop()
+		for pos in self.loaded:
+			self.background.removeChunk(pos)
+			self.mask.removeChunk(pos)
+		self.loaded = {}
+		self.center = None
@@ -5,9 +5,12 @@ import random
 
 import config
 import errors
-from mask import maskFromSurface
 from items.factory import ItemFactory
 from quests import loadQuest
+from mask import BoundaryField, ChunkedMask
+from spatial import SpatialGrid
+from triggers import TriggerIndex
+from timers import TimerWheel
 
 ## The engine that haddles all of the overworld game logic.
 class GameEngine(object):
@@ -26,15 +29,31 @@ class GameEngine(object):
 		self.loadNewAreaFunc = loadNewAreaFunc
 		self.physics=physics
 		self.actors = []
+		self.actorIDs = {}
+		self.actorGrid = SpatialGrid()
 		self.NPCs = []
 		self.player = player
 		self.party = []
 		self.triggers = []
+		self.triggerIndex = TriggerIndex()
+		self.pushables = []
+		self.pushedPositions = {}
+		self.stateWatchers = {}
+		self.unmetStates = {}
+		self.readyStates = set()
+		self.levelMask = None
 		self.boundaries = None
+		self.boundaryField = None
+		self.bakedActors = {}
+		self.bakeNeeded = False
 		self.savedStates = {}
+		self.chunkActors = {}
+		self.loadedChunks = set()
 
 		self.battleFunc = battleFunc
-		self.timeToBattle = 5*random.random()+5
+		self.timers = TimerWheel()
+		self.walkTimers = TimerWheel()
+		self.walkTimers.schedule(5*random.random()+5,self.randomEncounter)
 		self.enemies = []
 		self.battleBG = []
 
@@ -45,13 +64,42 @@ class GameEngine(object):
 		self.level = level
 		if self.savedStates.keys().__contains__(self.level):
 			for key in self.savedStates[self.level].keys():
-				for actor in self.actors:
-					if actor.ID == key:
-						if type(actor)==Pushable:
-							actor.setState(self.savedStates[self.level][key][0])
-							actor.setPos(self.savedStates[self.level][key][1])
-						else:
-							actor.setState(self.savedStates[self.level][key])
+				for actor in self.getActorsByID(key):
+					self.restoreState(actor)
+		for trigger in self.unmetStates.keys():	#The actors of unloaded chunks are counted in the states saved for this level.
+			self.setUnmetStates(trigger,self.countUnmetStates(trigger))
+		self.bakeActors()
+
+	## Puts an actor back into the state it was saved in when the current level was last left, if any.
+	def restoreState(self,actor):
+		saved = self.savedStates.get(self.level,{})
+		if actor.ID in saved:
+			if type(actor)==Pushable:
+				actor.setState(saved[actor.ID][0])
+				actor.setPos(saved[actor.ID][1])
+			else:
+				actor.setState(saved[actor.ID])
+
+	## Returns the state an actor of an unloaded chunk will be put in when its chunk is loaded, see restoreState().
+	#
+	#  @param ID The actor's ID.
+	#  @param state The state the actor starts in.
+	def getAbsentState(self,ID,state):
+		saved = self.savedStates.get(self.level,{})
+		if ID in saved:
+			if isinstance(saved[ID],list):	#Pushables are saved with their position.
+				return saved[ID][0]
+			return saved[ID]
+		return state
+
+	## Saves the state of an actor which is being removed, so it can be restored by restoreState().
+	def saveState(self,actor):
+		if actor.rememberState:
+			saved = self.savedStates.setdefault(self.level,{})
+			if type(actor)==Pushable:
+				saved[actor.ID]=[actor.getState(),actor.getPos()]
+			else:
+				saved[actor.ID]=actor.getState()
 
 	## Sets the list of battle backgrounds that can be picked from.
 	def setBattleBG(self,battleBG):
@@ -63,56 +111,261 @@ class GameEngine(object):
 
 	## Sets the boundaries for this level.
 	#
-	#  @param mask The path to the image that describes the boundaries of this level.
+	#  @param mask The mask that describes the boundaries of this level, see game.mask.loadMask().
 	def setMask(self,mask):
 		if self.physics:
-			if mask != None:
-				try:
-					self.boundaries = maskFromSurface(mask)
-				except pygame.error:
-					self.boundaries = None
+			self.levelMask = mask
+		else:
+			self.levelMask = None
+		self.bakedActors = {}
+		self.buildBoundaries()
+
+	## Returns whether or not an actor can be merged into the boundaries.
+	#
+	#  Only actors which can never move or change their mask are merged, that is actors which are not
+	#  Pushable, have no speed, and have a single mask.
+	def isStatic(self,actor):
+		return not isinstance(actor,Pushable) and actor.spd == 0 and not actor.moving and len(actor.mask) == 1 and actor.getMask() != None and actor.getX() >= 0 and actor.getY() >= 0
+
+	## Merges the masks of static actors into the boundaries, see isStatic().
+	#
+	#  Merged actors are no longer updated or tested on their own in moveCheck(), which only has to test
+	#  the boundaries. If a merged actor's state or position changes it is split off again by update().
+	#  Called by loadLevel() once the level's saved states have been applied.
+	#
+	#  Actors are not merged in chunked levels, whose boundaries change as chunks are loaded.
+	def bakeActors(self):
+		if not self.physics or isinstance(self.levelMask,ChunkedMask):
+			return
+		for actor in self.actors:
+			if actor not in self.bakedActors and self.isStatic(actor):
+				if self.levelMask != None:
+					width,height = self.levelMask.get_size()
+					if actor.getX()+actor.getMask().get_size()[0] > width or actor.getY()+actor.getMask().get_size()[1] > height:	#Parts outside of the boundaries would be lost.
+						continue
+				self.bakedActors[actor] = (actor.state,actor.x,actor.y)
+				self.actorGrid.remove(actor)
+				actor.graphicObject.setPos([actor.getX(),actor.getY()])
+		self.buildBoundaries()
+
+	## Splits a merged actor off of the boundaries, it will be updated and tested on its own again.
+	def unbakeActor(self,actor):
+		del self.bakedActors[actor]
+		self.placeActor(actor)
+		self.bakeNeeded = True
+
+	## Builds the boundaries from the level's mask and the masks of the merged actors.
+	def buildBoundaries(self):
+		self.bakeNeeded = False
+		if len(self.bakedActors) == 0:
+			self.boundaries = self.levelMask
+		else:
+			if self.levelMask != None:
+				size = self.levelMask.get_size()
 			else:
-				self.boundaries = None
+				size = (max(actor.getX()+actor.getMask().get_size()[0] for actor in self.bakedActors),max(actor.getY()+actor.getMask().get_size()[1] for actor in self.bakedActors))
+			self.boundaries = pygame.mask.Mask(size)
+			if self.levelMask != None:
+				self.boundaries.draw(self.levelMask,(0,0))	#The level's mask is shared, see game.mask.loadMask(), so it is copied rather than drawn on.
+			for actor in self.bakedActors:
+				self.boundaries.draw(actor.getMask(),(actor.getX(),actor.getY()))
+		if self.boundaries != None:
+			self.boundaryField = BoundaryField(self.boundaries)
 		else:
-			self.boundaries=None
+			self.boundaryField = None
 
 	## Adds an actor to the current level.
 	#
 	# @param actor The actor to be added.
 	def addActor(self,actor):
 		self.actors.append(actor)
+		if actor.getID() not in self.actorIDs:
+			self.actorIDs[actor.getID()] = []
+		self.actorIDs[actor.getID()].append(actor)
+		if isinstance(actor,Pushable):
+			self.pushables.append(actor)
+		actor.setStateChangeFunc(self.stateChanged)
+		for trigger in self.stateWatchers.get(actor.getID(),()):
+			if actor.state != trigger.getState():
+				self.setUnmetStates(trigger,self.unmetStates[trigger]+1)
+		self.placeActor(actor)
+
+	## Removes an actor from the current level, saving its state, see restoreState().
+	#
+	#  @param actor The actor to be removed.
+	def removeActor(self,actor):
+		self.saveState(actor)
+		actor.setStateChangeFunc(None)
+		self.actors.remove(actor)
+		self.actorIDs[actor.getID()].remove(actor)
+		if len(self.actorIDs[actor.getID()]) == 0:
+			del self.actorIDs[actor.getID()]
+		if isinstance(actor,Pushable):
+			self.pushables.remove(actor)
+			self.pushedPositions.pop(actor,None)
+			if self.player != None and self.player.getPushing() == actor:
+				self.player.setPushing(None)
+		for trigger in self.stateWatchers.get(actor.getID(),()):
+			if actor.state != trigger.getState():
+				self.setUnmetStates(trigger,self.unmetStates[trigger]-1)
+		self.actorGrid.remove(actor)
+		if actor in self.bakedActors:
+			del self.bakedActors[actor]
+			self.bakeNeeded = True
+
+	## Sets which actors are in each chunk of a chunked level, every chunk starts out unloaded.
+	#
+	#  SBSC triggers count the actors of unloaded chunks as being in the state they will be put in when
+	#  their chunk is loaded, so they do not fire because the actors they depend on are not loaded.
+	#  Should be called before the level's triggers are added.
+	#
+	#  @param chunkActors A dictionary mapping each chunk's (column, row) to a list of (ID, state) pairs
+	#  for the actors in it which SBSC triggers depend on, see game.level.compileChunkActors().
+	def setChunkActors(self,chunkActors):
+		self.chunkActors = chunkActors
+		self.loadedChunks = set()
+
+	## Adds a chunk of a chunked level, see game.chunks.
+	#
+	#  The chunk's actors are put back into the states they were saved in when the chunk was last unloaded.
+	def addChunk(self,chunk):
+		if isinstance(self.levelMask,ChunkedMask):
+			self.levelMask.setChunk(chunk.pos,chunk.mask)
+			self.buildBoundaries()
+		for actor in chunk.actors:
+			self.restoreState(actor)
+			self.addActor(actor)
+		self.loadedChunks.add(chunk.pos)
+		self.countAbsentActors(self.chunkActors.get(chunk.pos,()),-1)
+
+	## Removes a chunk of a chunked level, see game.chunks.
+	def removeChunk(self,chunk):
+		for actor in chunk.actors:
+			self.removeActor(actor)
+		if isinstance(self.levelMask,ChunkedMask):
+			self.levelMask.removeChunk(chunk.pos)
+			self.buildBoundaries()
+		self.loadedChunks.discard(chunk.pos)
+		self.countAbsentActors(self.chunkActors.get(chunk.pos,()),1)
+
+	## Adds or takes away the actors of an unloaded chunk from the counts of the SBSC triggers depending on them.
+	#
+	#  @param actors A list of (ID, state) pairs, see setChunkActors().
+	#  @param sign 1 when the chunk is unloaded, -1 when it is loaded.
+	def countAbsentActors(self,actors,sign):
+		for ID,state in actors:
+			for trigger in self.stateWatchers.get(ID,()):
+				if self.getAbsentState(ID,state) != trigger.getState():
+					self.setUnmetStates(trigger,self.unmetStates[trigger]+sign)
+
+	## Returns a list of the actors in the current level with the ID @c Id, in the order they were added.
+	def getActorsByID(self,Id):
+		return self.actorIDs.get(Id,())
+
+	## Updates where an actor's mask is in the actor grid used by moveCheck().
+	#
+	#  Called for every actor each update(), anything moving actors or changing their states outside of
+	#  update() should call this afterwards.
+	#
+	#  @param actor The actor that has moved.
+	def placeActor(self,actor):
+		if actor in self.bakedActors:
+			return
+		mask = actor.getMask()
+		if mask == None:
+			self.actorGrid.remove(actor)
+		else:
+			self.actorGrid.update(actor,(actor.getX(),actor.getY())+mask.get_size())
 
 	## Adds a NPC to the current level.
 	#
 	# @param NPC The NPC to be added.
 	def addNPC(self,NPC):
 		self.NPCs.append(NPC)
+		NPC.setTimers(self.timers)
 
 	## Removes all NPCs in the current level.
 	def clearNPCs(self):
+		for NPC in self.NPCs:
+			NPC.setTimers(None)
 		self.NPCs = []
 
 	## Removes all actors in the current level.
 	def clearActors(self):
-		self.savedStates[self.level]={}
 		for actor in self.actors:
-			if actor.rememberState:
-				if type(actor)==Pushable:
-					self.savedStates[self.level][actor.ID]=[actor.getState(),actor.getPos()]
-				else:
-					self.savedStates[self.level][actor.ID]=actor.getState()
+			actor.setStateChangeFunc(None)
+			self.saveState(actor)
 
 		self.actors = []
+		self.actorIDs = {}	#Replaced rather than cleared, triggers from the previous level may still hold on to it.
+		self.actorGrid.clear()
+		self.pushables = []
+		self.pushedPositions = {}
+		for trigger in self.unmetStates.keys():
+			self.setUnmetStates(trigger,0)
+		self.chunkActors = {}
+		self.loadedChunks = set()
+		if len(self.bakedActors) > 0:
+			self.bakedActors = {}
+			self.buildBoundaries()
 
 	## Removes all triggers in the current level.
 	def clearTriggers(self):
+		for trigger in self.triggers:
+			if trigger.getEffect() == "TBSC":
+				trigger.setTimers(None)
 		self.triggers = []
+		self.triggerIndex.clear()
+		self.stateWatchers = {}
+		self.unmetStates = {}
+		self.readyStates = set()
 
 	## Adds a trigger to the current level.
 	#
 	# @param trigger The trigger to be added.
 	def addTrigger(self,trigger):
 		self.triggers.append(trigger)
+		self.triggerIndex.add(trigger)
+		if trigger.getEffect() == "TBSC":
+			trigger.setTimers(self.timers)
+		if trigger.getEffect() == "SBSC":
+			for ID in set(trigger.getNeededStates()):
+				if ID not in self.stateWatchers:
+					self.stateWatchers[ID] = []
+				self.stateWatchers[ID].append(trigger)
+			self.setUnmetStates(trigger,self.countUnmetStates(trigger))
+
+	## Counts how many of the actors an SBSC trigger depends on are not in the state it needs.
+	#
+	#  Actors in unloaded chunks are counted by the state they will be put in when their chunk is loaded.
+	def countUnmetStates(self,trigger):
+		IDs = set(trigger.getNeededStates())
+		unmet = len([actor for ID in IDs for actor in self.getActorsByID(ID) if actor.state != trigger.getState()])
+		for pos,actors in self.chunkActors.iteritems():
+			if pos not in self.loadedChunks:
+				unmet += len([ID for ID,state in actors if ID in IDs and self.getAbsentState(ID,state) != trigger.getState()])
+		return unmet
+
+	## Called by actors in the current level whenever their state changes.
+	#
+	#  Keeps count of how many of the actors each SBSC trigger depends on are not in the state it needs,
+	#  so SBSC triggers only have to be checked when that count reaches zero.
+	#
+	#  @param actor The actor whose state changed.
+	#  @param oldState The actor's previous state.
+	def stateChanged(self,actor,oldState):
+		for trigger in self.stateWatchers.get(actor.getID(),()):
+			self.setUnmetStates(trigger,self.unmetStates[trigger]+(actor.state != trigger.getState())-(oldState != trigger.getState()))
+
+	## Sets how many of the actors an SBSC trigger depends on are not in the state it needs.
+	#
+	#  Triggers with none left are checked by update() until they have been triggered for good.
+	def setUnmetStates(self,trigger,unmet):
+		self.unmetStates[trigger] = unmet
+		if unmet == 0:
+			self.readyStates.add(trigger)
+		else:
+			self.readyStates.discard(trigger)
 
 	## Defines who the main player is.
 	#
@@ -130,21 +383,7 @@ class GameEngine(object):
 	def trigger(self,Id):
 		for trigger in self.triggers:
 			if trigger.getID() == Id:
-				if trigger.getEffect() == "Area Change":
-					self.loadNewAreaFunc(trigger.getNewAreaXML(),trigger.getNewArea())
-					self.player.setPos(trigger.getPlayerPos())
-				elif trigger.getEffect() == "Battle":
-					if not trigger.trigger():
-						self.battle(trigger.getEnemies(),trigger.getBG(),trigger.getBGFar(),trigger.getRandom())
-				elif trigger.getEffect() == "Item":
-					if not trigger.trigger():
-						item = ItemFactory.createItem(*trigger.getItem())
-						self.player.getParent().getInventory().addItem(item)
-				elif trigger.getEffect() == "Quest Complete":
-					if not trigger.trigger():
-						self.questAction(["Complete",trigger.getQuestXML(),trigger.getQuest(),trigger.getObjective()])
-				else:
-					trigger.trigger(self.player,self.actors)
+				trigger.fire(self,self.player)
 
 	## Carries out the quest action contained in @c action
 	#
@@ -202,24 +441,8 @@ class GameEngine(object):
 	#
 	#  @param interactor The actor attempting to interact.
 	def interact(self,interactor):
-		for trigger in self.triggers:
-			if trigger.getType() == "Action":
-				if trigger.getArea().collidepoint(interactor.getCenter()):
-					if trigger.getEffect() == "Area Change":
-						self.loadNewAreaFunc(trigger.getNewAreaXML(),trigger.getNewArea())
-						self.player.setPos(trigger.getPlayerPos())
-					elif trigger.getEffect() == "Battle":
-						if not trigger.trigger():
-							self.battle(trigger.getEnemies(),trigger.getBG(),trigger.getBGFar(),trigger.getRandom())
-					elif trigger.getEffect() == "Item":
-						if not trigger.trigger():
-							item = ItemFactory.createItem(*trigger.getItem())
-							self.player.getParent().getInventory().addItem(item)
-					elif trigger.getEffect() == "Quest Complete":
-						if not trigger.trigger():
-							self.questAction(["Complete",trigger.getQuestXML(),trigger.getQuest(),trigger.getObjective()])
-					else:
-						trigger.trigger(interactor,self.actors)
+		for trigger in self.triggerIndex.query("Action",interactor.getCenter()):
+			trigger.fire(self,interactor)
 		if interactor.getID()=="Player":
 			for NPC in self.NPCs:
 				if NPC.getGameObject().getDistance(interactor)<20 and NPC.getDialog() != None:
@@ -247,6 +470,20 @@ class GameEngine(object):
 							interactor.setPushing(actor)
 							interactor.setPushDir([False,True])
 
+	## Returns the pushable actors which have moved since the last call, in the same order as self.actors.
+	#
+	#  Actors added since the last call count as having moved. A pushable that has stopped moving has
+	#  already been checked against the "Object Position" triggers where it is.
+	def getMovedPushables(self):
+		moved = []
+		for actor in self.pushables:
+			if actor.isPushable():
+				pos = (actor.x,actor.y)
+				if self.pushedPositions.get(actor) != pos:
+					self.pushedPositions[actor] = pos
+					moved.append(actor)
+		return moved
+
 	## Checks if the actor can move in the directions it is trying to move in.
 	#
 	#  @param mask A bit mask of the actor.
@@ -256,11 +493,12 @@ class GameEngine(object):
 	#  @return Returns a list of booleans representing if that direction can be moved in.
 	def moveCheck(self,mask,pos,vel):
 		ret = [True,True]
+		if self.bakeNeeded:
+			self.buildBoundaries()
 		if mask!=None:
 			if self.boundaries!=None:
 				if self.boundaries.overlap(mask,pos):
-					dx = self.boundaries.overlap_area(mask,(pos[0]+1,pos[1])) - self.boundaries.overlap_area(mask,(pos[0]-1,pos[1]))
-					dy = self.boundaries.overlap_area(mask,(pos[0],pos[1]+1)) - self.boundaries.overlap_area(mask,(pos[0],pos[1]-1))
+					dx,dy = self.boundaryField.getPushBack(mask,pos)
 
 					if dx!=0 and vel[0]!=0:
 						if dx/abs(dx)==vel[0]/abs(vel[0]):
@@ -268,7 +506,8 @@ class GameEngine(object):
 					if dy!=0 and vel[1]!=0:
 						if dy/abs(dy)==vel[1]/abs(vel[1]):
 							ret[1]=False
-			for actor in self.actors:
+			size = mask.get_size()
+			for actor in self.actorGrid.query((pos[0]-1,pos[1]-1,size[0]+2,size[1]+2)):	#Only actors next to the mask can affect the result, even one pixel over.
 				if actor.getMask() != None:
 					if actor.getMask().overlap(mask,[pos[0]-actor.getX(),pos[1]-actor.getY()]):
 						dx = actor.getMask().overlap_area(mask,(pos[0]-actor.getX()+1,pos[1]-actor.getY())) - actor.getMask().overlap_area(mask,(pos[0]-actor.getX()-1,pos[1]-actor.getY()))
@@ -297,6 +536,17 @@ class GameEngine(object):
 				enemies.append(random.choice(self.enemies))
 		self.battleFunc(enemies,bg,bgFar)
 
+	## Starts a random encounter, called by self.walkTimers once the player has walked far enough.
+	def randomEncounter(self):
+		bg = random.choice(self.battleBG)
+		self.battle(self.enemies,bg[0],bg[1],True)
+		if config.Difficulty == 1:
+			self.walkTimers.schedule(5*random.random()+10,self.randomEncounter)
+		elif config.Difficulty == 5:
+			self.walkTimers.schedule(5*random.random()+5,self.randomEncounter)
+		else:
+			self.walkTimers.schedule(5*random.random()+7.5,self.randomEncounter)
+
 	## Causes the party to sleep.
 	#
 	#  Recovers HP and cures status ailements. Costs 25 gold.
@@ -311,62 +561,61 @@ class GameEngine(object):
 	#  @param tick How much time has passed since the last update() call was made.
 	#    In milliseconds.
 	def update(self,tick):
-		if len(self.enemies)>0 and config.Difficulty > 0:
-			if self.timeToBattle >= 0:
-				if self.player.getMoving():
-					self.timeToBattle -= tick
+		if len(self.enemies)>0 and config.Difficulty > 0 and self.player.getMoving():	#Time only counts towards random encounters while walking.
+			self.walkTimers.advance(tick)
+
+		bakedActors = self.bakedActors
+		for actor in self.actors:	#States may have changed since the last update, e.g. by triggers or loadLevel().
+			if actor in bakedActors:
+				if bakedActors[actor] != (actor.state,actor.x,actor.y):
+					self.unbakeActor(actor)
 			else:
-				bg = random.choice(self.battleBG)
-				self.battle(self.enemies,bg[0],bg[1],True)
-				if config.Difficulty == 1:
-					self.timeToBattle = 5*random.random()+10
-				elif config.Difficulty == 5:
-					self.timeToBattle = 5*random.random()+5
-				else:
-					self.timeToBattle = 5*random.random()+7.5
-
-
+				self.placeActor(actor)
 		self.player.update(tick,self.moveCheck)
+		if self.player.getPushing() != None:
+			self.placeActor(self.player.getPushing())
 		for actor in self.actors:
+			if actor in bakedActors:	#Merged actors cannot move, see bakeActors().
+				continue
 			actor.update(tick,self.moveCheck)
+			self.placeActor(actor)
 		for NPC in self.NPCs:
 			NPC.update(tick,self.moveCheck)
-		for trigger in self.triggers:
-			if trigger.getType() == "Position":
-				if trigger.getArea().collidepoint(self.player.getCenter()):
-					if trigger.getEffect() == "Area Change":
-						self.loadNewAreaFunc(trigger.getNewAreaXML(),trigger.getNewArea())
-						self.player.setPos(trigger.getPlayerPos())
-					elif trigger.getEffect() == "Battle":
-						if not trigger.trigger():
-							self.battle(trigger.getEnemies(),trigger.getBG(),trigger.getBGFar(),trigger.getRandom())
-					elif trigger.getEffect() == "Item":
-						if not trigger.trigger():
-							item = ItemFactory.createItem(*trigger.getItem())
-							self.player.getParent().getInventory().addItem(item)
-					elif trigger.getEffect() == "Quest Complete":
-						if not trigger.trigger():
-							self.questAction(["Complete",trigger.getQuestXML(),trigger.getQuest(),trigger.getObjective()])
-					else:
-						trigger.trigger(self.player,self.actors)
-			elif trigger.getType() == "Object Position":
-				for actor in self.actors:
-					if actor.isPushable():
-						if trigger.getArea().collidepoint(actor.getCenter()):
-							trigger.trigger(actor,self.actors)
-							actor.pushable=False
-							actor.togglePushed()
-							self.player.setPushing(None)
-			if trigger.getEffect() == "SBSC":
-				Pass = True
-				for actor in self.actors:
-					if trigger.getNeededStates().__contains__(actor.getID()):
-						if actor.state != trigger.getState():
-							Pass=False
-				if Pass:
-					trigger.trigger(self.player,self.actors)
-			elif trigger.getEffect() == "TBSC":
-				trigger.update(tick,self.actors)
+
+		#Only triggers which could do something this frame are gone through, in the same order as self.triggers.
+		#Each is paired with the check for its type and what activated it.
+		candidates = [(trigger,self.positionReached,self.player) for trigger in self.triggerIndex.query("Position",self.player.getCenter())]
+		for actor in self.getMovedPushables():
+			candidates.extend((trigger,self.objectMoved,actor) for trigger in self.triggerIndex.query("Object Position",actor.getCenter()))
+		candidates.extend((trigger,self.statesMet,self.player) for trigger in self.readyStates)
+		if len(candidates) > 1:
+			candidates.sort(key=lambda candidate: self.triggerIndex.getOrder(candidate[0]))
+		for trigger,check,triggerer in candidates:
+			check(trigger,triggerer)
+		self.timers.advance(tick)
+
+	## Fires a "Position" trigger if the player is still inside of it, see update().
+	def positionReached(self,trigger,player):
+		if trigger.getArea().collidepoint(player.getCenter()):
+			trigger.fire(self,player)
+
+	## Fires an "Object Position" trigger if a pushable moved into it, see update().
+	#
+	#  The pushable is locked in place.
+	def objectMoved(self,trigger,actor):
+		if actor.isPushable():
+			if trigger.getArea().collidepoint(actor.getCenter()):
+				trigger.fire(self,actor)
+				actor.pushable=False
+				actor.togglePushed()
+				self.player.setPushing(None)
+
+	## Fires an SBSC trigger if all of its actors are still in its state, see update().
+	def statesMet(self,trigger,player):
+		if self.unmetStates.get(trigger) == 0:	#The level may have changed earlier this frame.
+			trigger.fire(self,player)
+			if trigger.triggered and not trigger.getAutoReset():
+				self.readyStates.discard(trigger)
 
 ## A container which contains information for game objects.
 class GameObject(object):
@@ -388,6 +637,7 @@ class GameObject(object):
 
 		self.state=state
 		self.rememberState=rememberState
+		self.stateChangeFunc = None
 
 		self.pushing = None
 		self.pushDir = [False,False]
@@ -417,8 +667,17 @@ class GameObject(object):
 		return self.state
 
 	def setState(self,state):
+		oldState = self.state
 		self.state=state
 		self.graphicObject.setState(state)
+		if self.stateChangeFunc != None and oldState != state:
+			self.stateChangeFunc(self,oldState)
+
+	## Sets the function called whenever this object's state changes.
+	#
+	#  The function is passed this object and its previous state, see GameEngine.stateChanged().
+	def setStateChangeFunc(self,func):
+		self.stateChangeFunc = func
 
 	def getParent(self):
 		return self.parent
@@ -1,11 +1,12 @@
 import pygame
 
 from item import Item
+from graphics.assets import AssetCache
 import config
 
 class GreenSlimeball(Item):
 	def __init__(self,amount=1):
-		Item.__init__(self,"Green Slime",pygame.image.load(config.AssetPath+"Icons/Items/Brewing/GreenSlimeball.png").convert_alpha(),"Craftable",2,amount)
+		Item.__init__(self,"Green Slime",AssetCache.load(config.AssetPath+"Icons/Items/Brewing/GreenSlimeball.png"),"Craftable",2,amount)
 
 	## see Item.getUsable().
 	def getUsable(self):
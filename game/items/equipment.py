@@ -2,6 +2,7 @@ import pygame
 from pygame.locals import *
 
 from item import Item
+from graphics.assets import AssetCache
 import config
 
 class Equipment(Item):
@@ -138,7 +139,7 @@ class IronShortSword(OHSword):
 	#  @param amount Amount of the item in this stack/inventory.
 	def __init__(self):
 		hitbox = [pygame.rect.Rect([-2,0,31,67]),pygame.rect.Rect([24,0,31,67])]
-		OHSword.__init__(self,"Iron Short Sword",pygame.image.load(config.AssetPath+"Icons/Items/Weapons/IronShortSword.png"),{"Atk":10},hitbox,5,"Battle/Arms/Swords/IronShortSword/IronShortSword.xml",1000)
+		OHSword.__init__(self,"Iron Short Sword",AssetCache.load(config.AssetPath+"Icons/Items/Weapons/IronShortSword.png","raw"),{"Atk":10},hitbox,5,"Battle/Arms/Swords/IronShortSword/IronShortSword.xml",1000)
 
 ##Wooden Short Sword
 class WoodenShortSword(OHSword):
@@ -148,7 +149,7 @@ class WoodenShortSword(OHSword):
 	#  @param amount Amount of the item in this stack/inventory.
 	def __init__(self):
 		hitbox = [pygame.rect.Rect([-2,0,31,67]),pygame.rect.Rect([24,0,31,67])]
-		OHSword.__init__(self,"Wooden Short Sword",pygame.image.load(config.AssetPath+"Icons/Items/Weapons/WoodenShortSword.png"),{"Atk":1},hitbox,5,"Battle/Arms/Swords/WoodenShortSword/WoodenShortSword.xml",100)
+		OHSword.__init__(self,"Wooden Short Sword",AssetCache.load(config.AssetPath+"Icons/Items/Weapons/WoodenShortSword.png","raw"),{"Atk":1},hitbox,5,"Battle/Arms/Swords/WoodenShortSword/WoodenShortSword.xml",100)
 
 #Bows:
 
@@ -157,18 +158,18 @@ class WoodenShortBow(Bow):
 
 	## Constructor
 	def __init__(self):
-		Bow.__init__(self,"Wooden Short Bow",pygame.image.load(config.AssetPath+"Icons/Items/Weapons/WoodenShortBow.png"),{"Atk":1},2,"Battle/Arms/Bows/WoodenShortBow/WoodenShortBow.xml",100)
+		Bow.__init__(self,"Wooden Short Bow",AssetCache.load(config.AssetPath+"Icons/Items/Weapons/WoodenShortBow.png","raw"),{"Atk":1},2,"Battle/Arms/Bows/WoodenShortBow/WoodenShortBow.xml",100)
 
 #Armor (Chest):
 class LeatherTunic(Body):
 	def __init__(self,color,amount=1):
-		Body.__init__(self,color+" Leather Tunic",pygame.image.load(config.AssetPath+"Icons/Items/Armor/LeatherTunic.png").convert_alpha(),{"Def":1},200,amount)
+		Body.__init__(self,color+" Leather Tunic",AssetCache.load(config.AssetPath+"Icons/Items/Armor/LeatherTunic.png").copy(),{"Def":1},200,amount)
 		self.color=pygame.Color(color)
 		self.sprite.fill(self.color,special_flags=BLEND_RGBA_MULT)
 
 class IronChestplate(Body):
 	def __init__(self,amount=1):
-		Body.__init__(self,"Iron Chestplate",pygame.image.load(config.AssetPath+"Icons/Items/Armor/IronChestplate.png").convert_alpha(),{"Def":5},1000,amount)
+		Body.__init__(self,"Iron Chestplate",AssetCache.load(config.AssetPath+"Icons/Items/Armor/IronChestplate.png"),{"Def":5},1000,amount)
 
 #Weapon Styles:
 
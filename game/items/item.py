@@ -1,6 +1,7 @@
 import pygame
 from pygame.locals import *
 
+from graphics.assets import AssetCache
 import config
 
 #Archtypes:
@@ -65,7 +66,7 @@ class Item(object):
 
 class EmptyPotion(Item):
 	def __init__(self,amount=1):
-		Item.__init__(self,"Empty Potion",pygame.image.load(config.AssetPath+"Icons/Items/Potions/PotionEmpty.png").convert_alpha(),"Potions",10,amount)
+		Item.__init__(self,"Empty Potion",AssetCache.load(config.AssetPath+"Icons/Items/Potions/PotionEmpty.png"),"Potions",10,amount)
 
 	## see Item.getUsable().
 	def getUsable(self):
@@ -74,7 +75,7 @@ class EmptyPotion(Item):
 
 class StrangePotion(Item):
 	def __init__(self,amount=1):
-		Item.__init__(self,"Strange Potion",pygame.image.load(config.AssetPath+"Icons/Items/Potions/PotionStrange.png").convert_alpha(),"Potion",-1,amount)
+		Item.__init__(self,"Strange Potion",AssetCache.load(config.AssetPath+"Icons/Items/Potions/PotionStrange.png"),"Potion",-1,amount)
 
 	def getDescription(self):
 		return "A strange potion with unknown effects."
@@ -86,77 +87,77 @@ class StrangePotion(Item):
 #Test Items
 class Test(Item):
 	def __init__(self,amount=1):
-		Item.__init__(self,"Test",pygame.image.load(config.AssetPath+"Icons/Items/Potions/PotionEmpty.png").convert_alpha(),"Potion",10,amount)
+		Item.__init__(self,"Test",AssetCache.load(config.AssetPath+"Icons/Items/Potions/PotionEmpty.png"),"Potion",10,amount)
 	## see Item.getUsable().
 	def getUsable(self):
 		return False
 
 class Test1(Item):
 	def __init__(self,amount=1):
-		Item.__init__(self,"Test1",pygame.image.load(config.AssetPath+"Icons/Items/Potions/PotionEmpty.png").convert_alpha(),"Potion",10,amount)
+		Item.__init__(self,"Test1",AssetCache.load(config.AssetPath+"Icons/Items/Potions/PotionEmpty.png"),"Potion",10,amount)
 	## see Item.getUsable().
 	def getUsable(self):
 		return False
 
 class Test2(Item):
 	def __init__(self,amount=1):
-		Item.__init__(self,"Test2",pygame.image.load(config.AssetPath+"Icons/Items/Potions/PotionEmpty.png").convert_alpha(),"Potion",10,amount)
+		Item.__init__(self,"Test2",AssetCache.load(config.AssetPath+"Icons/Items/Potions/PotionEmpty.png"),"Potion",10,amount)
 	## see Item.getUsable().
 	def getUsable(self):
 		return False
 
 class Test3(Item):
 	def __init__(self,amount=1):
-		Item.__init__(self,"Test3",pygame.image.load(config.AssetPath+"Icons/Items/Potions/PotionEmpty.png").convert_alpha(),"Potion",10,amount)
+		Item.__init__(self,"Test3",AssetCache.load(config.AssetPath+"Icons/Items/Potions/PotionEmpty.png"),"Potion",10,amount)
 	## see Item.getUsable().
 	def getUsable(self):
 		return False
 
 class Test4(Item):
 	def __init__(self,amount=1):
-		Item.__init__(self,"Test4",pygame.image.load(config.AssetPath+"Icons/Items/Potions/PotionEmpty.png").convert_alpha(),"Potion",10,amount)
+		Item.__init__(self,"Test4",AssetCache.load(config.AssetPath+"Icons/Items/Potions/PotionEmpty.png"),"Potion",10,amount)
 	## see Item.getUsable().
 	def getUsable(self):
 		return False
 
 class Test5(Item):
 	def __init__(self,amount=1):
-		Item.__init__(self,"Test5",pygame.image.load(config.AssetPath+"Icons/Items/Potions/PotionEmpty.png").convert_alpha(),"Potion",10,amount)
+		Item.__init__(self,"Test5",AssetCache.load(config.AssetPath+"Icons/Items/Potions/PotionEmpty.png"),"Potion",10,amount)
 	## see Item.getUsable().
 	def getUsable(self):
 		return False
 
 class Test6(Item):
 	def __init__(self,amount=1):
-		Item.__init__(self,"Test6",pygame.image.load(config.AssetPath+"Icons/Items/Potions/PotionEmpty.png").convert_alpha(),"Potion",10,amount)
+		Item.__init__(self,"Test6",AssetCache.load(config.AssetPath+"Icons/Items/Potions/PotionEmpty.png"),"Potion",10,amount)
 	## see Item.getUsable().
 	def getUsable(self):
 		return False
 
 class Test7(Item):
 	def __init__(self,amount=1):
-		Item.__init__(self,"Test7",pygame.image.load(config.AssetPath+"Icons/Items/Potions/PotionEmpty.png").convert_alpha(),"Potion",10,amount)
+		Item.__init__(self,"Test7",AssetCache.load(config.AssetPath+"Icons/Items/Potions/PotionEmpty.png"),"Potion",10,amount)
 	## see Item.getUsable().
 	def getUsable(self):
 		return False
 
 class Test8(Item):
 	def __init__(self,amount=1):
-		Item.__init__(self,"Test8",pygame.image.load(config.AssetPath+"Icons/Items/Potions/PotionEmpty.png").convert_alpha(),"Potion",10,amount)
+		Item.__init__(self,"Test8",AssetCache.load(config.AssetPath+"Icons/Items/Potions/PotionEmpty.png"),"Potion",10,amount)
 	## see Item.getUsable().
 	def getUsable(self):
 		return False
 
 class Test9(Item):
 	def __init__(self,amount=1):
-		Item.__init__(self,"Test9",pygame.image.load(config.AssetPath+"Icons/Items/Potions/PotionEmpty.png").convert_alpha(),"Potion",10,amount)
+		Item.__init__(self,"Test9",AssetCache.load(config.AssetPath+"Icons/Items/Potions/PotionEmpty.png"),"Potion",10,amount)
 	## see Item.getUsable().
 	def getUsable(self):
 		return False
 
 class Test10(Item):
 	def __init__(self,amount=1):
-		Item.__init__(self,"Test10",pygame.image.load(config.AssetPath+"Icons/Items/Potions/PotionEmpty.png").convert_alpha(),"Potion",10,amount)
+		Item.__init__(self,"Test10",AssetCache.load(config.AssetPath+"Icons/Items/Potions/PotionEmpty.png"),"Potion",10,amount)
 	## see Item.getUsable().
 	def getUsable(self):
 		return False
@@ -2,6 +2,7 @@ import pygame
 from pygame.locals import *
 
 from item import Item
+from graphics.assets import AssetCache
 import config
 
 class Potion(Item):
@@ -50,12 +51,12 @@ class Potion(Item):
 
 class HealthPotion(Potion):
 	def __init__(self,amount=1):
-		Potion.__init__(self,"Health Potion",pygame.image.load(config.AssetPath+"Icons/Items/Potions/PotionHealth.png").convert_alpha(),"HP",25,50,amount)
+		Potion.__init__(self,"Health Potion",AssetCache.load(config.AssetPath+"Icons/Items/Potions/PotionHealth.png"),"HP",25,50,amount)
 
 class ManaPotion(Potion):
 	def __init__(self,amount=1):
-		Potion.__init__(self,"Mana Potion",pygame.image.load(config.AssetPath+"Icons/Items/Potions/PotionMana.png").convert_alpha(),"MP",25,50,amount)
+		Potion.__init__(self,"Mana Potion",AssetCache.load(config.AssetPath+"Icons/Items/Potions/PotionMana.png"),"MP",25,50,amount)
 		
 class ElixirPotion(Potion):
 	def __init__(self,amount=1):
-		Potion.__init__(self,"Elixir",pygame.image.load(config.AssetPath+"Icons/Items/Potions/PotionElixir.png").convert_alpha(),"HP/MP",50,300,amount)
+		Potion.__init__(self,"Elixir",AssetCache.load(config.AssetPath+"Icons/Items/Potions/PotionElixir.png"),"HP/MP",50,300,amount)
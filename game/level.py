@@ -1,8 +1,9 @@
 #level.py
 #
-# Current level loader appears to be very ineffiecent...
+# Parsed levels are cached on disk, see loadCompiledLevel().
 # Caching things like object images and level backgrounds would probably be a good idea.
 
+import hashlib
 import json
 
 import pygame
@@ -10,338 +11,463 @@ import pygame
 #from graphics import GraphicObject,Animation,AnimationFrame,loadAnimation
 #from game import GameObject,Pushable,maskFromSurface
 from game.engine import GameObject, Pushable
-from game.mask import maskFromSurface
-from graphics.animation import Animation, AnimationFrame, loadAnimation
+from game.mask import loadMask
+from graphics.animation import Animation, loadAnimation
+from graphics.assets import AssetCache, CompositeCache
 from graphics.overworld import GraphicObject
+from graphics.battle import BattleGraphicsEngine
 from game.npc import NPC,sNPC,Dialog
+from game.chunks import Chunk, ChunkLoader
+from battle.enemies.factory import EnemyFactory
 from game import triggers
+from game import cache
+import tokenizer
 import errors
 import config
 
-def loadXML(xmlPath,level,GameEngine,GraphicEngine):
-	errors.info("Loading level: "+level)
+## Version of the compiled level format, increment when changing what compileLevel() returns.
+CompiledVersion = 2
 
+## Parses a level from a level XML into a compiled representation.
+#
+#  The compiled level only contains plain data (no images, animations or other pygame objects)
+#  so that it can be cached on disk, see loadCompiledLevel().
+#
+#  @param xmlPath Path to the level XML.
+#  @param level Name of the level inside the XML.
+#
+#  @return Returns a tuple containing the compiled level and a list of paths to every file it was built from.
+def compileLevel(xmlPath,level):
 	try:
-		filer = open(xmlPath,"r")
+		tokens = tokenizer.findBlock(xmlPath,"Level",level)
 	except IOError:
 		errors.critical("Level file not found.")
 		exit()
 
-	lines = filer.readlines()
-
-	started=False
-
-	levelData = []
-
-	for i in range(len(lines)):	#Strip Tabs and New Lines
-		lines[i] = lines[i].lstrip("\t").rstrip("\n")
-
-	for line in lines:	#Extract Level Data
-		if not started:
-			if line == "<Level "+level+">":
-				started=True
-			continue
-		if line == "</Level>":
-			break
-		levelData.append(line)
+	deps = [xmlPath]
 
 	Name=None
 	BG = None
 	Mask=None
 	Enemies=None
 	BattleBG=None
-	BattleFBG=None
+	Chunks=None
 	Triggers = []
 	GameObjects = []
 	NPCs = []
-	i = 0
-
-	while i < len(levelData):	#Isolate Triggers, NPCs, and GameObjects (GraphicObjects must be dealt with immediately because they are contained within GameObjects)
-		temp = {}
-		if levelData[i].startswith("<LevelName>"):
-			Name=levelData[i].lstrip("<LevelName").lstrip(">").rstrip("/LevelName>").rstrip("<")
-		elif levelData[i].startswith("<Background>"):
-			BG=levelData[i].lstrip("<Background").lstrip(">").rstrip("/Background>").rstrip("<")
-		elif levelData[i].startswith("<Mask>"):
-			Mask=levelData[i].lstrip("<Mask").lstrip(">").rstrip("/Mask>").rstrip("<")
-		elif levelData[i].startswith("<Enemies>"):
-			Enemies = json.loads(levelData[i].lstrip("<Enemies").lstrip(">").rstrip("/Enemies>").rstrip("<"))
-		elif levelData[i].startswith("<BattleBG>"):
-			BattleBG = json.loads(levelData[i].lstrip("<BattleBG").lstrip(">").rstrip("/BattleBG>").rstrip("<"))
-		elif levelData[i]=="<Trigger>":
-			n=1
-			while levelData[i+n]!="</Trigger>":
-				key = levelData[i+n][1:levelData[i+n].find(">")]
-				value = levelData[i+n][levelData[i+n].find(">")+1:levelData[i+n].find("<",levelData[i+n].find(">"))]
-				temp[key]=json.loads(value)
-				n+=1
+	files = {}
+
+	for token in tokens:	#Each top level record is read and compiled on its own, included files are only read once.
+		record = tokenizer.readRecord(token,tokens,("GameObject","NPC"),files)
+		deps.extend(record.includes)
+		if record.tag == "LevelName":
+			Name = record.value
+		elif record.tag == "Background":
+			BG = record.value
+		elif record.tag == "Mask":
+			Mask = record.value
+		elif record.tag == "Enemies":
+			Enemies = json.loads(record.value)
+		elif record.tag == "BattleBG":
+			BattleBG = json.loads(record.value)
+		elif record.tag == "Chunks":
+			Chunks = json.loads(record.value)
+		elif record.tag == "Trigger":
+			temp = {}
+			for child in record.children:
+				temp[child.tag] = json.loads(child.value)
 			Triggers.append(temp)
-			i+=n
-		elif levelData[i].startswith("<GameObject"):
-			path = levelData[i].lstrip("<GameObject").rstrip(">").lstrip(" ").split(" ")[0]
-			if len(levelData[i].lstrip("<GameObject").rstrip(">").lstrip(" ").split(" "))>1:
-				objectName = levelData[i].lstrip("<GameObject").rstrip(">").lstrip(" ").split(" ")[1]
-			if path != "":
-				tempFiler = file(config.AssetPath+path,"r")
-				lines = tempFiler.readlines()
-				started=False
-				for j in range(len(lines)):	#Strip Tabs and New Lines
-					lines[j] = lines[j].lstrip("\t").rstrip("\n")
-				j=1
-				for line in lines:	#Extract Level Data
-					if not started:
-						if line == "<GameObject "+objectName+">":
-							started=True
-						continue
-					if line == "</GameObject>":
-						break
-					levelData.insert(i+j,line)
-					j+=1
-
-				#for line in levelData:
-				#	print line
-
-			temp["graphicObject"] = {}
-			n=1
-			while levelData[i+n]!="</GameObject>":
-				key = levelData[i+n][1:levelData[i+n].find(">")]
-				if key == "Mask":
-					n+=1
-					temp["mask"] = {}
-					while levelData[i+n]!="</Mask>":
-						state = levelData[i+n][7:levelData[i+n].find(">")]
-						temp["mask"][state] = json.loads(levelData[i+n][levelData[i+n].find(">")+1:levelData[i+n].rfind("<")])
-						n+=1
-					n+=1
-				elif key == "GraphicObject":
-					if "animations" not in temp["graphicObject"]:
-						temp["graphicObject"]["animations"] = {}
-					n+=1
-					while levelData[i+n]!="</GraphicObject>":
-						if levelData[i+n].startswith("<State"):
-							state = levelData[i+n][7:levelData[i+n].find(">")]
-							temp["graphicObject"]["animations"][state] = [None,None,None,None]
-							n+=1
-							while levelData[i+n]!="</State>":
-								#Retrieve Direction
-								dire = int(levelData[i+n][11:levelData[i+n].find(">")])
-								xml = levelData[i+n][levelData[i+n].find(">")+1:levelData[i+n].rfind("<")]
-								if dire == 0:
-									temp["graphicObject"]["animations"][state][dire] = loadAnimation(xml,state+"N")
-								elif dire == 1:
-									temp["graphicObject"]["animations"][state][dire] = loadAnimation(xml,state+"E")
-								elif dire == 2:
-									temp["graphicObject"]["animations"][state][dire] = loadAnimation(xml,state+"S")
-								elif dire == 3:
-									temp["graphicObject"]["animations"][state][dire] = loadAnimation(xml,state+"W")
-								n+=1
-							n+=1
-						else:
-							key = levelData[i+n][levelData[i+n].find("<")+1:levelData[i+n].find(">")]
-							value = levelData[i+n][levelData[i+n].find(">")+1:levelData[i+n].rfind("<")]
-							temp["graphicObject"][key] = json.loads(value)
-							n+=1
-					n+=1
-				else:
-					value = levelData[i+n][levelData[i+n].find(">")+1:levelData[i+n].find("<",levelData[i+n].find(">"))]
-					temp[key[0].lower()+key[1:]]=json.loads(value)
-					n+=1
-			GameObjects.append(temp)
-			i+=n
-		elif levelData[i].startswith("<NPC"):
-			path = levelData[i].lstrip("<NPC").rstrip(">").lstrip(" ").split(" ")[0]
-			if len(levelData[i].lstrip("<NPC").rstrip(">").lstrip(" ").split(" "))>1:
-				objectName = levelData[i].lstrip("<GameObject").rstrip(">").lstrip(" ").split(" ")[1]
-			if path != "":
-				tempFiler = file(config.AssetPath+path,"r")
-				lines = tempFiler.readlines()
-				started=False
-				for j in range(len(lines)):	#Strip Tabs and New Lines
-					lines[j] = lines[j].lstrip("\t").rstrip("\n")
-				j=1
-				for line in lines:	#Extract Level Data
-					if not started:
-						if line == "<NPC "+objectName+">":
-							started=True
-						continue
-					if line == "</NPC>":
-						break
-					levelData.insert(i+j,line)
-					j+=1
-
-			n=1
-			while levelData[i+n]!="</NPC>":
-				key = levelData[i+n][1:levelData[i+n].find(">")]
-				value = levelData[i+n][levelData[i+n].find(">")+1:levelData[i+n].find("<",levelData[i+n].find(">"))]
-				if key == "Dialog":
-					if value != "null":
-						dialog=open(config.AssetPath+value,"r")
-						lines=dialog.readlines()
-						dialog=""
-						for line in lines:
-							dialog+=line.rstrip("\n")
-						dialog.replace("\t","")
-						temp["Dialog"]=json.loads(dialog)
-					else:
-						temp["Dialog"]=None
-				elif key == "AnimeXML":
-					temp["AnimeXML"]=value
-				elif key == "Icon":
-					if value=="null":
-						temp["Icon"]=None
-					else:
-						temp["Icon"]=value
-				else:
-					temp[key]=json.loads(value)
-				n+=1
+		elif record.tag == "GameObject":
+			GameObjects.append(compileGameObject(record))
+		elif record.tag == "NPC":
+			temp,dialogs = compileNPC(record)
+			deps.extend(dialogs)
 			NPCs.append(temp)
-			i+=1
-		i+=1
+		else:
+			errors.warning("Unknown level attribute: "+record.tag)
+	return {"Name":Name,"Background":BG,"Mask":Mask,"Enemies":Enemies,"BattleBG":BattleBG,"Chunks":Chunks,"Triggers":Triggers,"GameObjects":GameObjects,"NPCs":NPCs},deps
+
+## Compiles a GameObject record read from a level XML.
+#
+#  @return Returns the keyword arguments for the GameObject, with the arguments for its GraphicObject
+#  under @c "graphicObject". Animations are given as (xml, name) tuples to be passed to loadAnimation().
+def compileGameObject(record):
+	temp = {"graphicObject":{}}
+	for child in record.children:
+		if child.tag == "Mask":
+			temp["mask"] = {}
+			for state in child.children:
+				temp["mask"][state.arg] = json.loads(state.value)
+		elif child.tag == "GraphicObject":
+			if "animations" not in temp["graphicObject"]:
+				temp["graphicObject"]["animations"] = {}
+			for attr in child.children:
+				if attr.tag == "State":
+					state = attr.arg
+					temp["graphicObject"]["animations"][state] = [None,None,None,None]
+					for direction in attr.children:
+						dire = int(direction.arg)
+						temp["graphicObject"]["animations"][state][dire] = (direction.value,state+"NESW"[dire])
+				else:
+					temp["graphicObject"][attr.tag] = json.loads(attr.value)
+		else:
+			temp[child.tag[0].lower()+child.tag[1:]] = json.loads(child.value)
+	return temp
+
+## Compiles an NPC record read from a level XML.
+#
+#  @return Returns a tuple containing the keyword arguments for the NPC and a list of paths to the
+#  dialog files it uses.
+def compileNPC(record):
+	temp = {}
+	dialogs = []
+	for child in record.children:
+		if child.tag == "Dialog":
+			if child.value != "null":
+				dialog=open(config.AssetPath+child.value,"r")
+				temp["Dialog"]=json.loads(dialog.read().replace("\n",""))
+				dialog.close()
+				dialogs.append(config.AssetPath+child.value)
+			else:
+				temp["Dialog"]=None
+		elif child.tag == "AnimeXML":
+			temp["AnimeXML"]=child.value
+		elif child.tag == "Icon":
+			if child.value=="null":
+				temp["Icon"]=None
+			else:
+				temp["Icon"]=child.value
+		else:
+			temp[child.tag]=json.loads(child.value)
+	return temp,dialogs
+
+## Returns the compiled representation of a level.
+#
+#  Compiled levels are cached on disk and reused as long as neither the level XML nor any of the
+#  files it includes (GameObject XMLs, dialog files) have been modified, in which case the level is
+#  compiled again.
+#
+#  @param xmlPath Path to the level XML.
+#  @param level Name of the level inside the XML.
+def loadCompiledLevel(xmlPath,level):
+	name = xmlPath+"."+level+".level"
+	data = cache.load(name,CompiledVersion)
+	if data == None:
+		data,deps = compileLevel(xmlPath,level)
+		cache.save(name,deps,data,CompiledVersion)
+	return data
+
+## Lists the actors SBSC triggers depend on in each chunk of a chunked level, see
+#  game.engine.GameEngine.setChunkActors().
+#
+#  The chunk XML is read one chunk at a time as it streams past, and only the actors with an ID in
+#  @c IDs are kept, so how much of it is held in memory does not grow with the size of the world.
+#
+#  @param xmlPath Path to the chunk XML.
+#  @param IDs A collection of the IDs of the actors to list.
+#
+#  @return Returns a tuple containing a dictionary mapping each chunk's (column, row) to a list of
+#  (ID, state) pairs for the listed GameObjects in it, and a list of paths to every file it was built from.
+def compileChunkActors(xmlPath,IDs):
+	deps = [xmlPath]
+	chunkActors = {}
+	files = {}
+	tokens = tokenizer.tokenize(xmlPath)
+	for token in tokens:
+		if token[0] != tokenizer.OPEN:
+			continue
+		block = tokenizer.blockTokens(tokens)
+		if token[1] != "Level":
+			for skipped in block:
+				pass
+			continue
+		actors = []
+		for child in block:
+			record = tokenizer.readRecord(child,block,("GameObject",),files)
+			deps.extend(record.includes)
+			if record.tag == "GameObject":
+				obj = compileGameObject(record)
+				if obj["id"] in IDs:
+					actors.append((obj["id"],obj.get("state","Idle")))
+		if len(actors) > 0:
+			chunkActors[tuple(int(i) for i in token[2].split("_"))] = actors
+	return chunkActors,deps
+
+## Loads the actors SBSC triggers depend on in each chunk of a chunked level from the cache, compiling
+#  them if needed, see compileChunkActors().
+#
+#  @param xmlPath Path to the chunk XML.
+#  @param IDs A collection of the IDs of the actors to list.
+def loadChunkActors(xmlPath,IDs):
+	if len(IDs) == 0:
+		return {}
+	name = xmlPath+"."+hashlib.md5("\n".join(sorted(IDs)).encode("utf-8")).hexdigest()+".actors"	#Entries are kept for each set of IDs.
+	data = cache.load(name,CompiledVersion)
+	if data == None:
+		data,deps = compileChunkActors(xmlPath,IDs)
+		cache.save(name,deps,data,CompiledVersion)
+	return data
+
+## A level which has been loaded but not yet added to the engines, see buildLevel() and attachLevel().
+#
+#  Attributes left as @c None are not changed in the engines when the level is attached.
+class PreparedLevel(object):
+
+	## Constructor.
+	#
+	#  @param xmlPath Path to the level XML.
+	#  @param level Name of the level inside the XML.
+	def __init__(self,xmlPath,level):
+		self.xmlPath = xmlPath
+		self.level = level
+		self.name = None
+		self.background = None
+		self.mask = None
+		self.enemies = None
+		self.battleBG = None
+		self.triggers = []
+		self.actors = []
+		self.NPCs = []
+		self.objects = []
+		self.chunks = None
+
+	## Returns a list of (xml, level) tuples for the areas this level's AreaChangeTriggers lead to.
+	#
+	#  The xml paths are relative to config.AssetPath, like the ones passed to load().
+	def getAreaChanges(self):
+		areas = []
+		for trigger in self.triggers:
+			if trigger.getEffect() == "Area Change":
+				area = (trigger.getNewAreaXML(),trigger.getNewArea())
+				if area not in areas:
+					areas.append(area)
+		return areas
+
+	## Loads and unloads the chunks around the player if this is a chunked level, see game.chunks.ChunkLoader.
+	#
+	#  Called every frame while the level is attached.
+	def updateChunks(self,GameEngine,GraphicEngine):
+		if self.chunks != None:
+			self.chunks.update(GameEngine,GraphicEngine)
+
+	## Forgets the loaded chunks if this is a chunked level, called once the level has been cleared from the engines.
+	def releaseChunks(self):
+		if self.chunks != None:
+			self.chunks.release()
+
+## Loads a level without adding it to the engines.
+#
+#  This does not touch the engines, so it is safe to call from a worker thread, see game.prefetch.
+#
+#  @param xmlPath Path to the level XML.
+#  @param level Name of the level inside the XML.
+#
+#  @return Returns a PreparedLevel, which can be added to the engines with attachLevel().
+def buildLevel(xmlPath,level):
+	errors.info("Loading level: "+level)
+	prepared = PreparedLevel(xmlPath,level)
+
+	data = loadCompiledLevel(xmlPath,level)
+	Name = data["Name"]
+	BG = data["Background"]
+	Mask = data["Mask"]
+	Enemies = data["Enemies"]
+	BattleBG = data["BattleBG"]
+	Chunks = data["Chunks"]
+	Triggers = data["Triggers"]
+	GameObjects = data["GameObjects"]
+	NPCs = data["NPCs"]
+
 	if Name == None:
 		errors.warning("Level has no Name attribute.")
 		Name = "Unknown Area"
-	GraphicEngine.setLevelName(Name)
-	if BG == None:
+	prepared.name = Name
+	if Chunks != None:	#The chunks' backgrounds and masks are loaded as the player gets near them.
+		chunkXML = config.AssetPath+Chunks["XML"]
+		watched = set(ID for trigger in Triggers if trigger.get("Effect") == "SBSC" for ID in trigger["NeededStates"])
+		prepared.chunks = ChunkLoader(lambda pos: buildChunk(chunkXML,pos),Chunks["Size"],Chunks["Count"],loadChunkActors(chunkXML,watched))
+		prepared.background = prepared.chunks.background
+		prepared.mask = prepared.chunks.mask
+	elif BG == None:
 		errors.error("Level has no Background attribute.")
 	else:
 		try:
-			GraphicEngine.setBackground(pygame.image.load(config.AssetPath+BG).convert())
+			prepared.background = AssetCache.load(config.AssetPath+BG,"tiled")
 		except pygame.error:
 			errors.error("Unable to load level background.")
-	if Mask == None:
+	if Chunks != None:
+		pass
+	elif Mask == None:
 		errors.info("Level has no Mask attribute.")
 	else:
 		try:
-			GameEngine.setMask(pygame.image.load(config.AssetPath+Mask).convert())
+			prepared.mask = loadMask(config.AssetPath+Mask)
 		except pygame.error:
 			errors.error("Unable to load level mask.")
 	if Enemies != None and len(Enemies)>0:
 		if BattleBG == None or len(BattleBG) == 0:
 			errors.info("No battle backgrounds specified for this level.")
 		else:
-#			for i in xrange(len(BattleBG)):
-#				for j in range(len(BattleBG[i])):
-#					if BattleBG[i][j] != None:
-#						try:
-#							BattleBG[i][j] = pygame.image.load(BattleBG[i][j]).convert_alpha()
-#						except pygame.error:
-#							errors.error("Unable to load battle background for this level.")
-#							BattleBG[i][j] = None
-			GameEngine.setBattleBG(BattleBG)
-			GameEngine.setEnemies(Enemies)
+			for bg in BattleBG:	#Loaded now so random encounters can start straight away.
+				try:
+					BattleGraphicsEngine.loadBackground(bg[0],bg[1])
+				except pygame.error:
+					errors.error("Unable to load battle background for this level.")
+			for enemy in set(Enemies):
+				EnemyFactory.preload(enemy)
+			prepared.battleBG = BattleBG
+			prepared.enemies = Enemies
 	else:
-		GameEngine.setBattleBG([])
-		GameEngine.setEnemies([])
+		prepared.battleBG = []
+		prepared.enemies = []
 
 	for trigger in Triggers:
 		errors.debug("Adding "+trigger["Id"]+" trigger.")
-		# Should probably be using a factory...
 		if "Area" in trigger.keys() and trigger["Area"]!=None:
 			trigger["Area"] = pygame.rect.Rect(trigger["Area"])
-		if trigger["Effect"]=="State Set":
-			del trigger["Effect"]
-			GameEngine.addTrigger(triggers.StateSetTrigger(**trigger))
-		elif trigger["Effect"]=="State Toggle":
-			del trigger["Effect"]
-			GameEngine.addTrigger(triggers.StateToggleTrigger(**trigger))
-		elif trigger["Effect"]=="Area Change":
-			del trigger["Effect"]
-			GameEngine.addTrigger(triggers.AreaChangeTrigger(**trigger))
-		elif trigger["Effect"]=="SBSC":
-			del trigger["Effect"]
-			GameEngine.addTrigger(triggers.SBSCTrigger(**trigger))
-		elif trigger["Effect"]=="TBSC":
-			del trigger["Effect"]
-			GameEngine.addTrigger(triggers.TBSCTrigger(**trigger))
-		elif trigger["Effect"]=="Battle":
-			del trigger["Effect"]
-			GameEngine.addTrigger(triggers.BattleTrigger(**trigger))
-		elif trigger["Effect"]=="Item":
-			del trigger["Effect"]
-			GameEngine.addTrigger(triggers.ItemTrigger(**trigger))
-		elif trigger["Effect"]=="Quest Complete":
-			del trigger["Effect"]
-			GameEngine.addTrigger(triggers.QuestCompleteTrigger(**trigger))
-		else:
-			errors.error("Undefined Trigger Effect")
+		effect = trigger.pop("Effect")
+		trigger = triggers.TriggerFactory.createTrigger(effect,**trigger)
+		if trigger != None:
+			prepared.triggers.append(trigger)
 
 	for obj in GameObjects:
-
-		errors.debug("Adding "+obj["id"])
-		#print str(obj["id"])+":"
-		#for key in obj.keys():
-		#	print key,obj[key]
-		#for key in obj["graphicObject"].keys():
-		#	print key,obj["graphicObject"][key]
-		#for key in obj["graphicObject"]["animations"].keys():
-		#	for i in range(0,4):
-		#		if obj["graphicObject"]["animations"][key][i] != None:
-		#			print key+str(i),len(obj["graphicObject"]["animations"][key][i].getFrames())
-		#		else:
-		#			print key+str(i),None
-		#print "\n"
-
-		for state in obj["mask"].keys():
-			if obj["mask"][state] != None:
-				img = pygame.image.load(config.AssetPath+str(obj["mask"][state]))
-				obj["mask"][state] = maskFromSurface(img)
-		if obj["graphicObject"].keys().__contains__("flipX"):
-			for state in obj["graphicObject"]["animations"].keys():
-				i=0
-				if obj["graphicObject"]["animations"][state][1].getNextAnimation() != None:
-					nextAnimation = obj["graphicObject"]["animations"][state][1].getNextAnimation()[:-1]+"W"
-				else:
-					nextAnimation = None
-				obj["graphicObject"]["animations"][state][3] = Animation(None,nextAnimation,state+"W")
-				for frame in obj["graphicObject"]["animations"][state][1].getFrames():
-					i+=1
-					obj["graphicObject"]["animations"][state][3].addFrame(AnimationFrame(pygame.transform.flip(frame.image,True,False),frame.delay,None,i-1))
-			del obj["graphicObject"]["flipX"]
-
-		#Animation Linker:
-		for state in obj["graphicObject"]["animations"].keys():
-			for dire in range(0,4):
-				if obj["graphicObject"]["animations"][state][dire] == None:
-					continue
-				nextState = obj["graphicObject"]["animations"][state][dire].getNextAnimation()
-				if nextState == None or type(nextState)==Animation:
-					continue
-				if obj["graphicObject"]["animations"][nextState.rstrip("NESW")][dire].getName()==nextState:
-					obj["graphicObject"]["animations"][state][dire].nextAnimation = obj["graphicObject"]["animations"][nextState.rstrip("NESW")][dire]
-				else:
-					errors.error("Animation linker is officially insufficient. \n(It was already unofficially insufficient, but now things just got worse)\n((Troublemaker: "+state+" -> "+nextState+"))")
-
-		obj["graphicObject"] = GraphicObject(**obj["graphicObject"])
-		GraphicEngine.addObject(obj["graphicObject"])
-		if obj.keys().__contains__("pushable") and obj["pushable"]==True:
-			del obj["pushable"]
-			if obj["area"]!=None:
-				obj["area"] = pygame.rect.Rect(obj["area"])
-			GameEngine.addActor(Pushable(**obj))
-		else:
-			GameEngine.addActor(GameObject(**obj))
+		actor = buildGameObject(obj)
+		prepared.objects.append(actor.graphicObject)
+		prepared.actors.append(actor)
 
 	for npc in NPCs:
 		if "AnimeXML" in npc:
 			errors.debug("Adding sNPC: "+npc["Id"])
 			if npc["Icon"]!=None:
-				npc["Icon"]=pygame.image.load(npc["Icon"]).convert()
+				npc["Icon"]=AssetCache.load(npc["Icon"],"opaque")
 			npc["Dialog"]=loadDialog(npc["Dialog"])
 			#print npc["Dialog"]
 			temp = sNPC(**npc)
-			GameEngine.addNPC(temp)
-			GraphicEngine.addObject(temp.getGraphicObject())
+			prepared.NPCs.append(temp)
+			prepared.objects.append(temp.getGraphicObject())
 		else:
 			errors.debug("Adding NPC: "+npc["Id"])
 			if npc["Icon"]!=None:
-				npc["Icon"]=pygame.image.load(npc["Icon"]).convert()
+				npc["Icon"]=AssetCache.load(npc["Icon"],"opaque")
 			npc["Dialog"]=loadDialog(npc["Dialog"])
 			#print npc["Dialog"]
 			temp = NPC(**npc)
-			GameEngine.addNPC(temp)
-			GraphicEngine.addObject(temp.getGraphicObject())
+			prepared.NPCs.append(temp)
+			prepared.objects.append(temp.getGraphicObject())
+	return prepared
+
+## Builds a GameObject, or a Pushable, from a GameObject compiled by compileGameObject().
+#
+#  @return Returns the GameObject, its GraphicObject is its @c graphicObject attribute.
+def buildGameObject(obj):
+	errors.debug("Adding "+obj["id"])
+	#print str(obj["id"])+":"
+	#for key in obj.keys():
+	#	print key,obj[key]
+	#for key in obj["graphicObject"].keys():
+	#	print key,obj["graphicObject"][key]
+	#for key in obj["graphicObject"]["animations"].keys():
+	#	for i in range(0,4):
+	#		if obj["graphicObject"]["animations"][key][i] != None:
+	#			print key+str(i),len(obj["graphicObject"]["animations"][key][i].getFrames())
+	#		else:
+	#			print key+str(i),None
+	#print "\n"
 
-	filer.close()
+	for state in obj["graphicObject"]["animations"].keys():
+		for dire in range(0,4):
+			if obj["graphicObject"]["animations"][state][dire] != None:
+				obj["graphicObject"]["animations"][state][dire] = loadAnimation(*obj["graphicObject"]["animations"][state][dire])
+	for state in obj["mask"].keys():
+		if obj["mask"][state] != None:
+			obj["mask"][state] = loadMask(config.AssetPath+str(obj["mask"][state]))
+	if obj["graphicObject"].keys().__contains__("flipX"):
+		for state in obj["graphicObject"]["animations"].keys():
+			if obj["graphicObject"]["animations"][state][1].getNextAnimation() != None:
+				nextAnimation = obj["graphicObject"]["animations"][state][1].getNextAnimation()[:-1]+"W"
+			else:
+				nextAnimation = None
+			obj["graphicObject"]["animations"][state][3] = Animation(None,nextAnimation,state+"W",obj["graphicObject"]["animations"][state][1].getClip().getFlipped())
+		del obj["graphicObject"]["flipX"]
+
+	#Animation Linker:
+	for state in obj["graphicObject"]["animations"].keys():
+		for dire in range(0,4):
+			if obj["graphicObject"]["animations"][state][dire] == None:
+				continue
+			nextState = obj["graphicObject"]["animations"][state][dire].getNextAnimation()
+			if nextState == None or type(nextState)==Animation:
+				continue
+			if obj["graphicObject"]["animations"][nextState.rstrip("NESW")][dire].getName()==nextState:
+				obj["graphicObject"]["animations"][state][dire].nextAnimation = obj["graphicObject"]["animations"][nextState.rstrip("NESW")][dire]
+			else:
+				errors.error("Animation linker is officially insufficient. \n(It was already unofficially insufficient, but now things just got worse)\n((Troublemaker: "+state+" -> "+nextState+"))")
+
+	obj["graphicObject"] = GraphicObject(**obj["graphicObject"])
+	if obj.keys().__contains__("pushable") and obj["pushable"]==True:
+		del obj["pushable"]
+		if obj["area"]!=None:
+			obj["area"] = pygame.rect.Rect(obj["area"])
+		return Pushable(**obj)
+	else:
+		return GameObject(**obj)
+
+## Builds one chunk of a chunked level, see game.chunks.
+#
+#  Each chunk is a Level block named after its column and row (e.g. @c "<Level 3_1>") in the level's
+#  chunk XML, containing the chunk's Background, Mask and GameObjects. Positions inside a chunk are
+#  given in level coordinates, objects should not stick out more than a chunk past their own since
+#  they are only drawn while it is loaded. Chunks without a block are empty. This does not touch the
+#  engines, so it is safe to call from a worker thread.
+#
+#  @param xmlPath Path to the chunk XML.
+#  @param pos The chunk's (column, row).
+#
+#  @return Returns a game.chunks.Chunk.
+def buildChunk(xmlPath,pos):
+	chunk = Chunk(pos)
+	data = loadCompiledLevel(xmlPath,"%d_%d" % pos)
+	if data["Background"] != None:
+		try:
+			chunk.background = AssetCache.load(config.AssetPath+data["Background"],"tiled")
+		except pygame.error:
+			errors.error("Unable to load background of chunk "+str(pos)+".")
+	if data["Mask"] != None:
+		try:
+			chunk.mask = loadMask(config.AssetPath+data["Mask"],shared=False)
+		except pygame.error:
+			errors.error("Unable to load mask of chunk "+str(pos)+".")
+	for obj in data["GameObjects"]:
+		actor = buildGameObject(obj)
+		chunk.objects.append(actor.graphicObject)
+		chunk.actors.append(actor)
+	return chunk
+
+## Adds a PreparedLevel to the engines.
+#
+#  The engines should already have been cleared of the previous level.
+def attachLevel(prepared,GameEngine,GraphicEngine):
+	GraphicEngine.setLevelName(prepared.name)
+	if prepared.background != None:
+		GraphicEngine.setBackground(prepared.background)
+	if prepared.mask != None:
+		GameEngine.setMask(prepared.mask)
+	if prepared.battleBG != None:
+		GameEngine.setBattleBG(prepared.battleBG)
+		GameEngine.setEnemies(prepared.enemies)
+	if prepared.chunks != None:
+		GameEngine.setChunkActors(prepared.chunks.actors)
+	for trigger in prepared.triggers:
+		GameEngine.addTrigger(trigger)
+	for actor in prepared.actors:
+		GameEngine.addActor(actor)
+	for NPC in prepared.NPCs:
+		GameEngine.addNPC(NPC)
+	for obj in prepared.objects:
+		GraphicEngine.addObject(obj)
+
+def loadXML(xmlPath,level,GameEngine,GraphicEngine):
+	attachLevel(buildLevel(xmlPath,level),GameEngine,GraphicEngine)
 
 
 def loadDialog(data):
@@ -381,7 +507,20 @@ def loadDialog(data):
 	dialog=Dialog(**args)
 	return dialog
 
-def load(xmlpath,level,GameEngine,GraphicEngine):
-	loadXML(config.AssetPath+xmlpath,level,GameEngine,GraphicEngine)
+## Loads a level into the engines.
+#
+#  @param xmlpath Path to the level XML, relative to config.AssetPath.
+#  @param level Name of the level inside the XML.
+#  @param prepared A PreparedLevel for this level which has already been built, e.g. by the game.prefetch.Prefetcher.
+#  If @c None the level is built now.
+#
+#  @return Returns the PreparedLevel which was attached.
+def load(xmlpath,level,GameEngine,GraphicEngine,prepared=None):
+	if prepared == None:
+		prepared = buildLevel(config.AssetPath+xmlpath,level)
+	attachLevel(prepared,GameEngine,GraphicEngine)
 	GameEngine.loadLevel(level)
+	AssetCache.report()
+	CompositeCache.report()
+	return prepared
 	#GraphicEngine.loadLevel(level)
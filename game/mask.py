@@ -1,11 +1,194 @@
+## @package mask
+#  Documentation for the Mask Module.
+#
+#  This module contains the code for building collision masks from images.
+#
+#  Masks built by loadMask() are kept in memory and cached bit-packed on disk, so an image is only
+#  thresholded once no matter how many objects use it.
+
+import binascii
+import string
+import threading
+from collections import OrderedDict
+
 import pygame
 
+from game import cache
+import errors
+import config
+
 ## Uses a threshold in order to create a mask from a surface.
+#
+#  A pixel is set in the mask if its red channel is above @c mustBeAbove.
 def maskFromSurface(surface,mustBeAbove=127):
-	surface.lock()
-	mask = pygame.mask.Mask(surface.get_size())
-	for x in range(surface.get_width()):
-		for y in range(surface.get_height()):
-			if surface.get_at((x,y))[0]>mustBeAbove:
-				mask.set_at((x,y),1)
+	if surface.get_bitsize() != 32:	#from_threshold() compares palette indices rather than colors on 8 bit surfaces.
+		surface = surface.convert(32,0)
+	if mustBeAbove < 0:
+		return pygame.mask.from_threshold(surface,(128,128,128,128),(255,255,255,255))
+	return pygame.mask.from_threshold(surface,(255,128,128,128),(max(255-mustBeAbove,0),255,255,255))
+
+## Packs the thresholded pixels of a surface into a string, 8 pixels per byte in row major order.
+def packSurface(surface,mustBeAbove=127):
+	if surface.get_bitsize() != 32:
+		surface = surface.convert(32,0)
+	below = min(max(mustBeAbove+1,0),256)
+	table = string.maketrans("".join(chr(i) for i in range(256)),"0"*below+"1"*(256-below))
+	bits = pygame.image.tostring(surface,"RGB")[0::3].translate(table)
+	bits += "0"*(-len(bits)%8)
+	if len(bits) == 0:
+		return ""
+	return binascii.unhexlify("%0*x" % (len(bits)/4,int(bits,2)))
+
+## Builds a mask from a string created by packSurface().
+def unpackMask(size,packed):
+	if len(packed) == 0:
+		return pygame.mask.Mask(size)
+	bits = bin(int(binascii.hexlify(packed),16))[2:].zfill(len(packed)*8)[:size[0]*size[1]]
+	surface = pygame.image.fromstring(bits.translate(string.maketrans("01","\x00\x01")),size,"P")
+	surface.set_colorkey(0)
+	return pygame.mask.from_surface(surface)
+
+## Masks loaded so far keyed by (path, mustBeAbove), in order of use.
+#
+#  Limited to config.MaskCacheSize bytes, the least recently used masks are dropped first.
+Masks = OrderedDict()
+## Total size of the masks in Masks in bytes.
+MasksSize = 0
+## Guards Masks so masks can be loaded from more than one thread.
+MasksLock = threading.Lock()
+
+## Returns the number of bytes used by a mask's bits.
+def getMaskSize(mask):
+	width,height = mask.get_size()
+	return (width*height+7)//8
+
+## Loads an image and creates a mask from it, see maskFromSurface().
+#
+#  The mask is cached in memory and on disk, masks for the same image are only built once.
+#
+#  @param path Path to the image.
+#  @param mustBeAbove The threshold for the red channel.
+#  @param shared Whether or not to keep the mask in memory. Masks which are only used once, such as
+#  the masks of a chunked level's chunks, are still cached on disk but are freed once unused.
+#
+#  @return Returns the mask, it is shared with every other caller and must not be modified.
+def loadMask(path,mustBeAbove=127,shared=True):
+	global MasksSize
+	key = (path,mustBeAbove)
+	with MasksLock:
+		if key in Masks:
+			mask = Masks.pop(key)
+			Masks[key] = mask
+			return mask
+	name = path+"."+str(mustBeAbove)+".mask"
+	data = cache.load(name)
+	if data != None:
+		mask = unpackMask(*data)
+	else:
+		errors.debug("Building mask: "+path)
+		surface = pygame.image.load(path)	#Not loaded through the AssetCache, the image is not needed once the mask is built.
+		mask = maskFromSurface(surface,mustBeAbove)
+		cache.save(name,[path],(surface.get_size(),packSurface(surface,mustBeAbove)))
+	if shared:
+		with MasksLock:
+			if key in Masks:	#Loaded by another thread in the meantime.
+				mask = Masks.pop(key)
+			else:
+				MasksSize += getMaskSize(mask)
+			Masks[key] = mask
+			while MasksSize > config.MaskCacheSize and len(Masks) > 1:
+				oldKey,oldMask = Masks.popitem(False)
+				MasksSize -= getMaskSize(oldMask)
 	return mask
+
+## The boundaries of a level split into a grid of chunks, which can be loaded and unloaded separately.
+#
+#  Has the parts of the pygame.mask.Mask interface used for collisions. Chunks which are not loaded
+#  are solid, so nothing can move into them before they are, while everything outside of the grid is
+#  empty like it is outside of a single mask.
+class ChunkedMask(object):
+
+	## Constructor.
+	#
+	#  @param chunkSize The width and height of a chunk, in pixels.
+	#  @param count The number of columns and rows of chunks.
+	def __init__(self,chunkSize,count):
+		self.chunkSize = tuple(chunkSize)
+		self.count = tuple(count)
+		self.chunks = {}
+		self.unloaded = pygame.mask.Mask(self.chunkSize)
+		self.unloaded.fill()
+
+	## Sets the mask of a chunk which has been loaded.
+	#
+	#  @param pos The chunk's (column, row).
+	#  @param mask The chunk's mask, or @c None if nothing in the chunk is solid.
+	def setChunk(self,pos,mask):
+		self.chunks[tuple(pos)] = mask
+
+	## Makes a chunk solid again once it has been unloaded.
+	def removeChunk(self,pos):
+		self.chunks.pop(tuple(pos),None)
+
+	## Functions the same as pygame.mask.Mask.get_size().
+	def get_size(self):
+		return (self.chunkSize[0]*self.count[0],self.chunkSize[1]*self.count[1])
+
+	## Returns a list of (mask, x, y) tuples for the chunks a mask at @c pos could overlap.
+	def getParts(self,mask,pos):
+		width,height = self.chunkSize
+		size = mask.get_size()
+		parts = []
+		for cy in xrange(max(pos[1]//height,0),min((pos[1]+size[1]-1)//height,self.count[1]-1)+1):
+			for cx in xrange(max(pos[0]//width,0),min((pos[0]+size[0]-1)//width,self.count[0]-1)+1):
+				chunk = self.chunks.get((cx,cy),self.unloaded)
+				if chunk != None:
+					parts.append((chunk,cx*width,cy*height))
+		return parts
+
+	## Functions the same as pygame.mask.Mask.overlap().
+	def overlap(self,mask,pos):
+		for chunk,x,y in self.getParts(mask,pos):
+			point = chunk.overlap(mask,(pos[0]-x,pos[1]-y))
+			if point != None:
+				return (point[0]+x,point[1]+y)
+		return None
+
+	## Functions the same as pygame.mask.Mask.overlap_area().
+	def overlap_area(self,mask,pos):
+		return sum(chunk.overlap_area(mask,(pos[0]-x,pos[1]-y)) for chunk,x,y in self.getParts(mask,pos))
+
+## The most contact positions a BoundaryField remembers before it starts over.
+FieldLimit = 65536
+
+## The push-back directions of the positions where movers touch a level's boundaries.
+#
+#  How a mover is pushed back depends on the shape of its own mask as well as the boundaries, so
+#  directions are remembered for each mover mask and position. Each one is worked out the first time a
+#  mover touches the boundaries there, later contacts at the same position are a single lookup.
+class BoundaryField(object):
+
+	## Constructor.
+	#
+	#  @param boundaries The mask of the level's boundaries, it must not be modified while the field is in use.
+	def __init__(self,boundaries):
+		self.boundaries = boundaries
+		self.normals = {}
+
+	## Returns the push-back direction for a mover touching the boundaries.
+	#
+	#  @param mask The mover's mask.
+	#  @param pos The mover's position as a tuple or list (x, y).
+	#
+	#  @return Returns a tuple (dx, dy), the differences in overlapping area between moving one pixel
+	#  right and one pixel left, and one pixel down and one pixel up.
+	def getPushBack(self,mask,pos):
+		x,y = pos
+		key = (mask,x,y)
+		normal = self.normals.get(key)
+		if normal == None:
+			if len(self.normals) >= FieldLimit:
+				self.normals.clear()
+			boundaries = self.boundaries
+			normal = self.normals[key] = (boundaries.overlap_area(mask,(x+1,y)) - boundaries.overlap_area(mask,(x-1,y)),boundaries.overlap_area(mask,(x,y+1)) - boundaries.overlap_area(mask,(x,y-1)))
+		return normal
@@ -66,6 +66,8 @@ class NPC(player.Player):
 		self.dialog=Dialog
 		self.wander=Wander
 		self.wanderCount=0.0
+		self.timers=None
+		self.wanderTimer=None
 
 		self.talking=False
 		if Shop != None:
@@ -97,37 +99,14 @@ class NPC(player.Player):
 		self.gameObject = GameObject([Pos[0],Pos[1]],{"Idle":mask},30,self.graphicObject,Id)
 
 	def constructAnimations(self,animations,ClothingType,ClothingColor,HairType,HairColor):
-		for dire in ["W","S","N"]:
-			if dire == "W":
-				direI = 3
-			elif dire == "S":
-				direI = 2
-			elif dire == "N":
-				direI = 0
-			for frame in range(1,4):
-				temp = pygame.surface.Surface((17,25),flags=SRCALPHA)
-				clothes = pygame.image.load(config.AssetPath+"Player/Overworld/Clothes/Type"+str(ClothingType)+"/Walk"+dire+str(frame)+".png").convert_alpha()
-				clothes.fill(ClothingColor,special_flags=BLEND_MULT)
-				body = pygame.image.load(config.AssetPath+"Player/Overworld/Body/Type"+str(ClothingType)+"/Walk"+dire+str(frame)+".png").convert_alpha()
-				hair = pygame.image.load(config.AssetPath+"Player/Overworld/Hair/Type"+str(HairType)+"/Walk"+dire+str(frame)+".png").convert_alpha()
-				hair.fill(HairColor,special_flags=BLEND_MULT)
-				temp.blit(clothes,(0,0))
-				temp.blit(body,(0,0))
-				temp.blit(hair,(0,0))
-				if frame == 3:
-					frame += 1
-				animations["Run"][direI].addFrame(AnimationFrame(temp,0.25,None,frame))
-				if frame == 2:
-					animations["Run"][direI].addFrame(AnimationFrame(animations["Run"][direI].getSprite(),.25,None,3))
-		i=0
-		for frame in animations["Run"][3].getFrames():
-			i+=1
-			animations["Run"][1].addFrame(AnimationFrame(pygame.transform.flip(frame.getImage(),True,False),frame.getDelay(),None,i))
+		for direI,dire in enumerate(["N","E","S","W"]):
+			for number,image in enumerate(player.getWalkFrames(ClothingType,ClothingColor,HairType,HairColor,dire),1):
+				animations["Run"][direI].addFrame(AnimationFrame(image,0.25,number))
 		#Standing
-		animations["Idle"][0].addFrame(AnimationFrame(animations["Run"][0].getSprite(),.1,None,0))
-		animations["Idle"][1].addFrame(AnimationFrame(animations["Run"][1].getSprite(),.1,None,0))
-		animations["Idle"][2].addFrame(AnimationFrame(animations["Run"][2].getSprite(),.1,None,0))
-		animations["Idle"][3].addFrame(AnimationFrame(animations["Run"][3].getSprite(),.1,None,0))
+		animations["Idle"][0].addFrame(AnimationFrame(animations["Run"][0].getSprite(),.1,0))
+		animations["Idle"][1].addFrame(AnimationFrame(animations["Run"][1].getSprite(),.1,0))
+		animations["Idle"][2].addFrame(AnimationFrame(animations["Run"][2].getSprite(),.1,0))
+		animations["Idle"][3].addFrame(AnimationFrame(animations["Run"][3].getSprite(),.1,0))
 		return animations
 
 	def getShop(self):
@@ -141,6 +120,50 @@ class NPC(player.Player):
 
 	def setTalking(self,Talking):
 		self.talking=Talking
+		self.setTimers(self.timers)
+
+	## Sets the game.timers.TimerWheel used to decide when to wander next, see game.engine.GameEngine.addNPC().
+	#
+	#  If @c None, or while talking, the wander timer is paused. Without a TimerWheel update() counts
+	#  down on its own.
+	def setTimers(self,timers):
+		if self.wanderTimer != None:
+			self.wanderCount = self.timers.getRemaining(self.wanderTimer)
+			self.wanderTimer.cancel()
+			self.wanderTimer = None
+		self.timers = timers
+		if self.timers != None and self.wander and self.talking==False:
+			self.wanderTimer = self.timers.schedule(self.wanderCount,self.wanderTimeout)
+
+	## Called by the TimerWheel when it is time to wander again.
+	def wanderTimeout(self):
+		self.wanderCount = self.timers.getRemaining(self.wanderTimer)
+		self.wanderTimer = None
+		self.wanderStep()
+		self.wanderTimer = self.timers.schedule(self.wanderCount,self.wanderTimeout)
+
+	## Picks a new direction to wander in, or stops for a while.
+	def wanderStep(self):
+		self.wanderCount += random.random()*7
+		dire=random.randint(0,3)
+		self.setDirection(dire)
+		if random.random()>.5:
+			self.setState("Run")
+			self.graphicObject.setFrame(1.0)
+			direction = [0,0]
+			if dire == 0:
+				direction[1]=-1
+			elif dire==1:
+				direction[0]=1
+			elif dire==2:
+				direction[1]=1
+			elif dire==3:
+				direction[0]=-1
+			self.gameObject.setMoving(True,direction)
+			self.wanderCount/=2
+		else:
+			self.gameObject.setMoving(False)
+			self.setState("Idle")
 
 	def lookAt(self,Target):
 		if abs(Target.getY()-self.gameObject.getY())>abs(Target.getX()-self.gameObject.getX()):
@@ -155,28 +178,9 @@ class NPC(player.Player):
 				self.setDirection(3)
 
 	def update(self,tick,moveCheck):
-		if self.wander and self.talking==False:
+		if self.timers == None and self.wander and self.talking==False:
 			if self.wanderCount <=0:
-				self.wanderCount += random.random()*7
-				dire=random.randint(0,3)
-				self.setDirection(dire)
-				if random.random()>.5:
-					self.setState("Run")
-					self.graphicObject.setFrame(1.0)
-					direction = [0,0]
-					if dire == 0:
-						direction[1]=-1
-					elif dire==1:
-						direction[0]=1
-					elif dire==2:
-						direction[1]=1
-					elif dire==3:
-						direction[0]=-1
-					self.gameObject.setMoving(True,direction)
-					self.wanderCount/=2
-				else:
-					self.gameObject.setMoving(False)
-					self.setState("Idle")
+				self.wanderStep()
 			else:
 				self.wanderCount -= tick
 		self.gameObject.update(tick,moveCheck)
@@ -214,6 +218,7 @@ class BattleNPC(player.Player):
 		hitbox = [pygame.rect.Rect([16,7,28,61]),pygame.rect.Rect([7,8,28,60])]
 		self.battleGraphicObject = BattleGraphicObject(animations,[10,145],20,weapon=self.getInventory().getArm1())
 		self.battleObject = BattleObject(self.battleGraphicObject,hitbox,10,self.name,self.getInventory().getArm1(),level=1,exp=15,**self.job.getStartStats())
+		self.battleObject.updateWeapon(self.getInventory().getArm1(),animations)
 
 	## Returns if this is the player.
 	def isPlayer(self):
@@ -231,6 +236,8 @@ class sNPC(NPC):
 		self.dialog=Dialog
 		self.wander=Wander
 		self.wanderCount=0.0
+		self.timers=None
+		self.wanderTimer=None
 
 		self.talking=False
 		if Shop != None:
@@ -23,6 +23,7 @@ from pygame.locals import *
 from game.engine import GameObject
 from battle.engine import BattleObject
 from graphics.animation import Animation, AnimationFrame
+from graphics.assets import CompositeCache
 from graphics.overworld import GraphicObject
 from graphics.battle import BattleGraphicObject
 from battle.jobs.job import Warrior
@@ -35,6 +36,23 @@ ClothingTypes=1
 Colors = [[255,0,0],[255,127,0],[255,255,0],[127,255,0],[0,255,0],[0,255,127],[0,255,255],[0,127,255],[0,0,255],[255,255,255],[127,127,127],[100,50,0]]
 Classes = ["Warrior","Archer","Mage","Unarmed"]
 
+## Returns the four frames of a character's overworld walk cycle.
+#
+#  The frames are composited from the character's clothes, body and hair by the
+#  graphics.assets.CompositeCache, so characters dressed the same share them.
+#
+#  @param dire The direction the character is facing, "N", "E", "S" or "W". The east frames are the west ones mirrored.
+def getWalkFrames(ClothingType,ClothingColor,HairType,HairColor,dire):
+	flipped = dire == "E"
+	if flipped:
+		dire = "W"
+	path = config.AssetPath+"Player/Overworld/"
+	frames = []
+	for frame in range(1,4):
+		image = "/Walk"+dire+str(frame)+".png"
+		frames.append(CompositeCache.load((17,25),[(path+"Clothes/Type"+str(ClothingType)+image,ClothingColor),(path+"Body/Type"+str(ClothingType)+image,None),(path+"Hair/Type"+str(HairType)+image,HairColor)],flipped))
+	return [frames[0],frames[1],frames[0],frames[2]]
+
 ## Object that contains all of the information for the player's character.
 class Player(object):
 
@@ -56,7 +74,7 @@ class Player(object):
 		inven = []
 		for item in items:
 			inven.append(ItemFactory.createItem(*item))
-		self.inventory=Inventory(inven)
+		self.inventory=Inventory(inven,owner=self)
 
 		#self.inventory=Inventory([ItemFactory.createItem("EmptyPotion",3),ItemFactory.createItem("HealthPotion",5),ItemFactory.createItem("StrangePotion",20),ItemFactory.createItem("LeatherTunic","Purple"),ItemFactory.createItem("IronChestplate"),ItemFactory.createItem("WoodenShortSword")])
 		self.party=[]
@@ -88,6 +106,7 @@ class Player(object):
 		hitbox = [pygame.rect.Rect([16,7,28,61]),pygame.rect.Rect([7,8,28,60])]
 		self.battleGraphicObject = BattleGraphicObject(animations,[10,145],20,weapon=self.getInventory().getArm1())
 		self.battleObject = BattleObject(self.battleGraphicObject,hitbox,10,self.name,self.getInventory().getArm1(),level=1,exp=15,**self.job.getStartStats())
+		self.battleObject.updateWeapon(self.getInventory().getArm1(),animations)
 
 	## Constructs the overworld animations for this character.
 	#
@@ -99,48 +118,16 @@ class Player(object):
 	def constructAnimations(self,ClothingType,ClothingColor,HairType,HairColor,Preview=False):
 		animations = {"Idle":[Animation(None,None,"IdleN"),Animation(None,None,"IdleE"),Animation(None,None,"IdleS"),Animation(None,None,"IdleW")],"Walk":[Animation(None,None,"WalkN"),Animation(None,None,"WalkE"),Animation(None,None,"WalkS"),Animation(None,None,"WalkW")]}
 
-		self.icon = pygame.surface.Surface((27,27),flags=SRCALPHA)
-		base=pygame.image.load(config.AssetPath+"Player/Overworld/Profile/Base.png").convert_alpha()
-		clothes=pygame.image.load(config.AssetPath+"Player/Overworld/Profile/Shirt.png").convert_alpha()
-		clothes.fill(ClothingColor,special_flags=BLEND_MULT)
-		hair=pygame.image.load(config.AssetPath+"Player/Overworld/Profile/Hair"+str(HairType)+".png").convert_alpha()
-		hair.fill(HairColor,special_flags=BLEND_MULT)
-
-		self.icon.blit(base,[0,0])
-		self.icon.blit(clothes,[0,0])
-		self.icon.blit(hair,[0,0])
-
-		for dire in ["W","S","N"]:
-			if dire == "W":
-				direI = 3
-			elif dire == "S":
-				direI = 2
-			elif dire == "N":
-				direI = 0
-			for frame in range(1,4):
-				hair = pygame.image.load(config.AssetPath+"Player/Overworld/Hair/Type"+str(HairType)+"/Walk"+dire+str(frame)+".png").convert_alpha()
-				hair.fill(HairColor,special_flags=BLEND_MULT)
-				temp = pygame.surface.Surface((17,25),flags=SRCALPHA)
-				clothes = pygame.image.load(config.AssetPath+"Player/Overworld/Clothes/Type"+str(ClothingType)+"/Walk"+dire+str(frame)+".png").convert_alpha()
-				clothes.fill(ClothingColor,special_flags=BLEND_MULT)
-				body = pygame.image.load(config.AssetPath+"Player/Overworld/Body/Type"+str(ClothingType)+"/Walk"+dire+str(frame)+".png").convert_alpha()
-				temp.blit(clothes,(0,0))
-				temp.blit(body,(0,0))
-				temp.blit(hair,(0,0))
-				if frame == 3:
-					frame += 1
-				animations["Walk"][direI].addFrame(AnimationFrame(temp,0.20,None,frame-1))
-				if frame == 2:
-					animations["Walk"][direI].addFrame(AnimationFrame(animations["Walk"][direI].getSprite(),.20,None,2))
-		i=0
-		for frame in animations["Walk"][3].getFrames():
-			i+=1
-			animations["Walk"][1].addFrame(AnimationFrame(pygame.transform.flip(frame.image,True,False),frame.delay,None,i-1))
+		self.icon = CompositeCache.load((27,27),[(config.AssetPath+"Player/Overworld/Profile/Base.png",None),(config.AssetPath+"Player/Overworld/Profile/Shirt.png",ClothingColor),(config.AssetPath+"Player/Overworld/Profile/Hair"+str(HairType)+".png",HairColor)])
+
+		for direI,dire in enumerate(["N","E","S","W"]):
+			for number,image in enumerate(getWalkFrames(ClothingType,ClothingColor,HairType,HairColor,dire)):
+				animations["Walk"][direI].addFrame(AnimationFrame(image,0.20,number))
 		#Standing
-		animations["Idle"][0].addFrame(AnimationFrame(animations["Walk"][0].getSprite(),.1,None,0))
-		animations["Idle"][1].addFrame(AnimationFrame(animations["Walk"][1].getSprite(),.1,None,0))
-		animations["Idle"][2].addFrame(AnimationFrame(animations["Walk"][2].getSprite(),.1,None,0))
-		animations["Idle"][3].addFrame(AnimationFrame(animations["Walk"][3].getSprite(),.1,None,0))
+		animations["Idle"][0].addFrame(AnimationFrame(animations["Walk"][0].getSprite(),.1,0))
+		animations["Idle"][1].addFrame(AnimationFrame(animations["Walk"][1].getSprite(),.1,0))
+		animations["Idle"][2].addFrame(AnimationFrame(animations["Walk"][2].getSprite(),.1,0))
+		animations["Idle"][3].addFrame(AnimationFrame(animations["Walk"][3].getSprite(),.1,0))
 
 		return animations
 
@@ -159,33 +146,11 @@ class Player(object):
 			styleName = style.getName()
 
 		#Idle:
-		temp = pygame.surface.Surface((52,70),flags=SRCALPHA)
-
-		body = pygame.image.load(config.AssetPath+"Player/Battle/"+styleName+"/Body/Type"+str(self.clothingType)+"/Idle1.png").convert_alpha()
-		hair = pygame.image.load(config.AssetPath+"Player/Battle/"+styleName+"/Hair/Type"+str(self.hairType)+"/Idle1.png").convert_alpha()
-		hair.fill(self.hairColor,special_flags=BLEND_MULT)
-		shirt= pygame.image.load(config.AssetPath+"Player/Battle/"+styleName+"/Shirt/Type"+str(self.clothingType)+"/Idle1.png").convert_alpha()
-		shirt.fill(self.clothingColor,special_flags=BLEND_MULT)
-
-		temp.blit(shirt,(0,0))
-		temp.blit(body,(0,0))
-		temp.blit(hair,(0,0))
-		animations["Idle"][1].addFrame(AnimationFrame(temp,.5,None,0))
+		self.addBattleFrame(animations["Idle"],styleName,"Idle1.png",.5,0)
 
 		#Run:
 		for i in range(1,5):
-			temp = pygame.surface.Surface((52,70),flags=SRCALPHA)
-
-			body = pygame.image.load(config.AssetPath+"Player/Battle/"+styleName+"/Body/Type"+str(self.clothingType)+"/Walk"+str(i)+".png").convert_alpha()
-			hair = pygame.image.load(config.AssetPath+"Player/Battle/"+styleName+"/Hair/Type"+str(self.hairType)+"/Walk"+str(i)+".png").convert_alpha()
-			hair.fill(self.hairColor,special_flags=BLEND_MULT)
-			shirt= pygame.image.load(config.AssetPath+"Player/Battle/"+styleName+"/Shirt/Type"+str(self.clothingType)+"/Walk"+str(i)+".png").convert_alpha()
-			shirt.fill(self.clothingColor,special_flags=BLEND_MULT)
-
-			temp.blit(shirt,(0,0))
-			temp.blit(body,(0,0))
-			temp.blit(hair,(0,0))
-			animations["Run"][1].addFrame(AnimationFrame(temp,.17,None,i-1))
+			self.addBattleFrame(animations["Run"],styleName,"Walk"+str(i)+".png",.17,i-1)
 
 		##Attacking:
 		if style == "Unarmed" or style.getType() == "Combo":
@@ -201,18 +166,7 @@ class Player(object):
 			for i in range(1,chain+1):
 				animations["Attack"+str(i)] = [Animation(None,None,"Attack"+str(i)+"W"),Animation(None,None,"Attack"+str(i)+"E")]
 				for j in range(0,len(frameOrder[i-1])):
-					temp = pygame.surface.Surface((52,70),flags=SRCALPHA)
-
-					body = pygame.image.load(config.AssetPath+"Player/Battle/"+styleName+"/Body/Type"+str(self.clothingType)+"/"+frameOrder[i-1][j]).convert_alpha()
-					hair = pygame.image.load(config.AssetPath+"Player/Battle/"+styleName+"/Hair/Type"+str(self.hairType)+"/"+frameOrder[i-1][j]).convert_alpha()
-					hair.fill(self.hairColor,special_flags=BLEND_MULT)
-					shirt= pygame.image.load(config.AssetPath+"Player/Battle/"+styleName+"/Shirt/Type"+str(self.clothingType)+"/"+frameOrder[i-1][j]).convert_alpha()
-					shirt.fill(self.clothingColor,special_flags=BLEND_MULT)
-
-					temp.blit(shirt,(0,0))
-					temp.blit(body,(0,0))
-					temp.blit(hair,(0,0))
-					animations["Attack"+str(i)][1].addFrame(AnimationFrame(temp,frameDelay[i-1][j],None,j))
+					self.addBattleFrame(animations["Attack"+str(i)],styleName,frameOrder[i-1][j],frameDelay[i-1][j],j)
 		elif style.getType() == "Charge":
 			stages = style.getStages()
 			frameOrder = style.getFrameOrder()
@@ -220,126 +174,14 @@ class Player(object):
 
 			animations["Attack"] = [Animation(None,None,"Attack"+str(i)+"W"),Animation(None,None,"Attack"+str(i)+"E")]
 			for i in range(1,stages+1):
-				temp = pygame.surface.Surface((52,70),flags=SRCALPHA)
-
-				body = pygame.image.load(config.AssetPath+"Player/Battle/"+styleName+"/Body/Type"+str(self.clothingType)+"/"+frameOrder[i-1]).convert_alpha()
-				hair = pygame.image.load(config.AssetPath+"Player/Battle/"+styleName+"/Hair/Type"+str(self.hairType)+"/"+frameOrder[i-1]).convert_alpha()
-				hair.fill(self.hairColor,special_flags=BLEND_MULT)
-				shirt = pygame.image.load(config.AssetPath+"Player/Battle/"+styleName+"/Shirt/Type"+str(self.clothingType)+"/"+frameOrder[i-1]).convert_alpha()
-				shirt.fill(self.clothingColor,special_flags=BLEND_MULT)
-
-				temp.blit(shirt,(0,0))
-				temp.blit(body,(0,0))
-				temp.blit(hair,(0,0))
-
 				if i == stages:
-					animations["Attack"][1].addFrame(AnimationFrame(temp,10,None,i))
+					self.addBattleFrame(animations["Attack"],styleName,frameOrder[i-1],10,i)
 				else:
-					animations["Attack"][1].addFrame(AnimationFrame(temp,frameDelay,None,i))
-
-		#Death
-		temp = pygame.surface.Surface((70,70),flags=SRCALPHA)
-		body = pygame.image.load(config.AssetPath+"Player/Battle/"+styleName+"/Body/Type"+str(self.clothingType)+"/Death1.png").convert_alpha()
-		hair = pygame.image.load(config.AssetPath+"Player/Battle/"+styleName+"/Hair/Type"+str(self.hairType)+"/Death1.png").convert_alpha()
-		hair.fill(self.hairColor,special_flags=BLEND_MULT)
-		shirt= pygame.image.load(config.AssetPath+"Player/Battle/"+styleName+"/Shirt/Type"+str(self.clothingType)+"/Death1.png").convert_alpha()
-		shirt.fill(self.clothingColor,special_flags=BLEND_MULT)
-		temp.blit(shirt,(0,0))
-		temp.blit(body,(0,0))
-		temp.blit(hair,(0,0))
-		animations["Death"][1].addFrame(AnimationFrame(temp,.2,None,0))
-		temp = pygame.surface.Surface((70,70),flags=SRCALPHA)
-		body = pygame.image.load(config.AssetPath+"Player/Battle/"+styleName+"/Body/Type"+str(self.clothingType)+"/Dead.png").convert_alpha()
-		hair = pygame.image.load(config.AssetPath+"Player/Battle/"+styleName+"/Hair/Type"+str(self.hairType)+"/Dead.png").convert_alpha()
-		hair.fill(self.hairColor,special_flags=BLEND_MULT)
-		shirt= pygame.image.load(config.AssetPath+"Player/Battle/"+styleName+"/Shirt/Type"+str(self.clothingType)+"/Dead.png").convert_alpha()
-		shirt.fill(self.clothingColor,special_flags=BLEND_MULT)
-		temp.blit(shirt,(0,0))
-		temp.blit(body,(0,0))
-		temp.blit(hair,(0,0))
-		animations["Dead"][1].addFrame(AnimationFrame(temp,.5,None,0))
-		#animations[2][1].append(temp)
-		#animations[4][1].append(temp)
-
-		#temp = pygame.surface.Surface((52,70),flags=SRCALPHA)
-
-		#body = pygame.image.load("Player/Battle/"+Weapon+"/Body/Type"+str(ClothingType)+"/Idle1.png").convert_alpha()
-		#hair = pygame.image.load("Player/Battle/"+Weapon+"/Hair/Type"+str(HairType)+"/Idle1.png").convert_alpha()
-		#hair.fill(HairColor,special_flags=BLEND_MULT)
-		#shirt= pygame.image.load("Player/Battle/"+Weapon+"/Shirt/Type"+str(ClothingType)+"/Idle1.png").convert_alpha()
-		#shirt.fill(ClothingColor,special_flags=BLEND_MULT)
-
-		#temp.blit(shirt,(0,0))
-		#temp.blit(body,(0,0))
-		#temp.blit(hair,(0,0))
-		#animations[2][1].append(temp)
-		#animations[4][1].append(temp)
-
-		#for i in range(2,4):
-			#temp = pygame.surface.Surface((52,70),flags=SRCALPHA)
-
-			#body = pygame.image.load("Player/Battle/"+Weapon+"/Body/Type"+str(ClothingType)+"/Attack"+str(i)+".png").convert_alpha()
-			#hair = pygame.image.load("Player/Battle/"+Weapon+"/Hair/Type"+str(HairType)+"/Attack"+str(i)+".png").convert_alpha()
-			#hair.fill(HairColor,special_flags=BLEND_MULT)
-			#shirt= pygame.image.load("Player/Battle/"+Weapon+"/Shirt/Type"+str(ClothingType)+"/Attack"+str(i)+".png").convert_alpha()
-			#shirt.fill(ClothingColor,special_flags=BLEND_MULT)
-
-			#temp.blit(shirt,(0,0))
-			#temp.blit(body,(0,0))
-			#temp.blit(hair,(0,0))
-			#animations[3][1].append(temp)
-
-		#temp = pygame.surface.Surface((52,70),flags=SRCALPHA)
-
-		#body = pygame.image.load("Player/Battle/"+Weapon+"/Body/Type"+str(ClothingType)+"/Attack2.png").convert_alpha()
-		#hair = pygame.image.load("Player/Battle/"+Weapon+"/Hair/Type"+str(HairType)+"/Attack2.png").convert_alpha()
-		#hair.fill(HairColor,special_flags=BLEND_MULT)
-		#shirt= pygame.image.load("Player/Battle/"+Weapon+"/Shirt/Type"+str(ClothingType)+"/Attack2.png").convert_alpha()
-		#shirt.fill(ClothingColor,special_flags=BLEND_MULT)
-
-		#temp.blit(shirt,(0,0))
-		#temp.blit(body,(0,0))
-		#temp.blit(hair,(0,0))
-		#animations[3][1].append(temp)
-
-		##Create Mirroring
-		#Idle
-		temp = animations["Idle"][1].getFrames()
-		i=0
-		for frame in temp:
-			animations["Idle"][0].addFrame(AnimationFrame(pygame.transform.flip(frame.getImage(),True,False),frame.getDelay(),None,i))
-			i+=1
-		#Run
-		temp = animations["Run"][1].getFrames()
-		i=0
-		for frame in temp:
-			animations["Run"][0].addFrame(AnimationFrame(pygame.transform.flip(frame.getImage(),True,False),frame.getDelay(),None,i))
-			i+=1
-		#Attack
-		if style == "Unarmed" or style.getType() == "Combo":
-			for i in range(1,chain+1):
-				temp = animations["Attack"+str(i)][1].getFrames()
-				j = 0
-				for frame in temp:
-					animations["Attack"+str(i)][0].addFrame(AnimationFrame(pygame.transform.flip(frame.getImage(),True,False),frame.getDelay(),None,j))
-					j+=1
-		elif style.getType() == "Charge":
-			temp = animations["Attack"][1].getFrames()
-			i=0
-			for frame in temp:
-				animations["Attack"][0].addFrame(AnimationFrame(pygame.transform.flip(frame.getImage(),True,False),frame.getDelay(),None,1))
+					self.addBattleFrame(animations["Attack"],styleName,frameOrder[i-1],frameDelay,i)
 
 		#Death
-		temp = animations["Death"][1].getFrames()
-		i=0
-		for frame in temp:
-			animations["Death"][0].addFrame(AnimationFrame(pygame.transform.flip(frame.getImage(),True,False),frame.getDelay(),None,i))
-			i+=1
-		temp = animations["Dead"][1].getFrames()
-		i=0
-		for frame in temp:
-			animations["Dead"][0].addFrame(AnimationFrame(pygame.transform.flip(frame.getImage(),True,False),frame.getDelay(),None,i))
-			i+=1
+		self.addBattleFrame(animations["Death"],styleName,"Death1.png",.2,0,(70,70))
+		self.addBattleFrame(animations["Dead"],styleName,"Dead.png",.5,0,(70,70))
 
 		##And linking...
 		if style == "Unarmed" or style.getType() == "Combo":
@@ -351,6 +193,23 @@ class Player(object):
 
 		return animations
 
+	## Adds a frame to a pair of battle animations, the west facing one gets the frame mirrored.
+	#
+	#  The frames are composited from this character's shirt, body and hair by the CompositeCache, so
+	#  characters dressed the same with the same weapon style share them.
+	#
+	#  @param animations The [west, east] pair of Animations.
+	#  @param styleName The name of the weapon style the frame belongs to. (see Player/Battle/<styleName>)
+	#  @param image The file name of the frame, such as "Idle1.png".
+	#  @param delay How long the frame is shown for.
+	#  @param number The frame's number.
+	#  @param size The width and height of the frame.
+	def addBattleFrame(self,animations,styleName,image,delay,number,size=(52,70)):
+		path = config.AssetPath+"Player/Battle/"+styleName+"/"
+		layers = [(path+"Shirt/Type"+str(self.clothingType)+"/"+image,self.clothingColor),(path+"Body/Type"+str(self.clothingType)+"/"+image,None),(path+"Hair/Type"+str(self.hairType)+"/"+image,self.hairColor)]
+		animations[0].addFrame(AnimationFrame(CompositeCache.load(size,layers,True),delay,number))
+		animations[1].addFrame(AnimationFrame(CompositeCache.load(size,layers),delay,number))
+
 	def getSkillLevelUp(self):
 		if self.battleObject.level%2 == 0:
 			return True
@@ -477,12 +336,23 @@ class Player(object):
 		self.inventory.equip(item)
 		for stat in item.getStats():
 			self.battleObject.statOffsets[stat]+=item.getStats()[stat]
+		if item.getSlot()=="Arms":
+			self.updateBattleAnimations()
 
 	## Makes this character unequip an item and adjusted their stats.
 	def unequip(self,item):
 		self.inventory.unequip(item)
 		for stat in item.getStats():
 			self.battleObject.statOffsets[stat]-=item.getStats()[stat]
+		if item.getSlot()=="Arms":
+			self.updateBattleAnimations()
+
+	## Rebuilds this character's battle animations for the weapon they have equipped.
+	#
+	#  Battle animations are kept up to date as weapons are equipped and unequipped, so starting a
+	#  battle does not have to build anything.
+	def updateBattleAnimations(self):
+		self.battleObject.updateWeapon(self.getInventory().getArm1(),self.constructBattleAnimations())
 
 	## Returns if this is the player.
 	def isPlayer(self):
@@ -494,12 +364,17 @@ class Player(object):
 
 ## This object keeps track of all of the items and gold for the player.
 class Inventory(object):
-	def __init__(self,Items=None,gold=1000,size=0):
+	## Constructor
+	#
+	#  @param owner The Player whose inventory this is. Equipment removed from the inventory is unequipped
+	#  through Player.unequip() so their stats and battle animations are kept up to date.
+	def __init__(self,Items=None,gold=1000,size=0,owner=None):
 		if Items==None:
 			self.items=[]
 		else:
 			self.items=Items
 		self.gold=gold
+		self.owner=owner
 
 		self.size=size
 
@@ -724,6 +599,9 @@ class Inventory(object):
 	#  @param item Item to remove.
 	def remove(self,item):
 		if item.getEquiped():
-			self.unequip(item)
+			if self.owner==None:
+				self.unequip(item)
+			else:
+				self.owner.unequip(item)
 		self.items.remove(item)
 		self.update()
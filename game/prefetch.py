@@ -0,0 +1,51 @@
+## @package prefetch
+#  Documentation for the Prefetch Module.
+#
+#  This module contains the Prefetcher, which builds the areas the player could move to next on a
+#  worker thread so that changing areas only has to attach an already built level.
+
+from game import level
+from game.worker import Worker
+import errors
+import config
+
+## Builds levels in the background.
+#
+#  Levels are built with game.level.buildLevel() one at a time, in the order they were requested.
+#  Built levels are kept until they are taken with take() or the prefetcher is cancelled.
+class Prefetcher(Worker):
+
+	## Constructor.
+	#
+	#  @param limit The most levels that may be queued, being built or waiting to be taken at once.
+	#  Defaults to config.PrefetchAreas, no levels are prefetched if this is 0.
+	def __init__(self,limit=None):
+		if limit == None:
+			limit = config.PrefetchAreas
+		Worker.__init__(self,lambda area: level.buildLevel(config.AssetPath+area[0],area[1]),"Prefetcher")
+		self.limit = limit
+
+	## Queues levels to be built.
+	#
+	#  Levels which are already queued, being built or built are skipped, as is anything past the limit.
+	#
+	#  @param areas A list of (xml, level) tuples, with the xml paths relative to config.AssetPath.
+	def prefetch(self,areas):
+		with self.condition:
+			for area in areas:
+				if self.isPending(area):
+					continue
+				if len(self.queue)+len(self.ready)+(self.current != None) >= self.limit:
+					break
+				errors.debug("Prefetching level: "+area[1])
+				self.queue.append(area)
+			self.wake()
+
+	## Returns the PreparedLevel for a level if it has been prefetched, see game.worker.Worker.take().
+	#
+	#  @param xml Path to the level XML, relative to config.AssetPath.
+	#  @param name Name of the level inside the XML.
+	#
+	#  @return Returns the PreparedLevel, or @c None if the level has not been prefetched.
+	def take(self,xml,name):
+		return Worker.take(self,(xml,name))
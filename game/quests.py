@@ -5,6 +5,7 @@
 import json
 
 import errors
+import tokenizer
 
 ## This object represents a quest and contains the relative information for it.
 class Quest(object):
@@ -145,50 +146,24 @@ def loadQuest(xmlPath,quest):
 	errors.info("Loading quest: "+quest)
 
 	try:
-		filer = open(xmlPath,"r")
+		tokens = tokenizer.findBlock(xmlPath,"Quest",quest)
 	except IOError:
 		errors.critical("Quest file not found.")
 		exit()
 
-	lines = filer.readlines()
-
-	started=False
-
-	questData = []
-
-	for i in range(len(lines)):	#Strip Tabs and New Lines
-		lines[i] = lines[i].lstrip("\t").rstrip("\n")
-
-	for line in lines:	#Extract Quest Data
-		if not started:
-			if line == "<Quest "+quest+">":
-				started=True
-			continue
-		if line == "</Quest>":
-			break
-		questData.append(line)
-
 	args = {}
 	objectives=[]
 
-	i=0
-	while i < len(questData):
-		if questData[i].startswith("<Objective"):
+	for token in tokens:
+		record = tokenizer.readRecord(token,tokens)
+		if record.tag == "Objective":
 			temp = {}
-			n=1
-			temp["ident"] = questData[i].lstrip("<Objective").rstrip(">").lstrip(" ")
-			while questData[i+n]!="</Objective>":
-				key = questData[i+n][1:questData[i+n].find(">")]
-				value = questData[i+n][questData[i+n].find(">")+1:questData[i+n].find("<",questData[i+n].find(">"))]
-				temp[key[0].lower()+key[1:]]=json.loads(value)
-				n+=1
+			temp["ident"] = record.arg
+			for attr in record.children:
+				temp[attr.tag[0].lower()+attr.tag[1:]]=json.loads(attr.value)
 			objectives.append(temp)
-			i+=n+1
 		else:
-			key = questData[i][1:questData[i].find(">")]
-			value = questData[i][questData[i].find(">")+1:questData[i].find("<",questData[i].find(">"))]
-			args[key[0].lower()+key[1:]]=json.loads(value)
-			i+=1
+			args[record.tag[0].lower()+record.tag[1:]]=json.loads(record.value)
 
 	args["objectives"] = []
 	for objArgs in objectives:
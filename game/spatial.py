@@ -0,0 +1,99 @@
+## @package spatial
+#  Documentation for the Spatial Module.
+#
+#  This module contains the SpatialGrid, a uniform grid used to find the objects near a rectangle
+#  without testing every object in the level.
+
+## The default width and height of a grid cell, in pixels.
+CellSize = 64
+
+## A spatial hash of objects and their bounding rectangles.
+#
+#  The level is divided into square cells, each object is listed in every cell its rectangle touches.
+#  Objects must be hashable, they are stored by identity.
+class SpatialGrid(object):
+
+	## Constructor.
+	#
+	#  @param cellSize The width and height of a cell, in pixels.
+	def __init__(self,cellSize=CellSize):
+		self.cellSize = cellSize
+		self.cells = {}
+		self.rects = {}
+		self.ranges = {}
+
+	## Returns the range of cells covered by a rectangle as a tuple (left, top, right, bottom), inclusive.
+	def getRange(self,rect):
+		x,y,w,h = rect
+		size = self.cellSize
+		return (x//size,y//size,(x+max(w,1)-1)//size,(y+max(h,1)-1)//size)
+
+	## Adds an object, or moves it if it is already in the grid.
+	#
+	#  Nothing is done if the object's rectangle has not changed, so this is cheap to call every frame.
+	#
+	#  @param obj The object.
+	#  @param rect The object's bounding rectangle as a tuple (x, y, width, height).
+	def update(self,obj,rect):
+		if self.rects.get(obj) == rect:
+			return
+		self.rects[obj] = rect
+		cellRange = self.getRange(rect)
+		old = self.ranges.get(obj)
+		if old == cellRange:
+			return
+		if old != None:
+			self.removeCells(obj,old)
+		self.ranges[obj] = cellRange
+		cells = self.cells
+		for cx in xrange(cellRange[0],cellRange[2]+1):
+			for cy in xrange(cellRange[1],cellRange[3]+1):
+				if (cx,cy) in cells:
+					cells[(cx,cy)].append(obj)
+				else:
+					cells[(cx,cy)] = [obj]
+
+	## Removes an object from the grid, if it is in it.
+	def remove(self,obj):
+		if obj in self.ranges:
+			self.removeCells(obj,self.ranges.pop(obj))
+			del self.rects[obj]
+
+	## Removes an object from the cells in @c cellRange.
+	def removeCells(self,obj,cellRange):
+		cells = self.cells
+		for cx in xrange(cellRange[0],cellRange[2]+1):
+			for cy in xrange(cellRange[1],cellRange[3]+1):
+				cell = cells[(cx,cy)]
+				cell.remove(obj)
+				if len(cell) == 0:
+					del cells[(cx,cy)]
+
+	## Removes every object.
+	def clear(self):
+		self.cells = {}
+		self.rects = {}
+		self.ranges = {}
+
+	## Returns the objects whose rectangles may intersect a rectangle.
+	#
+	#  Every object sharing a cell with @c rect is returned, the caller still has to do its own exact test.
+	#
+	#  @param rect The rectangle as a tuple (x, y, width, height).
+	#
+	#  @return Returns a list of objects, each object is listed once. The list may belong to the grid and
+	#  must not be modified.
+	def query(self,rect):
+		left,top,right,bottom = self.getRange(rect)
+		cells = self.cells
+		if left == right and top == bottom:
+			return cells.get((left,top),[])
+		found = []
+		seen = set()
+		for cx in xrange(left,right+1):
+			for cy in xrange(top,bottom+1):
+				for obj in cells.get((cx,cy),()):
+					if obj not in seen:
+						seen.add(obj)
+						found.append(obj)
+		return found
@@ -0,0 +1,133 @@
+## @package timers
+#  Documentation for the Timers Module.
+#
+#  This module contains the TimerWheel, which calls functions once an amount of game time has passed.
+#
+#  Timers are kept in a hierarchical timing wheel: the first wheel has a slot for each of the next
+#  @c Slots ticks, the next wheel a slot for each of the next @c Slots groups of @c Slots ticks, and so
+#  on. Scheduling and cancelling a timer is constant time and advancing the wheel only has to look at
+#  the timers which are about to expire, however many timers are waiting.
+
+import math
+
+## The length of a tick of a TimerWheel, in seconds.
+Resolution = 0.01
+## How many slots each wheel of a TimerWheel has.
+Slots = 64
+## How many wheels a TimerWheel has, timers further away than Resolution*Slots**Levels seconds wait in an overflow list.
+Levels = 4
+
+## A function waiting to be called by a TimerWheel, see TimerWheel.schedule().
+class Timer(object):
+
+	## Constructor.
+	#
+	#  @param deadline The time the function should be called at, in seconds of the wheel's time.
+	#  @param func The function.
+	#  @param args The arguments to call the function with.
+	def __init__(self,deadline,func,args):
+		self.deadline = deadline
+		self.func = func
+		self.args = args
+		self.active = True
+
+	## Stops the function from being called.
+	def cancel(self):
+		self.active = False
+
+	## Returns whether or not the function is still waiting to be called.
+	def getActive(self):
+		return self.active
+
+## Calls functions after an amount of game time has passed.
+#
+#  Time only passes when advance() is called, so timers stop while the game is paused or in a battle.
+class TimerWheel(object):
+
+	## Constructor.
+	#
+	#  @param resolution The length of a tick, in seconds. Timers are never called early, the tick
+	#  length only decides how far ahead they are sorted into slots.
+	def __init__(self,resolution=Resolution):
+		self.resolution = resolution
+		self.time = 0.0
+		self.current = 0
+		self.wheels = [[[] for slot in xrange(Slots)] for level in xrange(Levels)]
+		self.overflow = []
+		self.soon = []
+
+	## Calls a function once an amount of time has passed.
+	#
+	#  @param delay How long to wait, in seconds. Delays of 0 or less are called by the next advance().
+	#  @param func The function.
+	#  @param args Any arguments to call the function with.
+	#
+	#  @return Returns the Timer, which can be used to cancel the call.
+	def schedule(self,delay,func,*args):
+		timer = Timer(self.time+delay,func,args)
+		self.insert(timer)
+		return timer
+
+	## Returns how long is left until a timer is due, in seconds. Negative if it is overdue.
+	def getRemaining(self,timer):
+		return timer.deadline-self.time
+
+	## Returns how much time has passed, in seconds.
+	def getTime(self):
+		return self.time
+
+	## Sorts a timer into the slot for the tick it is due in.
+	def insert(self,timer):
+		tick = int(math.floor(timer.deadline/self.resolution))
+		delta = tick-self.current
+		if delta <= 0:
+			self.soon.append(timer)
+			return
+		span = 1
+		for wheel in self.wheels:
+			if delta < span*Slots:
+				wheel[(tick//span)%Slots].append(timer)
+				return
+			span *= Slots
+		self.overflow.append(timer)
+
+	## Moves time forwards and calls every function that is due, in the order they are due.
+	#
+	#  Functions may schedule more timers, any which are already due are called by the next advance().
+	#
+	#  @param tick How much time has passed, in seconds.
+	def advance(self,tick):
+		self.time += tick
+		target = int(math.floor(self.time/self.resolution))
+		due = self.soon
+		self.soon = []
+		while self.current < target:
+			self.current += 1
+			span = Slots
+			for level in xrange(1,Levels):	#Timers are moved to the next wheel down as their slot comes up.
+				if self.current%span != 0:
+					break
+				slot = self.wheels[level][(self.current//span)%Slots]
+				self.wheels[level][(self.current//span)%Slots] = []
+				for timer in slot:
+					self.insert(timer)
+				span *= Slots
+			else:
+				if self.current%span == 0:
+					overflow = self.overflow
+					self.overflow = []
+					for timer in overflow:
+						self.insert(timer)
+			due.extend(self.wheels[0][self.current%Slots])
+			self.wheels[0][self.current%Slots] = []
+		due.extend(self.soon)
+		self.soon = []
+		due.sort(key=lambda timer: timer.deadline)
+		for timer in due:
+			if not timer.active:
+				continue
+			if timer.deadline > self.time:	#Due later in the current tick.
+				self.soon.append(timer)
+				continue
+			timer.active = False
+			timer.func(*timer.args)
@@ -14,6 +14,8 @@
 #
 
 import errors
+from items.factory import ItemFactory
+from spatial import SpatialGrid
 
 ## Container for trigger information.
 #
@@ -48,6 +50,8 @@ class Trigger(object):
 	#    + "TBSC" - Changes the state of an object after an amount of time has passed. See TBSCTrigger().
 	#    + "Battle" - Starts a battle.
 	#
+	#  New effects are added by subclassing Trigger, overriding fire() and registering the subclass with
+	#  TriggerFactory.addEffect().
 	#  @endparblock
 	#  @param AutoReset Determines whether or not this trigger must be manually reset with a call to reset().
 	#  @param Active Determines whether this trigger can be triggered.
@@ -109,12 +113,22 @@ class Trigger(object):
 	#  This trigger is just the base class, it should be overwritten by any subclasses for custom triggering code.
 	#  Prints out the trigger type by default.
 	#  @param triggerer The actor that caused the trigger to activate.
-	#  @param objects A list of all objects and actors in the current area.
-	def trigger(self,triggerer,objects):
+	#  @param actors A dictionary mapping the IDs of the actors in the current area to lists of the actors
+	#  with that ID, see game.engine.GameEngine.getActorsByID().
+	def trigger(self,triggerer,actors):
 		if self.triggerCheck():
 			errors.info(self.cat+" Triggered")
 			self.triggered = True
 
+	## Carries out this trigger's effect, called by the game.engine.GameEngine once the trigger has been activated.
+	#
+	#  By default this calls trigger() with the actors in the current area, subclasses whose effects
+	#  reach outside of the area override it.
+	#  @param engine The game.engine.GameEngine the trigger belongs to.
+	#  @param triggerer The actor that caused the trigger to activate.
+	def fire(self,engine,triggerer):
+		self.trigger(triggerer,engine.actorIDs)
+
 
 ## State Set %Trigger
 #
@@ -144,14 +158,14 @@ class StateSetTrigger(Trigger):
 	#
 	#  This changes the state of @c Target to @c NewState
 	#  @param triggerer The actor that caused the trigger to activate.
-	#  @param objects A list of all objects and actors in the current area.
-	def trigger(self,triggerer,objects):
+	#  @param actors A dictionary mapping the IDs of the actors in the current area to lists of the actors
+	#  with that ID, see game.engine.GameEngine.getActorsByID().
+	def trigger(self,triggerer,actors):
 		if self.triggerCheck():
-			for Object in objects:
-				if Object.getID()==self.target:
-					Object.setState(self.newState)
-					errors.debug(self.getID()+" triggered.")
-					self.triggered = True
+			for Object in actors.get(self.target,()):
+				Object.setState(self.newState)
+				errors.debug(self.getID()+" triggered.")
+				self.triggered = True
 
 ## State Toggle %Trigger
 #
@@ -179,17 +193,17 @@ class StateToggleTrigger(Trigger):
 	#
 	#  The secondary state will be toggled to if triggered while @c Target is in the @c PrimaryState.
 	#  @param triggerer The actor that caused the trigger to activate.
-	#  @param objects A list of all objects and actors in the current area.
-	def trigger(self,triggerer,objects):
+	#  @param actors A dictionary mapping the IDs of the actors in the current area to lists of the actors
+	#  with that ID, see game.engine.GameEngine.getActorsByID().
+	def trigger(self,triggerer,actors):
 		if self.triggerCheck():
-			for Object in objects:
-				if Object.getID()==self.target:
-					if Object.getState()==self.primaryState:
-						Object.setState(self.secondaryState)
-					else:
-						Object.setState(self.primaryState)
-					errors.debug(self.getID()+" triggered.")
-					self.triggered = True
+			for Object in actors.get(self.target,()):
+				if Object.getState()==self.primaryState:
+					Object.setState(self.secondaryState)
+				else:
+					Object.setState(self.primaryState)
+				errors.debug(self.getID()+" triggered.")
+				self.triggered = True
 
 ## Area Change %Trigger
 #
@@ -220,6 +234,14 @@ class AreaChangeTrigger(Trigger):
 	def getPlayerPos(self):
 		return self.playerPos
 
+	## Changes the area and moves the player to @c PlayerPos.
+	#
+	#  @param engine The game.engine.GameEngine the trigger belongs to.
+	#  @param triggerer The actor that caused the trigger to activate.
+	def fire(self,engine,triggerer):
+		engine.loadNewAreaFunc(self.newAreaXML,self.newArea)
+		engine.player.setPos(self.playerPos)
+
 ## State Based State Change (SBSC) %Trigger
 #
 #  This trigger changes the state of a target based on the state of other objects in the current area.
@@ -247,14 +269,14 @@ class SBSCTrigger(Trigger):
 	#
 	#  This sets the state of @c Target when all objects in @c NeededStates in the @c State state.
 	#  @param triggerer The actor that caused the trigger to activate.
-	#  @param objects A list of all objects and actors in the current area.
-	def trigger(self,triggerer,objects):
+	#  @param actors A dictionary mapping the IDs of the actors in the current area to lists of the actors
+	#  with that ID, see game.engine.GameEngine.getActorsByID().
+	def trigger(self,triggerer,actors):
 		if self.triggerCheck():
-			for Object in objects:
-				if Object.getID()==self.target:
-					Object.setState(self.newState)
-					errors.debug(self.getID()+" triggered.")
-					self.triggered = True
+			for Object in actors.get(self.target,()):
+				Object.setState(self.newState)
+				errors.debug(self.getID()+" triggered.")
+				self.triggered = True
 
 ## Time Based State Change (TBSC) %Trigger
 #
@@ -274,32 +296,62 @@ class TBSCTrigger(Trigger):		#Time Based State Change (TBSC)
 		self.target = Target
 		self.newState = NewState
 		self.timeLeft = Time
+		self.counting = False
+		self.actors = {}
+		self.timers = None
+		self.timer = None
+
+	## Sets the game.timers.TimerWheel used to count down, see game.engine.GameEngine.addTrigger().
+	#
+	#  If @c None the countdown is paused, without a TimerWheel update() has to be called every frame instead.
+	def setTimers(self,timers):
+		if self.timer != None:
+			self.timeLeft = self.timers.getRemaining(self.timer)
+			self.timer.cancel()
+			self.timer = None
+		self.timers = timers
+		if self.timers != None and self.counting:
+			self.timer = self.timers.schedule(self.timeLeft,self.expire)
 
 	## Updates the timer.
 	#
-	#  Updates the timer and eventually causes the state change.
+	#  Only needed when no TimerWheel has been set with setTimers().
 	#  @param tick time since last call, in seconds.
-	#  @param objectsA list of all objects and actors in the current area.
-	def update(self,tick,objects):
-		if self.triggered:
+	#  @param actors A dictionary mapping the IDs of the actors in the current area to lists of the actors
+	#  with that ID, see game.engine.GameEngine.getActorsByID().
+	def update(self,tick,actors):
+		if self.counting and self.timers == None:
 			self.timeLeft -= tick
 			if self.timeLeft<=0:
-				for Object in objects:
-					if Object.getID()==self.target:
-						Object.setState(self.newState)
-						if self.autoReset:
-							self.reset()
+				self.actors = actors
+				self.expire()
+
+	## Changes the state of @c Target once the time is up.
+	def expire(self):
+		self.counting = False
+		self.timer = None
+		for Object in self.actors.get(self.target,()):
+			Object.setState(self.newState)
+			if self.autoReset:
+				self.reset()
 
 	## Activates this trigger.
 	#
 	#  Starts the timer until the state of @c Target is changed..
 	#  @param triggerer The actor that caused the trigger to activate.
-	#  @param objects A list of all objects and actors in the current area.
-	def trigger(self,triggerer,objects):
+	#  @param actors A dictionary mapping the IDs of the actors in the current area to lists of the actors
+	#  with that ID, see game.engine.GameEngine.getActorsByID().
+	def trigger(self,triggerer,actors):
 		if self.triggerCheck():
+			if self.timer != None:	#Triggering again restarts the timer.
+				self.timer.cancel()
+				self.timer = None
 			self.timeLeft = self.time
+			self.counting = True
+			self.actors = actors
 			errors.debug(self.getID()+" triggered.")
 			self.triggered = True
+			self.setTimers(self.timers)
 
 ## Battle %Trigger
 #
@@ -347,6 +399,14 @@ class BattleTrigger(Trigger):
 		else:
 			return True
 
+	## Starts the battle.
+	#
+	#  @param engine The game.engine.GameEngine the trigger belongs to.
+	#  @param triggerer The actor that caused the trigger to activate.
+	def fire(self,engine,triggerer):
+		if not self.trigger():
+			engine.battle(self.enemies,self.bg,self.bgFar,self.random)
+
 ## %Item %Trigger
 #
 #  Gives the player an item.
@@ -370,6 +430,15 @@ class ItemTrigger(Trigger):
 		else:
 			return True
 
+	## Gives the item to the player.
+	#
+	#  @param engine The game.engine.GameEngine the trigger belongs to.
+	#  @param triggerer The actor that caused the trigger to activate.
+	def fire(self,engine,triggerer):
+		if not self.trigger():
+			item = ItemFactory.createItem(*self.item)
+			engine.player.getParent().getInventory().addItem(item)
+
 ## %Quest %Trigger
 #
 #  Completes an objective for a quest.
@@ -401,4 +470,94 @@ class QuestCompleteTrigger(Trigger):
 		else:
 			return True
 
-#class Effect(object):
+	## Completes the objective.
+	#
+	#  @param engine The game.engine.GameEngine the trigger belongs to.
+	#  @param triggerer The actor that caused the trigger to activate.
+	def fire(self,engine,triggerer):
+		if not self.trigger():
+			engine.questAction(["Complete",self.questXML,self.quest,self.objective])
+
+## Creates triggers from their effects, see game.level.buildLevel().
+class TriggerFactory(object):
+	effects = {}
+
+	## Registers the Trigger subclass or function used to create triggers with an effect.
+	#
+	#  @param effect The effect, as it is written in level XMLs.
+	#  @param factory Called with the trigger's attributes, other than its effect, as keyword arguments.
+	@staticmethod
+	def addEffect(effect,factory):
+		TriggerFactory.effects[effect] = factory
+
+	## Creates a trigger.
+	#
+	#  @param effect The trigger's effect.
+	#  @param kwargs The trigger's other attributes.
+	#
+	#  @return Returns the trigger, or @c None if the effect is unknown.
+	@staticmethod
+	def createTrigger(effect,**kwargs):
+		if effect not in TriggerFactory.effects:
+			errors.error("Undefined Trigger Effect: "+str(effect))
+			return None
+		return TriggerFactory.effects[effect](**kwargs)
+
+TriggerFactory.addEffect("State Set",StateSetTrigger)
+TriggerFactory.addEffect("State Toggle",StateToggleTrigger)
+TriggerFactory.addEffect("Area Change",AreaChangeTrigger)
+TriggerFactory.addEffect("SBSC",SBSCTrigger)
+TriggerFactory.addEffect("TBSC",TBSCTrigger)
+TriggerFactory.addEffect("Battle",BattleTrigger)
+TriggerFactory.addEffect("Item",ItemTrigger)
+TriggerFactory.addEffect("Quest Complete",QuestCompleteTrigger)
+
+## The trigger types which are activated by something being inside of their area.
+AreaTypes = ("Position","Object Position","Action")
+
+## Finds the triggers of a level by where they can be activated from.
+#
+#  Triggers with an area and a type in AreaTypes are kept in a SpatialGrid for each type, so the
+#  triggers at a point can be found without testing every trigger.
+class TriggerIndex(object):
+
+	## Constructor.
+	def __init__(self):
+		self.grids = {}
+		self.order = {}
+
+	## Adds a trigger.
+	#
+	#  Triggers keep the order they were added in, see sort().
+	def add(self,trigger):
+		self.order[trigger] = len(self.order)
+		if trigger.getType() in AreaTypes and trigger.getArea() != None:
+			if trigger.getType() not in self.grids:
+				self.grids[trigger.getType()] = SpatialGrid()
+			self.grids[trigger.getType()].update(trigger,tuple(trigger.getArea()))
+
+	## Removes every trigger.
+	def clear(self):
+		self.grids = {}
+		self.order = {}
+
+	## Returns the triggers of a type whose areas contain a point.
+	#
+	#  @param Type The type of trigger, one of AreaTypes.
+	#  @param point The point as a tuple or list (x, y).
+	#
+	#  @return Returns a list of triggers in the order they were added.
+	def query(self,Type,point):
+		grid = self.grids.get(Type)
+		if grid == None:
+			return []
+		x,y = int(point[0]),int(point[1])
+		return self.sort([trigger for trigger in grid.query((x,y,1,1)) if trigger.getArea().collidepoint(x,y)])
+
+	## Sorts triggers into the order they were added in, dropping any duplicates.
+	def sort(self,triggers):
+		return sorted(set(triggers),key=self.order.get)
+
+	## Returns the position of a trigger in the order triggers were added in.
+	def getOrder(self,trigger):
+		return self.order[trigger]
@@ -0,0 +1,122 @@
+## @package worker
+#  Documentation for the Worker Module.
+#
+#  This module contains the Worker, which builds things on a background thread, such as the levels
+#  built by the game.prefetch.Prefetcher and the chunks built by the game.chunks.ChunkStreamer.
+
+import atexit
+import threading
+import weakref
+
+import errors
+
+## Every Worker which has not been garbage collected, so they can all be stopped when the program exits.
+workers = weakref.WeakSet()
+
+## Builds queued keys on a worker thread, one at a time and in the order they were queued.
+#
+#  Built results are kept until they are taken with take() or the worker is cancelled. The thread is
+#  started when the first key is queued, and can be stopped with stop() and started again by queueing
+#  more keys.
+class Worker(object):
+
+	## Constructor.
+	#
+	#  @param build The function which builds a key, it is passed the key and returns the result. It is
+	#  called on the worker thread.
+	#  @param name The name of the worker thread, used in error messages.
+	def __init__(self,build,name):
+		self.build = build
+		self.name = name
+		self.condition = threading.Condition()
+		self.queue = []
+		self.ready = {}
+		self.current = None
+		self.cancelled = False
+		self.stopped = False
+		self.thread = None
+		workers.add(self)
+
+	## Returns whether or not a key is queued, being built or built.
+	#
+	#  The condition must be held.
+	def isPending(self,key):
+		return key in self.queue or key in self.ready or key == self.current
+
+	## Starts the worker thread if there is anything queued, and wakes it up.
+	#
+	#  The condition must be held.
+	def wake(self):
+		if len(self.queue) > 0 and self.thread == None:
+			self.thread = threading.Thread(target=self.run,name=self.name)
+			self.thread.daemon = True
+			self.thread.start()
+		self.condition.notifyAll()
+
+	## Returns the result for a key if it has been built.
+	#
+	#  If the key is currently being built this waits for it to finish. If it is still queued it is
+	#  removed from the queue, since the caller is about to build it anyway.
+	#
+	#  @return Returns the result, or @c None if the key has not been built.
+	def take(self,key):
+		with self.condition:
+			if key in self.queue:
+				self.queue.remove(key)
+			if self.current == key:
+				self.cancelled = False
+			while self.current == key:
+				self.condition.wait()
+			return self.ready.pop(key,None)
+
+	## Drops every queued and built result, a key which is currently being built is dropped once it is done.
+	def cancel(self):
+		with self.condition:
+			self.queue = []
+			self.ready = {}
+			if self.current != None:
+				self.cancelled = True
+
+	## Stops the worker thread, waiting for the key currently being built.
+	#
+	#  Called automatically for every worker when the program exits.
+	def stop(self):
+		with self.condition:
+			self.stopped = True
+			self.queue = []
+			self.condition.notifyAll()
+			thread = self.thread
+		if thread != None:
+			thread.join()
+		with self.condition:
+			self.thread = None
+			self.stopped = False
+
+	## Builds queued keys until stop() is called.
+	def run(self):
+		while True:
+			with self.condition:
+				while len(self.queue) == 0 and not self.stopped:
+					self.condition.wait()
+				if self.stopped:
+					return
+				self.current = self.queue.pop(0)
+				self.cancelled = False
+			key = self.current
+			try:
+				result = self.build(key)
+			except (Exception,SystemExit) as e:	#Building can exit if a file is missing, which would otherwise kill this thread.
+				errors.error(self.name+": Unable to build "+str(key)+": "+str(e))
+				result = None
+			with self.condition:
+				if result != None and not self.cancelled:
+					self.ready[key] = result
+				self.current = None
+				self.condition.notifyAll()
+
+## Stops every worker, called when the program exits.
+def stopAll():
+	for worker in list(workers):
+		worker.stop()
+
+atexit.register(stopAll)
@@ -1 +1 @@
-__all__ = ["battle","overworld","gui","animation","scale_screen"]
+__all__ = ["assets","battle","overworld","gui","animation","scale_screen"]
@@ -1,5 +1,10 @@
+import bisect
+import weakref
+
 import pygame
 import config
+import tokenizer
+from assets import AssetCache
 
 ## Container for a single frame in an animation.
 class AnimationFrame(object):
@@ -7,14 +12,11 @@ class AnimationFrame(object):
 	## Constructor.
 	#  @param image Image data.
 	#  @param delay Delay before proceeding to next frame, in seconds.
-	#  @param nextFrame Reference to next AnimationFrame.
 	#  @param number Frame number.
-	def __init__(self,image,delay,nextFrame,number):
+	def __init__(self,image,delay,number):
 		self.image = image
 		self.delay = delay
-		self.nextFrame = nextFrame
 		self.number = number
-		self.count = 0
 	
 	## Returns this frame's image data
 	def getImage(self):
@@ -24,68 +26,107 @@ class AnimationFrame(object):
 	def getDelay(self):
 		return self.delay
 	
-	## Returns the next frame.
-	def getNextFrame(self):
-		return self.nextFrame
-	
 	## Returns this frame's frame number.
 	def getNumber(self):
 		return self.number
-	
-	## Updates this frame and returns the current frame.
-	#  @param tick Time that has passed since last clock cycle in seconds.
-	def update(self,tick):
-		self.count += tick
-		if self.count >= self.delay:
-			self.count=0
-			return self.nextFrame
-		else:
-			return self
-	
-	## Resets frame to original state.
-	def reset(self):
-		self.count = 0
 
-## Container for a sequence of frames.
+## The frames of an animation, shared by every Animation playing them.
+#
+#  The frames' images and delays are kept in lists, along with the time each frame ends at counted
+#  from the start of the clip. Clips loaded from a file are shared, see loadClip(), and must not be
+#  changed once they have been built.
+class AnimationClip(object):
+
+	## Constructor.
+	def __init__(self):
+		self.frames = []
+		self.images = []
+		self.delays = []
+		self.ends = []
+		self.indices = {}
+		self.flipped = None
+
+	## Adds a frame to the end of the clip.
+	#  @param frame AnimationFrame to be added.
+	def addFrame(self,frame):
+		self.indices.setdefault(frame.number,len(self.frames))
+		self.frames.append(frame)
+		self.images.append(frame.image)
+		self.delays.append(frame.delay)
+		self.ends.append(frame.delay+(self.ends[-1] if len(self.ends) > 0 else 0))
+
+	## Returns a list of AnimationFrame objects in the clip.
+	#
+	#  The list belongs to the clip and must not be modified, use addFrame() to add frames.
+	def getFrames(self):
+		return self.frames
+
+	## Returns how long the clip takes to play through once, in seconds.
+	def getLength(self):
+		return self.ends[-1] if len(self.ends) > 0 else 0
+
+	## Returns the index of the first frame with a frame number, or @c None if there is none.
+	def getIndex(self,number):
+		return self.indices.get(number)
+
+	## Returns the index of the frame shown at a time since the start of the clip, in seconds.
+	def getIndexAt(self,time):
+		return min(bisect.bisect_right(self.ends,time),len(self.ends)-1)
+
+	## Returns a copy of this clip with every frame mirrored horizontally.
+	#
+	#  The mirrored clip is only made once, its frames are numbered in order from 0.
+	def getFlipped(self):
+		if self.flipped == None:
+			self.flipped = AnimationClip()
+			for i,frame in enumerate(self.frames):
+				self.flipped.addFrame(AnimationFrame(pygame.transform.flip(frame.image,True,False),frame.delay,i))
+		return self.flipped
+
+## Plays an AnimationClip.
+#
+#  Each object has its own Animations, which keep track of where it is in the clip and which
+#  animation follows. The playhead is the index of the current frame and how long it has been shown
+#  for, so seeking to a frame or a time does not have to walk through the frames.
 class Animation(object):
 	
 	## Constructor.
-	#  @param firstFrame First AnimationFrame in the sequence.
+	#  @param firstFrame First AnimationFrame in the sequence, or @c None to start empty.
 	#  @param nextAnimation Reference to next Animation.
 	#  @param name Name of animation.
-	def __init__(self,firstFrame,nextAnimation,name):
-		self.firstFrame = firstFrame
+	#  @param clip The AnimationClip to play. If @c None the animation gets a clip of its own, which
+	#  frames can be added to with addFrame().
+	def __init__(self,firstFrame,nextAnimation,name,clip=None):
+		if clip == None:
+			clip = AnimationClip()
+		self.clip = clip
 		self.nextAnimation = nextAnimation
-		self.frame = self.firstFrame
 		self.name = name
+		self.index = 0
+		self.elapsed = 0
+		if firstFrame != None:
+			self.addFrame(firstFrame)
 	
-	## Adds a frame to the animation.
+	## Adds a frame to the end of the animation's clip.
 	#  @param frame Frame to be added.
 	def addFrame(self,frame):
-		if self.firstFrame == None:
-			self.firstFrame = frame
-			self.frame = self.firstFrame
-		else:
-			temp = self.firstFrame
-			while temp.nextFrame != None:
-				temp = temp.nextFrame
-			temp.nextFrame = frame
+		self.clip.addFrame(frame)
 	
-	## Returns a list of AnimationFrame objects in the animation.
+	## Returns a list of AnimationFrame objects in the animation, see AnimationClip.getFrames().
 	def getFrames(self):
-		temp = self.firstFrame
-		if temp == None:
-			return []
-		else:
-			ret = [temp]
-			while temp.nextFrame != None:
-				temp = temp.nextFrame
-				ret.append(temp)
-			return ret
+		return self.clip.frames
+	
+	## Returns the AnimationClip being played.
+	def getClip(self):
+		return self.clip
+	
+	## Returns a new Animation playing the same clip from the start, with the same next animation.
+	def getCopy(self):
+		return Animation(None,self.nextAnimation,self.name,self.clip)
 	
 	## Returns the current frame number.
 	def getFrame(self):
-		return self.frame.number + (float(self.frame.count)/self.frame.delay)
+		return self.clip.frames[self.index].number + (float(self.elapsed)/self.clip.delays[self.index])
 	
 	## Returns the next animation.
 	def getNextAnimation(self):
@@ -96,16 +137,31 @@ class Animation(object):
 		return self.name
 	
 	## Sets the current frame number.
+	#
+	#  The fraction is how far through the frame to start. If no frame has the number the animation
+	#  starts from the beginning.
 	def setFrame(self,frame):
-		temp = self.firstFrame
-		while temp.number != int(frame):
-			if temp.nextFrame == None:
-				if temp.number<int(frame):
-					self.frame=self.firstFrame
-					return
-			temp = temp.nextFrame
-		self.frame = temp
-		self.frame.count = (frame-int(frame))*self.frame.delay
+		index = self.clip.getIndex(int(frame))
+		if index == None:
+			self.index = 0
+			self.elapsed = 0
+		else:
+			self.index = index
+			self.elapsed = (frame-int(frame))*self.clip.delays[index]
+	
+	## Returns how long the animation takes to play through once, in seconds.
+	def getLength(self):
+		return self.clip.getLength()
+	
+	## Sets the current time since the start of the animation, in seconds.
+	#
+	#  Times past the end of the animation wrap around to the start.
+	def setTime(self,time):
+		length = self.clip.getLength()
+		if length > 0:
+			time %= length
+		self.index = self.clip.getIndexAt(time)
+		self.elapsed = time-(self.clip.ends[self.index-1] if self.index > 0 else 0)
 	
 	## Sets the next animation, useful for manual linking.
 	def setNextAnimation(self,animation):
@@ -113,29 +169,148 @@ class Animation(object):
 	
 	## Updates this animation and returns the current animation.
 	#
-	#  Also updates the current frame.
+	#  Moves on at most one frame per update, the time left over from the frame is dropped.
 	#  @param tick Time that has passed since last clock cycle in seconds.
 	def update(self,tick):
-		self.frame = self.frame.update(tick)
-		if self.frame == None:
-			self.frame = self.firstFrame
-			if self.nextAnimation == None:
-				return self
-			else:
-				return self.nextAnimation
-		else:
-			return self
+		self.elapsed += tick
+		delays = self.clip.delays
+		if self.elapsed >= delays[self.index]:
+			self.elapsed = 0
+			self.index += 1
+			if self.index == len(delays):
+				self.index = 0
+				if self.nextAnimation != None:
+					return self.nextAnimation
+		return self
 	
 	## Resets animation to original state.
-	#
-	#  Also resets current frame to original state.
 	def reset(self):
-		self.frame.reset()
-		self.frame = self.firstFrame
+		self.index = 0
+		self.elapsed = 0
 	
 	## Returns the current frame's image.
 	def getSprite(self):
-		return self.frame.image
+		return self.clip.images[self.index]
+
+## Copies a dictionary of animations, as used by GraphicObjects, so that it can be played separately.
+#
+#  The copies share their clips with the originals. Animations the dictionary's animations link to
+#  are copied as well, even if they are not in the dictionary, and the links are pointed at the
+#  matching copies.
+#
+#  @param animations A dictionary mapping states to lists or dictionaries of Animations, which may be @c None.
+def copyAnimations(animations):
+	pending = []
+	for directions in animations.itervalues():
+		if isinstance(directions,dict):
+			directions = directions.values()
+		pending.extend(animation for animation in directions if animation != None)
+	copies = {}
+	while len(pending) > 0:
+		animation = pending.pop()
+		if animation not in copies:
+			copies[animation] = animation.getCopy()
+			if animation.nextAnimation != None:
+				pending.append(animation.nextAnimation)
+	for copy in copies.itervalues():
+		if copy.nextAnimation in copies:
+			copy.nextAnimation = copies[copy.nextAnimation]
+	ret = {}
+	for state,directions in animations.iteritems():
+		if isinstance(directions,dict):
+			ret[state] = dict((key,copies.get(animation)) for key,animation in directions.iteritems())
+		else:
+			ret[state] = [copies.get(animation) for animation in directions]
+	return ret
+
+## Index of every animation in an animation file.
+#
+#  The whole file is parsed when the index is created. Use getAnimationFile() rather than creating
+#  these directly, so that each file is only indexed once.
+class AnimationFile(object):
+
+	## Constructor.
+	#  @param xmlPath Path to xml file containing animation data, relative to config.AssetPath.
+	def __init__(self,xmlPath):
+		self.path = xmlPath
+		self.animations = {}
+		tokens = tokenizer.tokenize(config.AssetPath+xmlPath)
+		for token in tokens:
+			if token[0] == tokenizer.OPEN and token[1] == "Animation":
+				self.animations[token[2]] = self.parseAnimation(tokenizer.readRecord(token,tokens))
+
+	## Converts an @c Animation record into a tuple (nextAnimation, frames).
+	#
+	#  @c frames is a list of (image path, delay, number) tuples.
+	def parseAnimation(self,record):
+		frames = []
+		globalDelay = None
+		nextAnimation=None
+		
+		for attr in record.children:
+			if attr.tag == "delay":
+				globalDelay = float(attr.value)
+			elif attr.tag == "nextAnimation":
+				nextAnimation = attr.value
+			elif attr.tag == "Frame":
+				image =None
+				number=len(frames)
+				delay = globalDelay
+				
+				for frameAttr in attr.children:
+					if frameAttr.tag == "image":
+						image = frameAttr.value
+					elif frameAttr.tag == "number":
+						number = int(frameAttr.value)
+					elif frameAttr.tag == "delay":
+						delay = float(frameAttr.value)
+				
+				frames.append((image,delay,number))
+		return nextAnimation,frames
+
+	## Returns the name of the animation following the given animation.
+	def getNextAnimation(self,name):
+		return self.animations[name][0]
+
+	## Returns a list of (image, delay, number) tuples for the frames of the given animation.
+	#
+	#  Images are loaded through the AssetCache.
+	def getFrames(self,name):
+		frames = []
+		for image,delay,number in self.animations[name][1]:
+			if image != None:
+				image = AssetCache.load(config.AssetPath+image)
+			frames.append((image,delay,number))
+		return frames
+
+## Animation files indexed so far, keyed by path.
+AnimationFiles = {}
+
+## Returns the AnimationFile for the given path, indexing the file if it has not been read yet.
+#  @param xmlPath Path to xml file containing animation data, relative to config.AssetPath.
+def getAnimationFile(xmlPath):
+	if xmlPath not in AnimationFiles:
+		AnimationFiles[xmlPath] = AnimationFile(xmlPath)
+	return AnimationFiles[xmlPath]
+
+## Clips loaded so far and still in use, keyed by (xmlPath, animation).
+Clips = weakref.WeakValueDictionary()
+
+## Returns the AnimationClip for an animation in a file, see loadAnimation().
+#
+#  Clips are shared for as long as any Animation is playing them, so the frames of an animation are
+#  only loaded once however many objects use it.
+#
+#  @param xmlPath Path to xml file containing animation data.
+#  @param animation Name of animation to load from file.
+def loadClip(xmlPath,animation):
+	clip = Clips.get((xmlPath,animation))
+	if clip == None:
+		clip = AnimationClip()
+		for image,delay,number in getAnimationFile(xmlPath).getFrames(animation):
+			clip.addFrame(AnimationFrame(image,delay,number))
+		Clips[(xmlPath,animation)] = clip
+	return clip
 
 ## Loads an animation from a file and returns an Animation object
 #
@@ -151,63 +326,15 @@ class Animation(object):
 #
 #  @note
 #  @parblock
-#  Frames will be linked in the order they are listed.
+#  Frames will be played in the order they are listed.
 #
 #  i.e. The first frame listed, will be displayed first. The second frame listed, will be displayed second. etc.
 #  @endparblock
 #
 #  @param xmlPath Path to xml file containing animation data.
 #  @param animation Name of animation to load from file.
+#
+#  @note Each file is only read once, see AnimationFile. The returned Animation shares its clip with
+#  every other Animation loaded from the same block, see loadClip().
 def loadAnimation(xmlPath,animation):
-	filer = open(config.AssetPath+xmlPath,"r")
-	lines = filer.readlines()
-	
-	started=False
-	animData = []
-	
-	for i in range(len(lines)):	#Strip Tabs and New Lines
-		lines[i] = lines[i].lstrip("\t").rstrip("\n")
-	
-	for line in lines:	#Extract Level Data
-		if not started:
-			if line == "<Animation "+animation+">":
-				started=True
-			continue
-		if line == "</Animation>":
-			animData.append(line)
-			break
-		animData.append(line)
-	
-	frames = []
-	i = 0
-	globalDelay = None
-	nextAnimation=None
-	
-	while animData[i]!="</Animation>":
-		if animData[i].startswith("<delay>"):
-			globalDelay = float(animData[i][7:-8])
-		if animData[i].startswith("<nextAnimation>"):
-			nextAnimation = animData[i][15:-16]
-		elif animData[i] == "<Frame>":
-			i+=1
-			
-			image =None
-			number=len(frames)
-			delay = globalDelay
-			
-			while animData[i] != "</Frame>":
-				if animData[i].startswith("<image>"):
-					image = pygame.image.load(config.AssetPath+animData[i][7:-8]).convert_alpha()
-				elif animData[i].startswith("<number>"):
-					number = int(animData[i][8:-9])
-				elif animData[i].startswith("<delay>"):
-					delay = float(animData[i][7:-8])
-				i+=1
-			
-			frames.append(AnimationFrame(image,delay,None,number))
-		i+=1
-	
-	for i in range(len(frames)-1):
-		frames[i].nextFrame = frames[i+1]
-	
-	return Animation(frames[0],nextAnimation,animation)
+	return Animation(None,getAnimationFile(xmlPath).getNextAnimation(animation),animation,loadClip(xmlPath,animation))
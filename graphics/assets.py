@@ -0,0 +1,200 @@
+## @package assets
+#  Documentation for the Assets Module.
+#
+#  This module contains the AssetCache, which every image in the game should be loaded through, and
+#  the CompositeCache, which keeps images built by stacking other images on top of each other.
+
+import threading
+from collections import OrderedDict
+
+import pygame
+from pygame.locals import *
+
+import config
+import errors
+from graphics.tiles import TiledBackground
+
+## Shared cache of loaded images.
+#
+#  Images are keyed by their path and how they were converted, so the same file is only decoded
+#  once. Surfaces handed out by the cache are shared, anything that needs to draw onto or tint an
+#  image must take a copy of it first.
+#
+#  The cache is limited to config.AssetCacheSize bytes, the least recently used images are dropped
+#  first.
+class AssetCache(object):
+	## Loaded surfaces keyed by (path, mode), in order of use.
+	surfaces = OrderedDict()
+	## Total size of the loaded surfaces in bytes.
+	size = 0
+	## Number of loads answered from the cache.
+	hits = 0
+	## Number of loads which had to decode an image.
+	misses = 0
+	## Guards the cache so images can be loaded from more than one thread.
+	lock = threading.RLock()
+
+	## Loads an image.
+	#
+	#  @param path Path to the image.
+	#  @param mode
+	#  @parblock
+	#  How the image should be converted.
+	#
+	#    Modes:
+	#    + "alpha" - Converted with per pixel alpha, see pygame.Surface.convert_alpha().
+	#    + "opaque" - Converted without alpha, see pygame.Surface.convert().
+	#    + "raw" - Not converted.
+	#    + "tiled" - Converted without alpha and split into a graphics.tiles.TiledBackground, for level backgrounds.
+	#  @endparblock
+	#
+	#  @return Returns the image, it is shared and must not be modified.
+	@staticmethod
+	def load(path,mode="alpha"):
+		key = (path,mode)
+		with AssetCache.lock:
+			if key in AssetCache.surfaces:
+				AssetCache.hits += 1
+				surface = AssetCache.surfaces.pop(key)
+				AssetCache.surfaces[key] = surface
+				return surface
+			AssetCache.misses += 1
+		surface = pygame.image.load(path)	#Decoded without the lock so other threads can use the cache meanwhile.
+		if mode == "alpha":
+			surface = surface.convert_alpha()
+		elif mode == "opaque":
+			surface = surface.convert()
+		elif mode == "tiled":
+			surface = TiledBackground(surface.convert())
+		with AssetCache.lock:
+			if key in AssetCache.surfaces:	#Loaded by another thread in the meantime.
+				surface = AssetCache.surfaces.pop(key)
+				AssetCache.surfaces[key] = surface
+				return surface
+			AssetCache.surfaces[key] = surface
+			AssetCache.size += AssetCache.getSize(surface)
+			AssetCache.evict()
+			return surface
+
+	## Returns the number of bytes used by a surface or TiledBackground.
+	@staticmethod
+	def getSize(surface):
+		if isinstance(surface,TiledBackground):
+			return surface.getBytes()
+		return surface.get_pitch()*surface.get_height()
+
+	## Drops the least recently used images until the cache is within config.AssetCacheSize.
+	#
+	#  The most recently used image is always kept.
+	@staticmethod
+	def evict():
+		with AssetCache.lock:
+			while AssetCache.size > config.AssetCacheSize and len(AssetCache.surfaces) > 1:
+				key,surface = AssetCache.surfaces.popitem(False)
+				AssetCache.size -= AssetCache.getSize(surface)
+				errors.debug("Evicted image: "+key[0])
+
+	## Drops every image from the cache.
+	@staticmethod
+	def clear():
+		with AssetCache.lock:
+			AssetCache.surfaces.clear()
+			AssetCache.size = 0
+
+	## Returns a dictionary with the hits, misses, number of entries and size in bytes of the cache.
+	@staticmethod
+	def getStats():
+		with AssetCache.lock:
+			return {"hits":AssetCache.hits,"misses":AssetCache.misses,"entries":len(AssetCache.surfaces),"size":AssetCache.size}
+
+	## Logs the cache statistics.
+	@staticmethod
+	def report():
+		stats = AssetCache.getStats()
+		errors.info("AssetCache: %(hits)d hits, %(misses)d misses, %(entries)d images, %(size)d bytes" % stats)
+
+## Shared cache of images built by tinting and stacking layers, such as the frames of characters.
+#
+#  Composites are keyed by their size, their layers and whether they are mirrored, so characters
+#  dressed the same share their frames and building a character again only has to look them up.
+#  Like the AssetCache, the surfaces are shared and must not be modified.
+#
+#  The cache is limited to config.CompositeCacheSize bytes, the least recently used composites are
+#  dropped first.
+class CompositeCache(object):
+	## Built surfaces keyed by (size, layers, flipped), in order of use.
+	surfaces = OrderedDict()
+	## Total size of the built surfaces in bytes.
+	size = 0
+	## Number of loads answered from the cache.
+	hits = 0
+	## Number of loads which had to build a composite.
+	misses = 0
+	## Guards the cache so composites can be built from more than one thread.
+	lock = threading.Lock()
+
+	## Builds a composite, or returns it if it has already been built.
+	#
+	#  @param size The width and height of the composite.
+	#  @param layers A list of (path, color) pairs, bottom layer first. Each image is loaded through the
+	#  AssetCache and multiplied by its color before it is drawn, or drawn as it is if its color is @c None.
+	#  @param flipped Whether or not the composite should be mirrored horizontally.
+	#
+	#  @return Returns the composite, it is shared and must not be modified.
+	@staticmethod
+	def load(size,layers,flipped=False):
+		key = (tuple(size),tuple((path,None if color == None else tuple(color)) for path,color in layers),flipped)
+		with CompositeCache.lock:
+			if key in CompositeCache.surfaces:
+				CompositeCache.hits += 1
+				surface = CompositeCache.surfaces.pop(key)
+				CompositeCache.surfaces[key] = surface
+				return surface
+			CompositeCache.misses += 1
+		if flipped:
+			surface = pygame.transform.flip(CompositeCache.load(size,layers),True,False)
+		else:
+			surface = pygame.surface.Surface(size,flags=SRCALPHA)
+			for path,color in layers:
+				image = AssetCache.load(path)
+				if color != None:
+					image = image.copy()
+					image.fill(color,special_flags=BLEND_MULT)
+				surface.blit(image,(0,0))
+		with CompositeCache.lock:
+			if key in CompositeCache.surfaces:	#Built by another thread in the meantime.
+				surface = CompositeCache.surfaces.pop(key)
+				CompositeCache.surfaces[key] = surface
+				return surface
+			CompositeCache.surfaces[key] = surface
+			CompositeCache.size += surface.get_pitch()*surface.get_height()
+			CompositeCache.evict()
+			return surface
+
+	## Drops the least recently used composites until the cache is within config.CompositeCacheSize.
+	#
+	#  The most recently used composite is always kept. The lock must be held.
+	@staticmethod
+	def evict():
+		while CompositeCache.size > config.CompositeCacheSize and len(CompositeCache.surfaces) > 1:
+			key,surface = CompositeCache.surfaces.popitem(False)
+			CompositeCache.size -= surface.get_pitch()*surface.get_height()
+
+	## Drops every composite from the cache.
+	@staticmethod
+	def clear():
+		with CompositeCache.lock:
+			CompositeCache.surfaces.clear()
+			CompositeCache.size = 0
+
+	## Returns a dictionary with the hits, misses, number of entries and size in bytes of the cache.
+	@staticmethod
+	def getStats():
+		with CompositeCache.lock:
+			return {"hits":CompositeCache.hits,"misses":CompositeCache.misses,"entries":len(CompositeCache.surfaces),"size":CompositeCache.size}
+
+	## Logs the cache statistics.
+	@staticmethod
+	def report():
+		stats = CompositeCache.getStats()
+		errors.info("CompositeCache: %(hits)d hits, %(misses)d misses, %(entries)d composites, %(size)d bytes" % stats)
@@ -1,7 +1,8 @@
 import pygame
 from pygame.locals import *
 
-from animation import Animation, AnimationFrame, loadAnimation
+from animation import Animation, loadAnimation, copyAnimations
+from assets import AssetCache
 import gui
 import config
 
@@ -35,16 +36,30 @@ class BattleGraphicsEngine(object):
 		self.dmgVals = []
 		self.hud = gui.BattleHUD([])
 
-		self.bgG=pygame.image.load(config.AssetPath+bg+"G.png").convert()	#Ground
-		self.bgC=pygame.image.load(config.AssetPath+bg+"C.png").convert_alpha()	#Close Objects
-		if farBG:
-			self.bgF=pygame.image.load(config.AssetPath+"Backgrounds/Battle/"+bg+"F.png").convert()	#Far Objects
-		else:
-			self.bgF=None
+		self.bgG,self.bgC,self.bgF = BattleGraphicsEngine.loadBackground(bg,farBG)
 
 		self.compEffect=None
 		self.compValue=[0,0,0]
 
+	## Loads the images of a battle background.
+	#
+	#  Levels call this for their battle backgrounds when they are loaded, so that the images are
+	#  already in the AssetCache when a battle starts.
+	#
+	#  @param bg Path to the background, relative to config.AssetPath and without the layer suffix.
+	#  @param farBG Whether or not the background has a far layer.
+	#
+	#  @return Returns the (ground, close objects, far objects) images, far objects is @c None if there is no far layer.
+	@staticmethod
+	def loadBackground(bg,farBG=False):
+		ground=AssetCache.load(config.AssetPath+bg+"G.png","opaque")
+		close=AssetCache.load(config.AssetPath+bg+"C.png")
+		if farBG:
+			far=AssetCache.load(config.AssetPath+"Backgrounds/Battle/"+bg+"F.png","opaque")
+		else:
+			far=None
+		return ground,close,far
+
 	## Returns the Battle HUD.
 	def getHud(self):
 		return self.hud
@@ -364,55 +379,31 @@ class BattleGraphicObject(object):
 			self.weaponAnimCurr = self.weaponAnim[state][direction]
 
 	def getCopy(self):
-		return BattleGraphicObject(self.animations,self.getPos(),self.spd,self.direction,self.state,self.weapon)
+		return BattleGraphicObject(copyAnimations(self.animations),self.getPos(),self.spd,self.direction,self.state,self.weapon)
+
+	## Loads one of the weapon's animations and returns it as a list [west, east].
+	#
+	#  The west animation mirrors the east one, both play clips shared by every object using the weapon.
+	#  @param name Name of the animation in the weapon's animation file.
+	#  @param westName Name of the mirrored animation.
+	def loadWeaponAnim(self,name,westName):
+		east = loadAnimation(self.weapon.getAnimationPath(),name)
+		return [Animation(None,None,westName,east.getClip().getFlipped()),east]
 
 	## Generates the weapons animation data.
 	def genWeaponAnim(self):
 		if self.weapon != None:
 			self.weaponAnim = {}
-			self.weaponAnim["Idle"] = [Animation(None,None,"IdleW"),loadAnimation(self.weapon.getAnimationPath(),"Idle")]
-			self.weaponAnim["Run"] = [Animation(None,None,"WalkW"),loadAnimation(self.weapon.getAnimationPath(),"Walk")]
+			self.weaponAnim["Idle"] = self.loadWeaponAnim("Idle","IdleW")
+			self.weaponAnim["Run"] = self.loadWeaponAnim("Walk","WalkW")
 
 			if self.weapon.getStyle().getType() == "Chain":
 				for i in range(1,self.weapon.getStyle().getChain()+1):
-					self.weaponAnim["Attack"+str(i)] = [Animation(None,None,"AttackW"+str(i)),loadAnimation(self.weapon.getAnimationPath(),"Attack"+str(i))]
+					self.weaponAnim["Attack"+str(i)] = self.loadWeaponAnim("Attack"+str(i),"AttackW"+str(i))
 			elif self.weapon.getStyle().getType() == "Charge":
-				self.weaponAnim["Attack"] = [Animation(None,None,"AttackW"),loadAnimation(self.weapon.getAnimationPath(),"Attack")]
-
-			self.weaponAnim["Death"] = [Animation(None,None,"DeathW"),loadAnimation(self.weapon.getAnimationPath(),"Death")]
-
-			#Mirroring
-			temp = self.weaponAnim["Idle"][1].getFrames()
-			i=0
-			for frame in temp:
-				self.weaponAnim["Idle"][0].addFrame(AnimationFrame(pygame.transform.flip(frame.getImage(),True,False),frame.getDelay(),None,i))
-				i+=1
-			#Run
-			temp = self.weaponAnim["Run"][1].getFrames()
-			i=0
-			for frame in temp:
-				self.weaponAnim["Run"][0].addFrame(AnimationFrame(pygame.transform.flip(frame.getImage(),True,False),frame.getDelay(),None,i))
-				i+=1
-			#Attack
-			if self.weapon.getStyle().getType() == "Chain":
-				for i in range(1,self.weapon.getStyle().getChain()+1):
-					temp = self.weaponAnim["Attack"+str(i)][1].getFrames()
-					j = 0
-					for frame in temp:
-						self.weaponAnim["Attack"+str(i)][0].addFrame(AnimationFrame(pygame.transform.flip(frame.getImage(),True,False),frame.getDelay(),None,j))
-						j+=1
-			elif self.weapon.getStyle().getType() == "Charge":
-				temp = self.weaponAnim["Attack"][1].getFrames()
-				i=0
-				for frame in temp:
-					self.weaponAnim["Attack"][0].addFrame(AnimationFrame(pygame.transform.flip(frame.getImage(),True,False),frame.getDelay(),None,i))
-					i+=1
-			#Death
-			temp = self.weaponAnim["Death"][1].getFrames()
-			i=0
-			for frame in temp:
-				self.weaponAnim["Death"][0].addFrame(AnimationFrame(pygame.transform.flip(frame.getImage(),True,False),frame.getDelay(),None,i))
-				i+=1
+				self.weaponAnim["Attack"] = self.loadWeaponAnim("Attack","AttackW")
+
+			self.weaponAnim["Death"] = self.loadWeaponAnim("Death","DeathW")
 
 			#Linking
 			if self.weapon.getStyle().getType() == "Chain":
@@ -50,6 +50,7 @@
 import pygame
 from pygame.locals import *
 
+from graphics.assets import AssetCache
 import errors
 import config
 
@@ -114,52 +115,52 @@ class Icons():
 	@staticmethod
 	def load():
 		errors.debug("Loading Icons")
-		Icons.cont = pygame.image.load(config.AssetPath+"Icons/Cont.png").convert_alpha()
-		Icons.cursor = pygame.image.load(config.AssetPath+"Icons/Cursor.png").convert_alpha()
-		Icons.cursorBlink = pygame.image.load(config.AssetPath+"Icons/CursorBlink.png").convert_alpha()
-		Icons.cursorTab = pygame.image.load(config.AssetPath+"Icons/CursorTab.png").convert_alpha()
-		Icons.cursorTabBlink = pygame.image.load(config.AssetPath+"Icons/CursorTabBlink.png").convert_alpha()
-		Icons.cursorChar = pygame.image.load(config.AssetPath+"Icons/CursorChar.png").convert_alpha()
-		Icons.cursorCharBlink = pygame.image.load(config.AssetPath+"Icons/CursorCharBlink.png").convert_alpha()
+		Icons.cont = AssetCache.load(config.AssetPath+"Icons/Cont.png")
+		Icons.cursor = AssetCache.load(config.AssetPath+"Icons/Cursor.png").copy()
+		Icons.cursorBlink = AssetCache.load(config.AssetPath+"Icons/CursorBlink.png").copy()
+		Icons.cursorTab = AssetCache.load(config.AssetPath+"Icons/CursorTab.png").copy()
+		Icons.cursorTabBlink = AssetCache.load(config.AssetPath+"Icons/CursorTabBlink.png").copy()
+		Icons.cursorChar = AssetCache.load(config.AssetPath+"Icons/CursorChar.png").copy()
+		Icons.cursorCharBlink = AssetCache.load(config.AssetPath+"Icons/CursorCharBlink.png").copy()
 		Icons.cursor.fill(config.ColorSel,special_flags=BLEND_RGBA_MULT)
 		Icons.cursorBlink.fill(config.ColorSel,special_flags=BLEND_RGBA_MULT)
 		Icons.cursorTab.fill(config.ColorSel,special_flags=BLEND_RGBA_MULT)
 		Icons.cursorTabBlink.fill(config.ColorSel,special_flags=BLEND_RGBA_MULT)
 		Icons.cursorChar.fill(config.ColorSel,special_flags=BLEND_RGBA_MULT)
 		Icons.cursorCharBlink.fill(config.ColorSel,special_flags=BLEND_RGBA_MULT)
-		Icons.iconBG = pygame.image.load(config.AssetPath+"Icons/IconBG.png").convert()
-		Icons.iconBGE = pygame.image.load(config.AssetPath+"Icons/IconBG.png").convert()
+		Icons.iconBG = AssetCache.load(config.AssetPath+"Icons/IconBG.png","opaque")
+		Icons.iconBGE = AssetCache.load(config.AssetPath+"Icons/IconBG.png","opaque").copy()
 		Icons.iconBGE.fill([32,255,32],special_flags=BLEND_RGBA_MULT)
-		Icons.iconBGSmall = pygame.image.load(config.AssetPath+"Icons/IconBGSmall.png").convert()
-		Icons.lock = pygame.image.load(config.AssetPath+"Icons/Locked.png").convert_alpha()
-
-		Icons.headArmor = pygame.image.load(config.AssetPath+"Icons/HeadArmor.png").convert_alpha()
-		Icons.bodyArmor = pygame.image.load(config.AssetPath+"Icons/BodyArmor.png").convert_alpha()
-		Icons.legsArmor = pygame.image.load(config.AssetPath+"Icons/LegsArmor.png").convert_alpha()
-		Icons.bootArmor = pygame.image.load(config.AssetPath+"Icons/BootArmor.png").convert_alpha()
-		Icons.arm1Armor = pygame.image.load(config.AssetPath+"Icons/Arm1Armor.png").convert_alpha()
-		Icons.arm2Armor = pygame.image.load(config.AssetPath+"Icons/Arm2Armor.png").convert_alpha()
-
-		Icons.gold = pygame.image.load(config.AssetPath+"Icons/Gold.png").convert_alpha()
-
-		Icons.inventory = pygame.image.load(config.AssetPath+"Icons/Inven.png").convert_alpha()
-		Icons.armor = pygame.image.load(config.AssetPath+"Icons/Armor.png").convert_alpha()
-		Icons.party = pygame.image.load(config.AssetPath+"Icons/Party.png").convert_alpha()
-		Icons.globe = pygame.image.load(config.AssetPath+"Icons/Map.png").convert_alpha()
-		Icons.quests = pygame.image.load(config.AssetPath+"Icons/Quests.png").convert_alpha()
-
-		Icons.warrior = pygame.image.load(config.AssetPath+"Icons/Warrior.png").convert()
-		Icons.warriorSmall = pygame.image.load(config.AssetPath+"Icons/WarriorSmall.png").convert()
-		Icons.archer = pygame.image.load(config.AssetPath+"Icons/Archer.png").convert()
-		Icons.archerSmall = pygame.image.load(config.AssetPath+"Icons/ArcherSmall.png").convert()
-		Icons.mage = pygame.image.load(config.AssetPath+"Icons/Mage?.png").convert()
-		Icons.mageSmall = pygame.image.load(config.AssetPath+"Icons/MageSmall?.png").convert()
-
-		Icons.rightArrow = pygame.image.load(config.AssetPath+"Icons/RightArrow.png").convert_alpha()
+		Icons.iconBGSmall = AssetCache.load(config.AssetPath+"Icons/IconBGSmall.png","opaque")
+		Icons.lock = AssetCache.load(config.AssetPath+"Icons/Locked.png")
+
+		Icons.headArmor = AssetCache.load(config.AssetPath+"Icons/HeadArmor.png")
+		Icons.bodyArmor = AssetCache.load(config.AssetPath+"Icons/BodyArmor.png")
+		Icons.legsArmor = AssetCache.load(config.AssetPath+"Icons/LegsArmor.png")
+		Icons.bootArmor = AssetCache.load(config.AssetPath+"Icons/BootArmor.png")
+		Icons.arm1Armor = AssetCache.load(config.AssetPath+"Icons/Arm1Armor.png")
+		Icons.arm2Armor = AssetCache.load(config.AssetPath+"Icons/Arm2Armor.png")
+
+		Icons.gold = AssetCache.load(config.AssetPath+"Icons/Gold.png")
+
+		Icons.inventory = AssetCache.load(config.AssetPath+"Icons/Inven.png")
+		Icons.armor = AssetCache.load(config.AssetPath+"Icons/Armor.png")
+		Icons.party = AssetCache.load(config.AssetPath+"Icons/Party.png")
+		Icons.globe = AssetCache.load(config.AssetPath+"Icons/Map.png")
+		Icons.quests = AssetCache.load(config.AssetPath+"Icons/Quests.png")
+
+		Icons.warrior = AssetCache.load(config.AssetPath+"Icons/Warrior.png","opaque")
+		Icons.warriorSmall = AssetCache.load(config.AssetPath+"Icons/WarriorSmall.png","opaque")
+		Icons.archer = AssetCache.load(config.AssetPath+"Icons/Archer.png","opaque")
+		Icons.archerSmall = AssetCache.load(config.AssetPath+"Icons/ArcherSmall.png","opaque")
+		Icons.mage = AssetCache.load(config.AssetPath+"Icons/Mage?.png","opaque")
+		Icons.mageSmall = AssetCache.load(config.AssetPath+"Icons/MageSmall?.png","opaque")
+
+		Icons.rightArrow = AssetCache.load(config.AssetPath+"Icons/RightArrow.png")
 		Icons.leftArrow = pygame.transform.flip(Icons.rightArrow,True,False)
-		Icons.upArrow = pygame.image.load(config.AssetPath+"Icons/UpArrow.png").convert_alpha()
+		Icons.upArrow = AssetCache.load(config.AssetPath+"Icons/UpArrow.png")
 		Icons.downArrow = pygame.transform.flip(Icons.upArrow,False,True)
-		Icons.circ = pygame.image.load(config.AssetPath+"Icons/Circ.png").convert_alpha()
+		Icons.circ = AssetCache.load(config.AssetPath+"Icons/Circ.png")
 
 ## Helpful for scrolling text.
 #
@@ -1,8 +1,18 @@
+import bisect
+import sys
+
 import pygame
 from pygame.locals import *
 
 import gui
 from graphics.transitions import fadeBlackTrans
+from graphics.assets import AssetCache
+from graphics.tiles import TiledBackground
+from game.spatial import SpatialGrid
+import config
+
+## How far outside of the screen, in pixels, an object can be and still count as visible, see GraphicsEngine.update().
+CullMargin = 16
 
 ## Sort function for sorting by y
 #
@@ -13,6 +23,27 @@ def sortY(a):
 		print "Sort Error: "+str(type(a))
 	return int(a.getPos()[1]+a.getHeight())
 
+## Merges overlapping rectangles.
+#
+#  @param rects A list of rectangles, empty rectangles are dropped.
+#  @param bounds If given, rectangles are clipped to this rectangle first.
+#
+#  @return Returns a list of pygame.Rect objects, none of which overlap.
+def mergeRects(rects,bounds=None):
+	merged = []
+	for rect in rects:
+		rect = pygame.Rect(rect)
+		if bounds != None:
+			rect = rect.clip(bounds)
+		if rect.width == 0 or rect.height == 0:
+			continue
+		i = rect.collidelist(merged)
+		while i != -1:
+			rect.union_ip(merged.pop(i))
+			i = rect.collidelist(merged)
+		merged.append(rect)
+	return merged
+
 ## Graphics Engine for main portion of game.
 #
 #  Only one instance of the graphics engine should be running at any given time.
@@ -25,8 +56,15 @@ class GraphicsEngine(object):
 		self.screen = screen
 		self.isScaled = isScaled
 		self.objects = []
+		self.objectGrid = SpatialGrid()
+		self.objectOrder = {}
+		self.nextOrder = 0
+		self.animating = set()
+		self.maxSize = [0,0]
+		self.layers = {}
+		self.depths = {}
 		self.player = None
-		self.background = pygame.surface.Surface([0,0])
+		self.background = TiledBackground(pygame.surface.Surface([0,0]))
 		self.cameraPosX = 0
 		self.cameraPosY = 0
 		self.focus=None
@@ -48,16 +86,107 @@ class GraphicsEngine(object):
 		self.compValue = [0,0,0]
 		self.compValChg = None
 
+		#What was drawn last frame, see update().
+		self.drawn = {}
+		self.overlay = []
+		self.lastOffset = None
+		self.lastBackground = None
+		self.lastDraws = None
+		self.redrawAll = True
+
 	## Add an object.
 	#
 	#  Adds an object to the list of objects to be drawn and updated.
 	#  @param Object Object to be added.
 	def addObject(self,Object):
 		self.objects.append(Object)
+		self.objectOrder[Object] = self.nextOrder
+		self.nextOrder += 1
+		size = Object.getMaxSize()
+		self.maxSize = [max(self.maxSize[0],size[0]),max(self.maxSize[1],size[1])]
+		Object.setChangeFunc(self.objectChanged)
+		self.objectChanged(Object)
+
+	## Removes an object.
+	#  @param Object Object to be removed.
+	def removeObject(self,Object):
+		Object.setChangeFunc(None)
+		self.objects.remove(Object)
+		self.objectGrid.remove(Object)
+		del self.objectOrder[Object]
+		self.animating.discard(Object)
+		if Object in self.depths:
+			layer = self.layers[max(Object.layer,-1)]
+			del layer[bisect.bisect_left(layer,self.depths.pop(Object))]
+
+	## Adds a chunk of a chunked level, see game.chunks.
+	def addChunk(self,chunk):
+		self.background.setChunk(chunk.pos,chunk.background)
+		for Object in chunk.objects:
+			self.addObject(Object)
+		self.redrawAll = True
+
+	## Removes a chunk of a chunked level, see game.chunks.
+	def removeChunk(self,chunk):
+		self.background.removeChunk(chunk.pos)
+		for Object in chunk.objects:
+			self.removeObject(Object)
+		self.redrawAll = True
 
 	## Clears object list.
 	def clearObjects(self):
+		for Object in self.objects:
+			Object.setChangeFunc(None)
 		self.objects = []
+		self.objectGrid.clear()
+		self.objectOrder = {}
+		self.nextOrder = 0
+		self.animating = set()
+		self.maxSize = [0,0]
+		self.layers = {}
+		self.depths = {}
+
+	## Called by objects whenever they move or change animation.
+	#
+	#  Objects are kept in a SpatialGrid by their positions so that update() only has to look at the
+	#  objects near the camera. Objects playing an animation which leads into another are remembered
+	#  so that they can be kept running while they are out of view.
+	def objectChanged(self,Object):
+		self.objectGrid.update(Object,(int(Object.x),int(Object.y),1,1))
+		if Object.currentAnimation.nextAnimation not in (None,Object.currentAnimation):
+			self.animating.add(Object)
+
+	## Moves the objects in view into the right place in their layers for this frame.
+	#
+	#  Each layer is a list of (depth, order, object) tuples sorted by depth, the bottom of the
+	#  object's sprite, and then by the order objects were added in. The layers are kept between
+	#  frames, so only objects which have moved, changed size or come into view have to be put back
+	#  in place. Every layer below 0 is kept together in layer -1.
+	#
+	#  @param visible A dictionary mapping each object in view, including the player, to a tuple
+	#  (sprite, rect, layer) of what it is being drawn as this frame.
+	def sortLayers(self,visible):
+		depths = self.depths
+		last = sys.maxint	#The player goes in front of objects at the same depth, no object is ever given this order.
+		for Object,(sprite,rect,layer) in visible.iteritems():
+			depth = (int(Object.y+sprite.get_height()),self.objectOrder.get(Object,last))
+			old = depths.get(Object)
+			if old == depth:
+				continue
+			layer = self.layers.setdefault(max(layer,-1),[])
+			if old != None:
+				del layer[bisect.bisect_left(layer,old)]
+			bisect.insort(layer,depth+(Object,))
+			depths[Object] = depth
+		if len(depths) > len(visible):
+			for Object in depths.keys():
+				if Object not in visible:
+					layer = self.layers[max(Object.layer,-1)]
+					del layer[bisect.bisect_left(layer,depths.pop(Object))]
+
+	## Returns the objects in a layer in the order they should be drawn, see sortLayers().
+	def getLayer(self,layer):
+		return [entry[2] for entry in self.layers.get(layer,())]
 
 	## Sets who is the player.
 	#  @param player The player.
@@ -159,10 +288,14 @@ class GraphicsEngine(object):
 	#
 	#  @deprecated Replaced by setBackground().
 	def loadLevel(self,level):
-		self.background = pygame.image.load("Backgrounds/Images/"+level+".png").convert()
+		self.background = AssetCache.load("Backgrounds/Images/"+level+".png","tiled")
 
 	## Sets an image as the background
+	#
+	#  @param bg A graphics.tiles.TiledBackground or ChunkedBackground, or a pygame.Surface which will be split into a TiledBackground.
 	def setBackground(self,bg):
+		if isinstance(bg,pygame.Surface):
+			bg = TiledBackground(bg)
 		self.background = bg
 
 	## Returns the screen
@@ -198,10 +331,13 @@ class GraphicsEngine(object):
 	## Updates objects
 	#
 	#  Updates all objects, draws them in the correct order and in the correct place in relation to the camera.
+	#
+	#  With config.DirtyRects only the parts of the screen where an object, menu or dialog has changed
+	#  since the last frame are redrawn and sent to the display. The whole screen is redrawn when the
+	#  camera moves, the background changes, a composite effect is active or something else has drawn
+	#  to the screen since the last frame.
 	#  @param tick Time that has passed since last clock cycle, in seconds.
 	def update(self,tick):
-		self.screen.fill((0,0,0))
-
 		if self.focus != None:
 			if self.background.get_width()>320:
 				offsetX = self.focus.getX()+(self.focus.getWidth()/2)-160
@@ -215,28 +351,65 @@ class GraphicsEngine(object):
 			offsetX=0
 			offsetY=0
 
-		for Object in self.objects:
+		#Objects outside of the camera's view are culled before they are updated, sorted and drawn.
+		#Looping animations stop while they are culled, nobody can see which frame they are on, but
+		#animations leading into another keep running so objects come into view in the right state.
+		view = pygame.Rect(-CullMargin,-CullMargin,320+CullMargin*2,240+CullMargin*2)
+		nearby = self.objectGrid.query((int(offsetX)-CullMargin-self.maxSize[0],int(offsetY)-CullMargin-self.maxSize[1],322+CullMargin*2+self.maxSize[0],242+CullMargin*2+self.maxSize[1]))
+		visible = [go for go in nearby if view.colliderect(go.currentAnimation.getSprite().get_rect(topleft=(go.x-offsetX,go.y-offsetY)))]
+		for Object in visible:
 			Object.update(tick)
+		if len(self.animating) > 0:
+			shown = set(visible)
+			for Object in list(self.animating):
+				if Object not in shown:
+					Object.update(tick)
+				if Object.currentAnimation.nextAnimation in (None,Object.currentAnimation):
+					self.animating.discard(Object)
 
 
 		self.player.update(tick)
-		self.objects.append(self.player)
-
-		self.screen.blit(self.background,(self.cameraPosX-offsetX,self.cameraPosY-offsetY))
-		for go in self.objects:
-			if go.layer<0:
-				self.screen.blit(go.getSprite(),(go.getX()-offsetX,go.getY()-offsetY))
-
-		self.objects.sort(key=lambda x:int(x.getPos()[1]+x.getHeight()),reverse=False)
-		for go in self.objects:
-			if go.layer==0:
-				self.screen.blit(go.getSprite(),(go.getX()-offsetX,go.getY()-offsetY))
-
-		for go in self.objects:
-			if go.layer==1:
-				self.screen.blit(go.getSprite(),(go.getX()-offsetX,go.getY()-offsetY))
+		visible.append(self.player)
+
+		drawn = {}
+		for go in visible:
+			sprite = go.getSprite()
+			drawn[go] = (sprite,sprite.get_rect(topleft=(go.getX()-offsetX,go.getY()-offsetY)),go.layer)
+
+		self.sortLayers(drawn)
+		below = self.getLayer(-1)
+		middle = self.getLayer(0)+self.getLayer(1)
+		above = self.getLayer(2)
+
+		partial = (self.isScaled and config.DirtyRects and not self.redrawAll and self.compEffect==None and
+			(offsetX,offsetY)==self.lastOffset and self.background is self.lastBackground and self.screen.getDraws()==self.lastDraws)
+		if partial:
+			dirty = list(self.overlay)	#Menus and dialogs are drawn again every frame, so whatever was under them is restored first.
+			for go in drawn:
+				if self.drawn.get(go) != drawn[go]:
+					dirty.append(drawn[go][1])
+					if go in self.drawn:
+						dirty.append(self.drawn[go][1])
+			for go in self.drawn:
+				if go not in drawn:
+					dirty.append(self.drawn[go][1])
+			dirty = mergeRects(dirty,(0,0,320,240))
+			for rect in dirty:
+				self.screen.set_clip(rect)
+				self.screen.fill((0,0,0),rect)
+				self.background.draw(self.screen,(self.cameraPosX-offsetX,self.cameraPosY-offsetY),rect)
+				for go in below+middle:
+					if rect.colliderect(drawn[go][1]):
+						self.screen.blit(drawn[go][0],drawn[go][1])
+			self.screen.set_clip()
+		else:
+			self.screen.fill((0,0,0))
+			self.background.draw(self.screen,(self.cameraPosX-offsetX,self.cameraPosY-offsetY),pygame.Rect(0,0,320,240))
+			for go in below+middle:
+				self.screen.blit(drawn[go][0],drawn[go][1])
 
-		self.objects.remove(self.player)
+		if self.isScaled:
+			self.screen.record()
 
 		if self.inven:
 			if self.inven.update(self.screen,tick):
@@ -259,6 +432,7 @@ class GraphicsEngine(object):
 					screenCopy = self.screen.copy()
 					fadeBlackTrans(self.screen,screenCopy,screenCopy,1,1)
 					self.sleep=True
+					self.redrawAll=True
 				elif self.talking.getTrigger():
 					self.trigger = self.talking.getTrigger()
 				elif self.talking.getQuest():
@@ -274,6 +448,7 @@ class GraphicsEngine(object):
 					screenCopy = self.screen.copy()
 					fadeBlackTrans(self.screen,screenCopy,screenCopy,1,1)
 					self.sleep=True
+					self.redrawAll=True
 				elif self.talking.getTrigger():
 					self.trigger = self.talking.getTrigger()
 				elif self.talking.getQuest():
@@ -282,19 +457,47 @@ class GraphicsEngine(object):
 				elif self.talking.getBranch():
 					self.branch = self.talking.getBranch()
 
-		for go in self.objects:
-			if go.layer==2:
-				self.screen.blit(go.getSprite(),(go.getX()-offsetX,go.getY()-offsetY))
+		if self.isScaled:
+			overlay = self.screen.stopRecording()
+
+		if partial:
+			dirty = mergeRects(dirty+overlay,(0,0,320,240))
+			for rect in dirty:
+				self.screen.set_clip(rect)
+				for go in above:
+					if rect.colliderect(drawn[go][1]):
+						self.screen.blit(drawn[go][0],drawn[go][1])
+			self.screen.set_clip()
+		else:
+			for go in above:
+				self.screen.blit(drawn[go][0],drawn[go][1])
 
 		self.composite(tick)
 
 		if self.debug:
+			if self.isScaled:
+				self.screen.record()
 			self.debug.update()
 			self.screen.blit(self.debug.getSprite(),[0,0])
+			if self.isScaled:
+				overlay.extend(self.screen.stopRecording())
+			if partial:
+				dirty = mergeRects(dirty+overlay,(0,0,320,240))
 
+		if partial:
+			pygame.display.update(self.screen.update(dirty))
+		else:
+			if self.isScaled:
+				self.screen.update()
+			pygame.display.update()
+
+		self.drawn = drawn
+		self.lastOffset = (offsetX,offsetY)
+		self.lastBackground = self.background
+		self.redrawAll = False
 		if self.isScaled:
-			self.screen.update()
-		pygame.display.update()
+			self.overlay = overlay
+			self.lastDraws = self.screen.getDraws()
 
 ## An object that contains graphics information.
 #
@@ -330,13 +533,38 @@ class GraphicObject(object):
 		self.x = 0
 		self.y = 0
 
+		self.changeFunc = None
+
+	## Sets a function to be called with this object whenever it moves or changes animation, see GraphicsEngine.objectChanged().
+	#
+	#  @param func The function, or @c None.
+	def setChangeFunc(self,func):
+		self.changeFunc = func
+
+	## Returns the largest width and height of any frame in any of this object's animations.
+	def getMaxSize(self):
+		size = [0,0]
+		for directions in self.animations.values():
+			if isinstance(directions,dict):
+				directions = directions.values()
+			for animation in directions:
+				if animation == None:
+					continue
+				for frame in animation.getFrames():
+					if frame.image != None:
+						size = [max(size[0],frame.image.get_width()),max(size[1],frame.image.get_height())]
+		return size
+
 	## Sets where the object should be drawn.
 	#
 	#  Does not change where object is in regards to interactions with objects.
 	#  See game.GameObject.setPos().
 	def setPos(self,pos):
+		moved = self.x != pos[0] or self.y != pos[1]
 		self.x=pos[0]
 		self.y=pos[1]
+		if moved and self.changeFunc != None:
+			self.changeFunc(self)
 
 	## Returns width of current frame.
 	def getWidth(self):
@@ -367,6 +595,8 @@ class GraphicObject(object):
 		self.state=state
 		self.currentAnimation.reset()
 		self.currentAnimation = self.animations[self.state][self.direction]
+		if self.changeFunc != None:
+			self.changeFunc(self)
 
 	## Sets the direction the object is facing.
 	def setDirection(self,direction):
@@ -375,6 +605,8 @@ class GraphicObject(object):
 		self.currentAnimation.reset()
 		self.currentAnimation = self.animations[self.state][self.direction]
 		self.currentAnimation.setFrame(f)
+		if self.changeFunc != None:
+			self.changeFunc(self)
 
 	## Returns the current frame's image.
 	def getSprite(self):
@@ -27,15 +27,67 @@ class ScaledScreen(object):
 		if config.Smoothing==1:
 			self.aResX=640
 			self.aResY=480
+		self.draws=0
+		self.recorded=None
 	
 	## Updates the pygame screen by scaling the internal screen.
-	def update(self):
-		if config.Smoothing==0:
-			pygame.transform.scale(self.screen,(self.aResX,self.aResY),self.scaledScreen)
-		elif config.Smoothing==1:
-			pygame.transform.scale2x(self.screen,self.scaledScreen)
-		elif config.Smoothing==2:
-			pygame.transform.smoothscale(self.screen,(self.aResX,self.aResY),self.scaledScreen)
+	#
+	#  @param rects A list of rectangles on the internal screen, only these areas are scaled if given.
+	#
+	#  @return Returns a list of the rectangles on the pygame screen that were changed, for pygame.display.update().
+	def update(self,rects=None):
+		if rects==None or config.Smoothing==2:	#Smooth scaling is not the same when done in pieces.
+			if config.Smoothing==0:
+				pygame.transform.scale(self.screen,(self.aResX,self.aResY),self.scaledScreen)
+			elif config.Smoothing==1:
+				pygame.transform.scale2x(self.screen,self.scaledScreen)
+			elif config.Smoothing==2:
+				pygame.transform.smoothscale(self.screen,(self.aResX,self.aResY),self.scaledScreen)
+			if rects==None:
+				return [self.scaledScreen.get_rect()]
+			return [self.scaleRect(self.screen.get_rect().clip(pygame.Rect(rect).inflate(2,2))) for rect in rects]
+		bounds=self.screen.get_rect()
+		updated=[]
+		for rect in rects:
+			if config.Smoothing==1:	#Each scaled pixel depends on its neighbours, so changes spread one pixel further.
+				rect=pygame.Rect(rect).inflate(2,2)
+			rect=bounds.clip(rect)
+			if rect.width==0 or rect.height==0:
+				continue
+			target=self.scaleRect(rect)
+			if config.Smoothing==0:
+				pygame.transform.scale(self.screen.subsurface(rect),target.size,self.scaledScreen.subsurface(target))
+			else:	#The neighbours are scaled along with the rectangle and then cut off.
+				source=bounds.clip(rect.inflate(2,2))
+				scaledSource=self.scaleRect(source)
+				temp=pygame.transform.scale2x(self.screen.subsurface(source))
+				self.scaledScreen.blit(temp,target.topleft,target.move(-scaledSource.x,-scaledSource.y))
+			updated.append(target)
+		return updated
+	
+	## Returns the rectangle on the pygame screen that a rectangle on the internal screen is scaled to.
+	def scaleRect(self,rect):
+		left=rect[0]*self.aResX//320
+		top=rect[1]*self.aResY//240
+		return pygame.Rect(left,top,(rect[0]+rect[2])*self.aResX//320-left,(rect[1]+rect[3])*self.aResY//240-top)
+	
+	## Starts remembering the rectangles drawn to with fill() and blit().
+	def record(self):
+		self.recorded=[]
+	
+	## Stops remembering drawn rectangles.
+	#
+	#  @return Returns the list of rectangles drawn to since record() was called.
+	def stopRecording(self):
+		recorded=self.recorded
+		self.recorded=None
+		return recorded
+	
+	## Returns how many times fill() and blit() have been called.
+	#
+	#  Lets anything keeping the screen's contents between frames tell whether something else has drawn over it.
+	def getDraws(self):
+		return self.draws
 	
 	## Functions the same as pygame.Surface.fill().
 	#  @param color Color to fill screen.
@@ -47,7 +99,11 @@ class ScaledScreen(object):
 				rect[2]-=abs(rect[0])
 			if rect[1]<0:
 				rect[3]-=abs(rect[1])
-		self.screen.fill(color,rect,special_flags)
+		self.draws+=1
+		drawn=self.screen.fill(color,rect,special_flags)
+		if self.recorded!=None:
+			self.recorded.append(drawn)
+		return drawn
 	
 	## Functions the same as pygame.Surface.fill().
 	#  @param source Source image to copy
@@ -55,7 +111,16 @@ class ScaledScreen(object):
 	#  @param area Area of source to copy, if @c None then copy entire image.
 	#  @param special_flags Copy mode, see Pygame documentation.
 	def blit(self,source,dest,area=None,special_flags=0):
-		self.screen.blit(source,dest,area,special_flags)
+		self.draws+=1
+		drawn=self.screen.blit(source,dest,area,special_flags)
+		if self.recorded!=None:
+			self.recorded.append(drawn)
+		return drawn
+	
+	## Functions the same as pygame.Surface.set_clip().
+	#  @param rect Rectangle to limit drawing to, if @c None then drawing is not limited.
+	def set_clip(self,rect=None):
+		self.screen.set_clip(rect)
 	
 	## Functions the same as pygame.Surface.copy().
 	def copy(self,*args):
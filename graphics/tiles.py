@@ -0,0 +1,130 @@
+## @package tiles
+#  Documentation for the Tiles Module.
+#
+#  This module contains the TiledBackground, which keeps a large image as a grid of small tiles so
+#  that only the part of it in view has to be drawn, and the ChunkedBackground used by chunked levels.
+
+import hashlib
+
+import pygame
+
+## The default width and height of a tile, in pixels.
+TileSize = 32
+
+## A large image split into a grid of square tiles.
+#
+#  Tiles with the same contents are only kept once, so images made of repeated textures such as
+#  fields and floors take up less memory. The tiles at the right and bottom edges may be smaller
+#  than the rest.
+class TiledBackground(object):
+
+	## Constructor.
+	#
+	#  @param surface The image to split up, it is not kept.
+	#  @param tileSize The width and height of a tile, in pixels.
+	def __init__(self,surface,tileSize=TileSize):
+		self.width,self.height = surface.get_size()
+		self.tileSize = tileSize
+		self.tiles = []
+		self.grid = []
+		bounds = surface.get_rect()
+		unique = {}
+		for y in xrange(0,self.height,tileSize):
+			row = []
+			for x in xrange(0,self.width,tileSize):
+				tile = surface.subsurface(bounds.clip((x,y,tileSize,tileSize)))
+				key = (tile.get_size(),hashlib.md5(pygame.image.tostring(tile,"RGBA")).digest())
+				if key not in unique:
+					unique[key] = tile.copy()
+					self.tiles.append(unique[key])
+				row.append(unique[key])
+			self.grid.append(row)
+
+	## Functions the same as pygame.Surface.get_width().
+	def get_width(self):
+		return self.width
+
+	## Functions the same as pygame.Surface.get_height().
+	def get_height(self):
+		return self.height
+
+	## Functions the same as pygame.Surface.get_size().
+	def get_size(self):
+		return (self.width,self.height)
+
+	## Returns the number of bytes used by the tiles.
+	def getBytes(self):
+		return sum(tile.get_pitch()*tile.get_height() for tile in self.tiles)
+
+	## Draws the tiles which cover part of the screen.
+	#
+	#  @param screen The pygame.Surface or ScaledScreen to draw to.
+	#  @param pos Where the top left corner of the image is on the screen.
+	#  @param area The pygame.Rect of the screen to cover, tiles outside of it are skipped.
+	def draw(self,screen,pos,area):
+		if len(self.grid) == 0:
+			return
+		x,y = int(pos[0]),int(pos[1])
+		size = self.tileSize
+		left = max((area.left-x)//size,0)
+		right = min((area.right-1-x)//size,len(self.grid[0])-1)
+		top = max((area.top-y)//size,0)
+		bottom = min((area.bottom-1-y)//size,len(self.grid)-1)
+		for row in xrange(top,bottom+1):
+			tiles = self.grid[row]
+			for column in xrange(left,right+1):
+				screen.blit(tiles[column],(x+column*size,y+row*size))
+
+## The background of a chunked level, a grid of TiledBackgrounds which can be loaded and unloaded separately.
+#
+#  Has the same interface as a TiledBackground, chunks which are not loaded are left undrawn.
+class ChunkedBackground(object):
+
+	## Constructor.
+	#
+	#  @param chunkSize The width and height of a chunk, in pixels.
+	#  @param count The number of columns and rows of chunks.
+	def __init__(self,chunkSize,count):
+		self.chunkSize = tuple(chunkSize)
+		self.count = tuple(count)
+		self.chunks = {}
+
+	## Sets the background of a chunk which has been loaded.
+	#
+	#  @param pos The chunk's (column, row).
+	#  @param background The chunk's TiledBackground, or @c None if it has none.
+	def setChunk(self,pos,background):
+		if background == None:
+			self.chunks.pop(tuple(pos),None)
+		else:
+			self.chunks[tuple(pos)] = background
+
+	## Forgets the background of a chunk once it has been unloaded.
+	def removeChunk(self,pos):
+		self.chunks.pop(tuple(pos),None)
+
+	## Functions the same as pygame.Surface.get_width().
+	def get_width(self):
+		return self.chunkSize[0]*self.count[0]
+
+	## Functions the same as pygame.Surface.get_height().
+	def get_height(self):
+		return self.chunkSize[1]*self.count[1]
+
+	## Functions the same as pygame.Surface.get_size().
+	def get_size(self):
+		return (self.get_width(),self.get_height())
+
+	## Returns the number of bytes used by the loaded chunks.
+	def getBytes(self):
+		return sum(chunk.getBytes() for chunk in self.chunks.itervalues())
+
+	## Draws the chunks which cover part of the screen, see TiledBackground.draw().
+	def draw(self,screen,pos,area):
+		x,y = int(pos[0]),int(pos[1])
+		width,height = self.chunkSize
+		for row in xrange(max((area.top-y)//height,0),min((area.bottom-1-y)//height,self.count[1]-1)+1):
+			for column in xrange(max((area.left-x)//width,0),min((area.right-1-x)//width,self.count[0]-1)+1):
+				chunk = self.chunks.get((column,row))
+				if chunk != None:
+					chunk.draw(screen,(x+column*width,y+row*height),area)
@@ -125,6 +125,8 @@ import config
 from game.engine import GameEngine
 from game.items.factory import ItemFactory
 from game import level
+from game.prefetch import Prefetcher
+from game.areas import AreaCache
 from game import player
 from battle.engine import BattleEngine
 from battle.enemies.factory import EnemyFactory
@@ -159,16 +161,37 @@ from battle.jobs.job import Warrior
 #      - All new code must be documented as it is written.
 """
 
+## Starts building the areas the current area leads to, see game.prefetch.Prefetcher.
+#
+#  Areas which are still kept in the areaCache are skipped.
+def prefetchAreaChanges():
+	global prefetcher
+	global areaCache
+	global currentArea
+
+	prefetcher.prefetch([area for area in currentArea.getAreaChanges() if not areaCache.has(config.AssetPath+area[0],area[1])])
+
 def loadNewArea(xml,Level):
 	global gameEngine
 	global graphicsEngine
 	global clock
-
+	global prefetcher
+	global areaCache
+	global currentArea
+
+	prepared = areaCache.take(config.AssetPath+xml,Level)
+	if prepared == None:
+		prepared = prefetcher.take(xml,Level)
+	prefetcher.cancel()
 	gameEngine.clearActors()
 	gameEngine.clearNPCs()
 	gameEngine.clearTriggers()
 	graphicsEngine.clearObjects()
-	level.load(xml,Level,gameEngine,graphicsEngine)
+	if currentArea != None:
+		currentArea.releaseChunks()
+		areaCache.retain(currentArea)
+	currentArea = level.load(xml,Level,gameEngine,graphicsEngine,prepared)
+	prefetchAreaChanges()
 	clock.tick()
 
 def battleStart(Enemies,bg,farBG):
@@ -189,14 +212,6 @@ def battleStart(Enemies,bg,farBG):
 	PlayerB.setDirection(1)
 	PlayerB.playerStatus = True
 
-#	if Player.getInventory().getArm1()!=None and PlayerB.getGraphicObject().weapon!=None:
-#		if Player.getInventory().getArm1().getStyle() != PlayerB.getGraphicObject().weapon.getStyle():
-#			PlayerB.updateWeapon(Player.getInventory().getArm1(),Player.constructBattleAnimations())
-#	else:
-#		if Player.getInventory().getArm1() != PlayerB.getGraphicObject().weapon:
-#			PlayerB.updateWeapon(Player.getInventory().getArm1(),Player.constructBattleAnimations())
-	PlayerB.updateWeapon(Player.getInventory().getArm1(),Player.constructBattleAnimations())
-
 	battleEngine.addAlly(PlayerB)
 	for ally in Player.getParty():
 		x-=50
@@ -236,6 +251,9 @@ clock = pygame.time.Clock()
 clock.tick()
 
 gameEngine = GameEngine(loadNewArea,battleStart)
+prefetcher = Prefetcher()
+areaCache = AreaCache()
+currentArea = None
 graphicsEngine = GraphicsEngine(screen,True)
 inputEngine = Input.InputEngine()
 errors.init(screen,level=config.LogVerbosity,quiet=False)
@@ -252,7 +270,8 @@ options = [["Levels/TestArea/Test.xml","Test1"],["Levels/TestArea/Test.xml","Tes
 choice = random.choice(options)
 choice = ["Levels/TestArea/TestVillage.xml","VillageMain"]
 #choice = ["Levels/TestArea/Test.xml","Test1"]
-level.load(choice[0],choice[1],gameEngine,graphicsEngine)
+currentArea = level.load(choice[0],choice[1],gameEngine,graphicsEngine)
+prefetchAreaChanges()
 
 transitions.fadeFromColor(screen,screen.screen.copy(),[0,0,0],.5)
 
@@ -281,9 +300,11 @@ while menu:
 	tick = clock.tick()/1000.0
 	for item in gameEngine.actors:
 		item.update(tick,gameEngine.moveCheck)
+		gameEngine.placeActor(item)
 	for item in gameEngine.NPCs:
 		item.update(tick,gameEngine.moveCheck)
-	screen.blit(graphicsEngine.background,[0,0])
+	gameEngine.timers.advance(tick)
+	graphicsEngine.background.draw(screen,[0,0],pygame.Rect(0,0,320,240))
 	for item in graphicsEngine.objects:
 		item.update(tick)
 		screen.blit(item.getSprite(),item.getPos())
@@ -524,6 +545,7 @@ while PLAYING:
 		if graphicsEngine.getBranch():
 			graphicsEngine.dialogBranch(gameEngine.branchCheck(graphicsEngine.getBranch()))
 
+		currentArea.updateChunks(gameEngine,graphicsEngine)
 		gameEngine.update(tick)
 		graphicsEngine.update(tick)
 
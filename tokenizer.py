@@ -0,0 +1,205 @@
+## @package tokenizer
+#  Documentation for the Tokenizer Module.
+#
+#  This module contains the code shared by the loaders of the game's XML-like data files (levels,
+#  animations and quests).
+#
+#  These files are not real XML, every line holds exactly one of the following:
+#  + @c "<Tag Arg>" - Opens a block, the argument is optional.
+#  + @c "</Tag>" - Closes the innermost block.
+#  + @c "<Tag Arg>value</Tag>" - A value, the argument is optional.
+#
+#  Leading and trailing whitespace is ignored, as are blank lines and lines starting with @c "#".
+#
+#  Files are read one line at a time and never held in memory as a whole.
+
+import config
+
+## Token type of a line opening a block.
+OPEN = 0
+## Token type of a line closing a block.
+CLOSE = 1
+## Token type of a line containing a value.
+VALUE = 2
+
+## A block or value read from a file.
+class Record(object):
+
+	## Constructor.
+	#
+	#  @param tag The tag of the record.
+	#  @param arg The argument following the tag, or @c None.
+	#  @param value The value of the record, @c None if the record is a block.
+	def __init__(self,tag,arg=None,value=None):
+		self.tag = tag
+		self.arg = arg
+		self.value = value
+		self.children = []
+		self.includes = []
+
+
+## Splits a single line into a token.
+#
+#  @param line The line to be split.
+#
+#  @return Returns a tuple (type, tag, arg, value), or @c None if the line is blank or a comment.
+def tokenizeLine(line):
+	line = line.strip()
+	if line == "" or line.startswith("#"):
+		return None
+	if line.startswith("</"):
+		return (CLOSE,line[2:line.find(">")],None,None)
+	end = line.find(">")
+	head = line[1:end].split(" ",1)
+	arg = None
+	if len(head)>1:
+		arg = head[1]
+	rest = line[end+1:]
+	if rest == "":
+		return (OPEN,head[0],arg,None)
+	if rest.find("<") != -1:
+		rest = rest[:rest.find("<")]
+	return (VALUE,head[0],arg,rest)
+
+## Opens a file and generates its tokens, one line at a time.
+#
+#  The file is opened immediately, so a missing file raises an IOError here rather than once the
+#  tokens are first read.
+#
+#  @param path Path to the file.
+def tokenize(path):
+	return tokenizeFile(open(path,"r"))
+
+## Generates the tokens of an open file, one line at a time, and closes it afterwards.
+def tokenizeFile(filer):
+	try:
+		for line in filer:
+			token = tokenizeLine(line)
+			if token != None:
+				yield token
+	finally:
+		filer.close()
+
+## Generates the tokens inside a block, not including the block's own open and close tokens.
+#
+#  The tokens stream ends with the close token matching the block, any tokens after it are left
+#  unconsumed.
+#
+#  @param tokens The token stream, positioned just after the block's open token.
+def blockTokens(tokens):
+	depth = 0
+	for token in tokens:
+		if token[0] == OPEN:
+			depth+=1
+		elif token[0] == CLOSE:
+			if depth == 0:
+				return
+			depth-=1
+		yield token
+
+## Returns the tokens inside the block @c "<tag arg>" of a file.
+#
+#  The lines before the block are only compared against its open tag rather than split into tokens,
+#  the contents are generated as they are consumed. An empty stream is returned if the file does not
+#  contain the block.
+#
+#  @param path Path to the file.
+#  @param tag The tag of the block.
+#  @param arg The argument of the block.
+def findBlock(path,tag,arg):
+	filer = open(path,"r")
+	start = "<"+tag+" "+arg+">"
+	for line in filer:
+		if line.strip() == start:
+			return blockTokens(tokenizeFile(filer))
+	filer.close()
+	return iter(())
+
+## Finds where every top level block of a file starts, without keeping any of their tokens.
+#
+#  @param path Path to the file.
+#
+#  @return Returns a dictionary mapping (tag, arg) to the offset in the file just after each block's
+#  open tag, see readBlockAt().
+def indexBlocks(path):
+	index = {}
+	depth = 0
+	filer = open(path,"r")
+	try:
+		for line in iter(filer.readline,""):	#Iterating over the file reads ahead, so tell() would be wrong.
+			token = tokenizeLine(line)
+			if token == None:
+				continue
+			if token[0] == OPEN:
+				if depth == 0:
+					index[(token[1],token[2])] = filer.tell()
+				depth+=1
+			elif token[0] == CLOSE:
+				depth-=1
+	finally:
+		filer.close()
+	return index
+
+## Returns the tokens inside a block of a file, generated as they are consumed.
+#
+#  @param path Path to the file.
+#  @param offset The offset of the block's contents, as returned by indexBlocks().
+def readBlockAt(path,offset):
+	filer = open(path,"r")
+	filer.seek(offset)
+	return blockTokens(tokenizeFile(filer))
+
+## Reads a record from a token stream.
+#
+#  Blocks with a tag in @c includes and an argument of the form @c "path name" include the contents
+#  of the block @c "<tag name>" from the file at @c path (relative to config.AssetPath). The included
+#  contents come before the block's own contents, the included paths are listed in the @c includes
+#  attribute of the returned record.
+#
+#  @param token The first token of the record.
+#  @param tokens The token stream, positioned just after @c token.
+#  @param includes A collection of the tags which may include other files.
+#  @param files A dictionary of the files already included, as returned by indexBlocks() and keyed by
+#  path. Passing the same dictionary when reading several records means each included file is only
+#  indexed once, the included blocks themselves are streamed from the file whenever they are used.
+#
+#  @return Returns the record, blocks are read up to and including their close token.
+def readRecord(token,tokens,includes=(),files=None):
+	if token[0] != OPEN:
+		return Record(token[1],token[2],token[3])
+	if files == None:
+		files = {}
+	record = Record(token[1],token[2])
+	openBlock(record,record,includes,files)
+	readChildren(record,record,tokens,includes,files)
+	return record
+
+## Reads the contents of @c block from a token stream, up to the close token of the block or the end of the stream.
+#
+#  Nested blocks are tracked with a stack rather than by recursion, so each token is handled exactly once.
+def readChildren(root,block,tokens,includes,files):
+	stack = [block]
+	for token in tokens:
+		if token[0] == VALUE:
+			stack[-1].children.append(Record(token[1],token[2],token[3]))
+		elif token[0] == OPEN:
+			child = Record(token[1],token[2])
+			stack[-1].children.append(child)
+			stack.append(child)
+			openBlock(root,child,includes,files)
+		else:
+			stack.pop()
+			if len(stack) == 0:
+				return
+
+## Reads the included contents of @c block, if it has any.
+def openBlock(root,block,includes,files):
+	if block.tag in includes and block.arg != None and " " in block.arg:
+		path,block.arg = block.arg.split(" ",1)
+		path = config.AssetPath+path
+		if path not in files:
+			files[path] = indexBlocks(path)
+		root.includes.append(path)
+		offset = files[path].get((block.tag,block.arg))
+		if offset != None:
+			readChildren(root,block,readBlockAt(path,offset),includes,files)
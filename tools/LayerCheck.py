@@ -0,0 +1,83 @@
+## @package layercheck
+#  Documentation for the Layer Check Tool.
+#
+#  This tool checks that GraphicsEngine.sortLayers() keeps every object in view in its layer exactly
+#  once when objects are added after the first frame, as the chunks of a chunked level are.
+#
+#  Usage: python tools/LayerCheck.py [trials]
+#
+#  Each trial adds an object with its sprite's bottom at the same depth as the player's, sorts it into
+#  the layers ahead of the objects drawn last frame, draws a few frames and checks the layers, then
+#  removes the object again. Exits with status 1 if any trial fails.
+
+import os
+import sys
+from collections import OrderedDict
+
+os.environ.setdefault("SDL_VIDEODRIVER","dummy")
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)),".."))
+sys.path.insert(0,os.getcwd())
+
+import pygame
+pygame.init()
+display = pygame.display.set_mode((640,480),0,32)
+
+import errors
+from game.engine import GameEngine
+from game import level
+from game import player
+from graphics.overworld import GraphicsEngine
+from graphics.scaled_screen import ScaledScreen
+
+## Returns a list of problems with the layers of @c graphicsEngine, empty if there are none.
+#
+#  @param expected Objects which must be drawn.
+def checkLayers(graphicsEngine,expected):
+	problems = []
+	counts = {}
+	for layer in graphicsEngine.layers.keys():
+		for Object in graphicsEngine.getLayer(layer):
+			counts[Object] = counts.get(Object,0)+1
+	for Object,count in counts.iteritems():
+		if count > 1:
+			problems.append("%s is drawn %d times" % (Object,count))
+	for Object in expected:
+		if Object not in counts:
+			problems.append("%s is not drawn" % Object)
+	return problems
+
+def main(trials=200):
+	errors.info = errors.debug = lambda *args,**kwargs: None
+	gameEngine = GameEngine(lambda *args: None,lambda *args: None)
+	graphicsEngine = GraphicsEngine(ScaledScreen(display,640,480),True)
+	level.load("Levels/TestArea/TestVillage.xml","VillageMain",gameEngine,graphicsEngine)
+	checker = player.Player("Check",1,player.Colors[0],1,player.Colors[1])
+	checker.getGameObject().setPos([400,550])
+	gameEngine.setPlayer(checker.getGameObject())
+	graphicsEngine.setPlayer(checker.getGraphicObject())
+	graphicsEngine.setFocus(checker.getGraphicObject())
+	graphicsEngine.update(1/60.0)
+
+	failures = 0
+	for trial in xrange(trials):
+		other = player.Player("Other",1,player.Colors[0],1,player.Colors[1]).getGraphicObject()
+		other.setPos([checker.getGraphicObject().getX()+8,checker.getGraphicObject().getY()])
+		graphicsEngine.addObject(other)
+		#The order objects are sorted in depends on their hashes, the new object is put first so that
+		#it is already in its layer when the player is moved.
+		sprite = other.getSprite()
+		visible = OrderedDict([(other,(sprite,sprite.get_rect(),other.layer))])
+		visible.update((Object,entry) for Object,entry in graphicsEngine.drawn.iteritems() if Object in graphicsEngine.depths)
+		graphicsEngine.sortLayers(visible)
+		for frame in xrange(3):
+			graphicsEngine.update(1/60.0)
+		problems = checkLayers(graphicsEngine,[checker.getGraphicObject(),other])
+		if len(problems) > 0:
+			failures += 1
+			print "Trial %d: %s" % (trial,", ".join(problems))
+		graphicsEngine.removeObject(other)
+	print "%d of %d trials failed" % (failures,trials)
+	sys.exit(1 if failures > 0 else 0)
+
+if __name__ == "__main__":
+	main(*[int(arg) for arg in sys.argv[1:]])
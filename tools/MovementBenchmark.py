@@ -0,0 +1,91 @@
+## @package benchmark
+#  Documentation for the Movement Benchmark Tool.
+#
+#  This tool times GameEngine.update() in a generated town, mostly to measure collision checking.
+#
+#  Usage: python tools/MovementBenchmark.py [objects] [NPCs] [frames]
+#
+#  The town has @c objects buildings and scenery objects (200 by default) laid out in a grid with
+#  @c NPCs wandering NPCs (50 by default) in the streets between them. Everything is seeded, so runs
+#  of different versions of the engine simulate exactly the same frames.
+
+import os
+import sys
+import time
+import random
+import tempfile
+
+os.environ.setdefault("SDL_VIDEODRIVER","dummy")
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)),".."))
+sys.path.insert(0,os.getcwd())
+
+import pygame
+pygame.init()
+pygame.display.set_mode((640,480),0,32)
+
+import config
+import errors
+from game.engine import GameEngine
+from game import level
+from game import player
+
+## The objects placed around the town, in order, as (xml, name).
+Objects = [("Objects/Buildings.xml","WoodHouse1"),("Objects/Scenery.xml","Crate1"),("Objects/Scenery.xml","Well"),("Objects/Lighting.xml","TorchStand")]
+
+## Writes a level XML for the town and returns its path.
+def writeTown(objects,NPCs):
+	columns = int(objects**0.5)+1
+	filer = tempfile.NamedTemporaryFile("w",suffix=".xml",delete=False)
+	filer.write("<Level Benchmark>\n\t<LevelName>Benchmark</LevelName>\n\t<Background>Backgrounds/Overworld/TestArea/VillageMainTestPaths.png</Background>\n")
+	for i in xrange(objects):
+		xml,name = Objects[i%len(Objects)]
+		filer.write("\t<GameObject "+xml+" "+name+">\n\t\t<Id>\"Object"+str(i)+"\"</Id>\n\t\t<Pos>["+str(i%columns*200)+","+str(i/columns*240)+"]</Pos>\n\t</GameObject>\n")
+	for i in xrange(NPCs):
+		filer.write("\t<NPC>\n\t\t<Name>null</Name>\n\t\t<Id>\"Citizen"+str(i)+"\"</Id>\n\t\t<Pos>["+str(random.randrange(columns)*200+170)+","+str(random.randrange(objects/columns+1)*240+200)+"]</Pos>\n\t\t<Dialog>null</Dialog>\n\t\t<ClothingType>null</ClothingType>\n\t\t<ClothingColor>null</ClothingColor>\n\t\t<HairType>null</HairType>\n\t\t<HairColor>null</HairColor>\n\t\t<Icon>null</Icon>\n\t\t<Wander>true</Wander>\n\t</NPC>\n")
+	filer.write("</Level>\n")
+	filer.close()
+	return filer.name
+
+def main(objects=200,NPCs=50,frames=600):
+	errors.info = errors.debug = lambda *args,**kwargs: None
+	config.UseCache = False
+	random.seed(0)
+
+	path = writeTown(objects,NPCs)
+	try:
+		prepared = level.buildLevel(path,"Benchmark")
+	finally:
+		os.remove(path)
+	engine = GameEngine(lambda *args: None,lambda *args: None)
+	for actor in prepared.actors:
+		engine.addActor(actor)
+	for NPC in prepared.NPCs:
+		engine.addNPC(NPC)
+	engine.loadLevel(prepared.level)
+	walker = player.Player("Benchmark",1,player.Colors[0],1,player.Colors[1])
+	walker.getGameObject().setPos([170,200])
+	walker.getGameObject().setMoving(True,[1,0])
+	engine.setPlayer(walker.getGameObject())
+
+	checks = [0]
+	moveCheck = engine.moveCheck
+	def countedMoveCheck(*args):
+		checks[0]+=1
+		return moveCheck(*args)
+	engine.moveCheck = countedMoveCheck
+
+	random.seed(1)
+	times = []
+	for frame in xrange(frames):
+		start = time.time()
+		engine.update(1/60.0)
+		times.append(time.time()-start)
+	times.sort()
+	print str(len(engine.actors))+" objects, "+str(len(engine.NPCs))+" NPCs, "+str(frames)+" frames"
+	print "Mean frame:   %.3fms" % (sum(times)/len(times)*1000)
+	print "Median frame: %.3fms" % (times[len(times)/2]*1000)
+	print "moveCheck calls per frame: %.1f" % (checks[0]/float(frames))
+	print "Player ended at "+str(walker.getGameObject().getPos())+", NPCs at "+str(hash(tuple(tuple(NPC.getGameObject().getPos()) for NPC in engine.NPCs)))
+
+if __name__ == "__main__":
+	main(*[int(arg) for arg in sys.argv[1:]])
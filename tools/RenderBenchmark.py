@@ -0,0 +1,64 @@
+## @package renderbenchmark
+#  Documentation for the Render Benchmark Tool.
+#
+#  This tool times GraphicsEngine.update() in VillageMain with the player standing still, once with
+#  config.DirtyRects turned off and once with it turned on.
+#
+#  Usage: python tools/RenderBenchmark.py [frames]
+#
+#  The NPCs wander as usual and everything is seeded, so both runs draw exactly the same frames.
+#  Set SDL_VIDEODRIVER to time a real window, the dummy driver is used by default.
+
+import os
+import sys
+import time
+import random
+
+os.environ.setdefault("SDL_VIDEODRIVER","dummy")
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)),".."))
+sys.path.insert(0,os.getcwd())
+
+import pygame
+pygame.init()
+display = pygame.display.set_mode((640,480),0,32)
+
+import config
+import errors
+from game.engine import GameEngine
+from game import level
+from game import player
+from graphics.overworld import GraphicsEngine
+from graphics.scaled_screen import ScaledScreen
+
+## Draws @c frames frames of VillageMain and returns (wall time, CPU time) for each frame in seconds.
+def run(frames):
+	random.seed(0)
+	gameEngine = GameEngine(lambda *args: None,lambda *args: None)
+	graphicsEngine = GraphicsEngine(ScaledScreen(display,640,480),True)
+	level.load("Levels/TestArea/TestVillage.xml","VillageMain",gameEngine,graphicsEngine)
+	idler = player.Player("Benchmark",1,player.Colors[0],1,player.Colors[1])
+	idler.getGameObject().setPos([400,550])
+	gameEngine.setPlayer(idler.getGameObject())
+	graphicsEngine.setPlayer(idler.getGraphicObject())
+	graphicsEngine.setFocus(idler.getGraphicObject())
+
+	times = []
+	for frame in xrange(frames):
+		gameEngine.update(1/60.0)
+		start = time.time()
+		cpuStart = time.clock()
+		graphicsEngine.update(1/60.0)
+		times.append((time.time()-start,time.clock()-cpuStart))
+	return times
+
+def main(frames=600):
+	errors.info = errors.debug = lambda *args,**kwargs: None
+	for dirtyRects in (False,True):
+		config.DirtyRects = dirtyRects
+		times = run(frames)
+		wall = sum(t[0] for t in times)/len(times)
+		cpu = sum(t[1] for t in times)/len(times)
+		print "DirtyRects = "+str(dirtyRects)+": %.3fms per frame (%.0f FPS uncapped), %.3fms CPU" % (wall*1000,1/wall,cpu*1000)
+
+if __name__ == "__main__":
+	main(*[int(arg) for arg in sys.argv[1:]])